@@ -314,6 +314,14 @@ void DynamicProperty::Save (Base::Writer &writer) const
     std::map<std::string,Property*> Map;
     getPropertyMap(Map);
 
+    // properties marked transient at run time are not written at all
+    for (std::map<std::string,Property*>::iterator it = Map.begin(); it != Map.end();) {
+        if (it->second->testStatus(Property::Transient))
+            Map.erase(it++);
+        else
+            ++it;
+    }
+
     writer.incInd(); // indentation for 'Properties Count'
     writer.Stream() << writer.ind() << "<Properties Count=\"" << Map.size() << "\">" << std::endl;
     std::map<std::string,Property*>::iterator it;
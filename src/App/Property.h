@@ -64,6 +64,7 @@ public:
         Hidden = 3, // for property editor
         Single = 4, // for save/load of floating point numbers
         Ordered = 5, // for PropertyLists whether the order of the elements is relevant for the container using it
+        Transient = 6, // for save/load, the property of this container is not saved
         User1 = 28, // user-defined status
         User2 = 29, // user-defined status
         User3 = 30, // user-defined status
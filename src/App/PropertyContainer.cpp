@@ -212,6 +212,14 @@ void PropertyContainer::Save (Base::Writer &writer) const
     std::map<std::string,Property*> Map;
     getPropertyMap(Map);
 
+    // properties marked transient at run time are not written at all
+    for (std::map<std::string,Property*>::iterator it = Map.begin(); it != Map.end();) {
+        if (it->second->testStatus(Property::Transient))
+            Map.erase(it++);
+        else
+            ++it;
+    }
+
     // ignore the properties we won't store
     size_t ct = std::count_if(Map.begin(), Map.end(), std::bind2nd(PropertyAttribute
         <std::pair<std::string,Property*> >(this), Prop_Transient));
@@ -180,6 +180,72 @@ PyObject*  PropertyContainerPy::getEditorMode(PyObject *args)
     return Py::new_reference_to(ret);
 }
 
+PyObject*  PropertyContainerPy::setPropertyStatus(PyObject *args)
+{
+    char* name;
+    PyObject *pyStatus;
+    if (!PyArg_ParseTuple(args, "sO", &name, &pyStatus))     // convert args: Python->C
+        return NULL;                                         // NULL triggers exception
+
+    App::Property* prop = getPropertyContainerPtr()->getPropertyByName(name);
+    if (!prop) {
+        PyErr_Format(PyExc_AttributeError, "Property container has no property '%s'", name);
+        return 0;
+    }
+
+    std::vector<std::string> values;
+    try {
+        if (PyTuple_Check(pyStatus) || PyList_Check(pyStatus)) {
+            Py::Sequence seq(pyStatus);
+            for (Py::Sequence::iterator it = seq.begin();it!=seq.end();++it)
+                values.push_back((std::string)Py::String(*it));
+        }
+        else {
+            values.push_back((std::string)Py::String(pyStatus));
+        }
+    }
+    catch (Py::Exception&) {
+        PyErr_SetString(PyExc_TypeError, "Second argument must be str, list or tuple");
+        return 0;
+    }
+
+    for (std::vector<std::string>::iterator it = values.begin(); it != values.end(); ++it) {
+        bool value = true;
+        std::string str = *it;
+        if (!str.empty() && str[0] == '-') {
+            value = false;
+            str = str.substr(1);
+        }
+        if (str == "Transient") {
+            prop->setStatus(Property::Transient, value);
+        }
+        else {
+            PyErr_Format(PyExc_ValueError, "Unknown property status '%s'", it->c_str());
+            return 0;
+        }
+    }
+
+    Py_Return;
+}
+
+PyObject*  PropertyContainerPy::getPropertyStatus(PyObject *args)
+{
+    char* name;
+    if (!PyArg_ParseTuple(args, "s", &name))     // convert args: Python->C
+        return NULL;                             // NULL triggers exception
+
+    App::Property* prop = getPropertyContainerPtr()->getPropertyByName(name);
+    if (!prop) {
+        PyErr_Format(PyExc_AttributeError, "Property container has no property '%s'", name);
+        return 0;
+    }
+
+    Py::List ret;
+    if (prop->testStatus(Property::Transient))
+        ret.append(Py::String("Transient"));
+    return Py::new_reference_to(ret);
+}
+
 PyObject*  PropertyContainerPy::getGroupOfProperty(PyObject *args)
 {
     char *pstr;
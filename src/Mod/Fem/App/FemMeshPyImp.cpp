@@ -23,6 +23,7 @@
 
 #include "PreCompiled.h"
 #include <algorithm>
+#include <map>
 #include <stdexcept>
 
 #include <Base/VectorPy.h>
@@ -33,6 +34,7 @@
 #include <SMESH_Gen.hxx>
 #include <SMESH_Group.hxx>
 #include <SMESH_Mesh.hxx>
+#include <SMESH_MeshEditor.hxx>
 #include <SMESHDS_Group.hxx>
 #include <SMDSAbs_ElementType.hxx>
 #include <SMDS_MeshElement.hxx>
@@ -593,6 +595,205 @@ PyObject* FemMeshPy::addVolume(PyObject *args)
     return 0;
 }
 
+// Sequences of ints or floats for the bulk methods, the holder keeps the references
+static PyObject* getFastSequence(PyObject* obj, const char* message, std::vector<Py::Object>& holder)
+{
+    PyObject* seq = PySequence_Fast(obj, message);
+    if (seq)
+        holder.push_back(Py::asObject(seq));
+    return seq;
+}
+
+static long getLong(PyObject* item)
+{
+#if PY_MAJOR_VERSION >= 3
+    return PyLong_AsLong(item);
+#else
+    return PyInt_AsLong(item);
+#endif
+}
+
+PyObject* FemMeshPy::addNodes(PyObject *args)
+{
+    PyObject *ids, *coords;
+    if (!PyArg_ParseTuple(args, "OO", &ids, &coords))
+        return 0;
+
+    std::vector<Py::Object> holder;
+    PyObject* idSeq = getFastSequence(ids, "addNodes() expects a sequence of node ids", holder);
+    if (!idSeq)
+        return 0;
+    PyObject* coordSeq = getFastSequence(coords, "addNodes() expects a sequence of coordinates", holder);
+    if (!coordSeq)
+        return 0;
+
+    Py_ssize_t count = PySequence_Fast_GET_SIZE(idSeq);
+    if (PySequence_Fast_GET_SIZE(coordSeq) != 3 * count) {
+        PyErr_SetString(PyExc_ValueError, "addNodes() expects three coordinates for each node id");
+        return 0;
+    }
+    PyObject** idItems = PySequence_Fast_ITEMS(idSeq);
+    PyObject** coordItems = PySequence_Fast_ITEMS(coordSeq);
+
+    try {
+        SMESHDS_Mesh* meshDS = getFemMeshPtr()->getSMesh()->GetMeshDS();
+        for (Py_ssize_t i = 0; i < count; i++) {
+            long id = getLong(idItems[i]);
+            double x = PyFloat_AsDouble(coordItems[3 * i]);
+            double y = PyFloat_AsDouble(coordItems[3 * i + 1]);
+            double z = PyFloat_AsDouble(coordItems[3 * i + 2]);
+            if (PyErr_Occurred())
+                return 0;
+            if (!meshDS->AddNodeWithID(x, y, z, static_cast<int>(id)))
+                throw std::runtime_error("Failed to add node");
+        }
+    }
+    catch (const std::exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+    Py_Return;
+}
+
+PyObject* FemMeshPy::addElements(PyObject *args)
+{
+    char* type;
+    PyObject *ids, *nodes;
+    if (!PyArg_ParseTuple(args, "sOO", &type, &ids, &nodes))
+        return 0;
+
+    SMDSAbs_ElementType elemType;
+    std::string typeName(type);
+    if (typeName == "Edge")
+        elemType = SMDSAbs_Edge;
+    else if (typeName == "Face")
+        elemType = SMDSAbs_Face;
+    else if (typeName == "Volume")
+        elemType = SMDSAbs_Volume;
+    else {
+        PyErr_SetString(PyExc_ValueError, "addElements() accepts the element types Edge, Face and Volume");
+        return 0;
+    }
+
+    std::vector<Py::Object> holder;
+    PyObject* idSeq = getFastSequence(ids, "addElements() expects a sequence of element ids", holder);
+    if (!idSeq)
+        return 0;
+    PyObject* nodeSeq = getFastSequence(nodes, "addElements() expects a sequence of node ids", holder);
+    if (!nodeSeq)
+        return 0;
+
+    Py_ssize_t count = PySequence_Fast_GET_SIZE(idSeq);
+    if (count == 0)
+        Py_Return;
+    Py_ssize_t nodeCount = PySequence_Fast_GET_SIZE(nodeSeq);
+    if (nodeCount % count != 0) {
+        PyErr_SetString(PyExc_ValueError, "addElements() expects the same number of nodes for each element");
+        return 0;
+    }
+    Py_ssize_t elementNodeCount = nodeCount / count;
+    PyObject** idItems = PySequence_Fast_ITEMS(idSeq);
+    PyObject** nodeItems = PySequence_Fast_ITEMS(nodeSeq);
+
+    try {
+        SMESH_Mesh* mesh = getFemMeshPtr()->getSMesh();
+        SMESHDS_Mesh* meshDS = mesh->GetMeshDS();
+        SMESH_MeshEditor editor(mesh);
+        SMESH_MeshEditor::ElemFeatures elemFeat(elemType);
+        std::vector<const SMDS_MeshNode*> elemNodes(elementNodeCount);
+        for (Py_ssize_t i = 0; i < count; i++) {
+            for (Py_ssize_t j = 0; j < elementNodeCount; j++) {
+                long nodeId = getLong(nodeItems[i * elementNodeCount + j]);
+                elemNodes[j] = meshDS->FindNode(static_cast<int>(nodeId));
+                if (!elemNodes[j]) {
+                    if (PyErr_Occurred())
+                        return 0;
+                    throw std::runtime_error("Failed to get node of the given indices");
+                }
+            }
+            long id = getLong(idItems[i]);
+            if (PyErr_Occurred())
+                return 0;
+            elemFeat.SetID(static_cast<int>(id));
+            if (!editor.AddElement(elemNodes, elemFeat))
+                throw std::runtime_error("Failed to add element, unknown node count or element id in use");
+        }
+    }
+    catch (const std::exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+    Py_Return;
+}
+
+PyObject* FemMeshPy::addGroup(PyObject *args)
+{
+    char* name;
+    char* typeString;
+    int theId = -1;
+    if (!PyArg_ParseTuple(args, "ss|i", &name, &typeString, &theId))
+        return 0;
+
+    std::map<std::string, SMDSAbs_ElementType> types;
+    types["All"] = SMDSAbs_All;
+    types["Node"] = SMDSAbs_Node;
+    types["Edge"] = SMDSAbs_Edge;
+    types["Face"] = SMDSAbs_Face;
+    types["Volume"] = SMDSAbs_Volume;
+    types["0DElement"] = SMDSAbs_0DElement;
+    types["Ball"] = SMDSAbs_Ball;
+    std::map<std::string, SMDSAbs_ElementType>::iterator type = types.find(typeString);
+    if (type == types.end()) {
+        PyErr_SetString(PyExc_ValueError, "addGroup() accepts the types All, Node, Edge, Face, Volume, 0DElement and Ball");
+        return 0;
+    }
+
+    try {
+        SMESH_Group* group = getFemMeshPtr()->getSMesh()->AddGroup(type->second, name, theId);
+        if (!group)
+            throw std::runtime_error("Failed to add group");
+    }
+    catch (const std::exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+    return Py::new_reference_to(Py::Long(theId));
+}
+
+PyObject* FemMeshPy::addGroupElements(PyObject *args)
+{
+    int id;
+    PyObject *ids;
+    if (!PyArg_ParseTuple(args, "iO", &id, &ids))
+        return 0;
+
+    SMESH_Group* group = getFemMeshPtr()->getSMesh()->GetGroup(id);
+    if (!group) {
+        PyErr_SetString(PyExc_ValueError, "No group for given id");
+        return 0;
+    }
+    SMESHDS_Group* groupDS = dynamic_cast<SMESHDS_Group*>(group->GetGroupDS());
+    if (!groupDS) {
+        PyErr_SetString(PyExc_ValueError, "Elements can not be added to the group of the given id");
+        return 0;
+    }
+
+    std::vector<Py::Object> holder;
+    PyObject* idSeq = getFastSequence(ids, "addGroupElements() expects a sequence of ids", holder);
+    if (!idSeq)
+        return 0;
+    Py_ssize_t count = PySequence_Fast_GET_SIZE(idSeq);
+    PyObject** idItems = PySequence_Fast_ITEMS(idSeq);
+    for (Py_ssize_t i = 0; i < count; i++) {
+        long elementId = getLong(idItems[i]);
+        if (PyErr_Occurred())
+            return 0;
+        // ids of missing elements or elements of another type are skipped
+        groupDS->Add(static_cast<int>(elementId));
+    }
+    Py_Return;
+}
+
 PyObject* FemMeshPy::copy(PyObject *args)
 {
     if (!PyArg_ParseTuple(args, ""))
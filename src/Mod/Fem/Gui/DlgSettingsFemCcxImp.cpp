@@ -62,6 +62,7 @@ void DlgSettingsFemCcxImp::saveSettings()
 
     cb_analysis_type->onSave();
     cb_BeamShellOutput->onSave();   //Beam shell output 3d or 2d 
+    cb_BinaryResultOutput->onSave();   //frd result file binary or ascii
     sb_eigenmode_number->onSave();
     dsb_eigenmode_high_limit->onSave();
     dsb_eigenmode_low_limit->onSave();
@@ -87,6 +88,7 @@ void DlgSettingsFemCcxImp::loadSettings()
 
     cb_analysis_type->onRestore();
     cb_BeamShellOutput->onRestore(); //Beam shell output 3d or 2d 
+    cb_BinaryResultOutput->onRestore(); //frd result file binary or ascii
     sb_eigenmode_number->onRestore();
     dsb_eigenmode_high_limit->onRestore();
     dsb_eigenmode_low_limit->onRestore();
@@ -48,6 +48,8 @@ void DlgSettingsFemGeneralImp::saveSettings()
     cb_analysis_group_meshing->onSave();
 
     cb_restore_result_dialog->onSave();
+    cb_compact_result_storage->onSave();
+    cb_compact_result_single_precision->onSave();
     cb_keep_results_on_rerun->onSave();
     cb_hide_constraint->onSave();
 
@@ -64,6 +66,8 @@ void DlgSettingsFemGeneralImp::loadSettings()
     cb_analysis_group_meshing->onRestore();
 
     cb_restore_result_dialog->onRestore();
+    cb_compact_result_storage->onRestore();
+    cb_compact_result_single_precision->onRestore();
     cb_keep_results_on_rerun->onRestore();
     cb_hide_constraint->onRestore();
 
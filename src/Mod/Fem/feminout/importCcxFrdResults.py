@@ -60,25 +60,36 @@ def insert(filename, docname):
 
 
 # ********* module specific methods *********
-def importFrd(filename, analysis=None, result_name_prefix=None):
+def importFrd(filename, analysis=None, result_name_prefix=None, result_steps=None):
+    ''' result_steps: list of the step indices to create result objects for, all steps if None
+    only these steps are read from the frd file, one after the other
+    '''
     from . import importToolsFem
+    from . import readCcxFrd
     import ObjectsFem
     if result_name_prefix is None:
         result_name_prefix = ''
-    m = read_frd_result(filename)
+    frd_index = readCcxFrd.FrdStepIndex(filename)
+    nodes, elements = frd_index.get_mesh_arrays()
     result_mesh_object = None
-    if len(m['Nodes']) > 0:
+    if len(nodes[0]) > 0:
         if analysis:
             analysis_object = analysis
 
-        mesh = importToolsFem.make_femmesh(m)
+        mesh = importToolsFem.make_femmesh_from_arrays(nodes, elements)
         result_mesh_object = ObjectsFem.makeMeshResult(FreeCAD.ActiveDocument, 'Result_mesh')
         result_mesh_object.FemMesh = mesh
 
-        number_of_increments = len(m['Results'])
+        number_of_increments = len(frd_index)
         FreeCAD.Console.PrintLog('Increments: ' + str(number_of_increments) + '\n')
-        if len(m['Results']) > 0:
-            for result_set in m['Results']:
+        from femresult import resultstorage
+        compact_storage, single_precision = resultstorage.get_prefs()
+        node_numbers_result = None
+        if number_of_increments > 0:
+            if result_steps is None:
+                result_steps = range(number_of_increments)
+            for step in result_steps:
+                result_set = frd_index.get_result_set(step)
                 if 'number' in result_set:
                     eigenmode_number = result_set['number']
                 else:
@@ -107,6 +118,11 @@ def importFrd(filename, analysis=None, result_name_prefix=None):
                 res_obj = restools.add_von_mises(res_obj)  # fill StressValues
                 res_obj = restools.add_principal_stress(res_obj)  # fill PrincipalMax, PrincipalMed, PrincipalMin, MaxShear
                 res_obj = restools.fill_femresult_stats(res_obj)  # fill Stats
+                if compact_storage:
+                    # the steps share the NodeNumbers of the first step if they are the same
+                    res_obj = resultstorage.set_compact_storage(res_obj, single_precision, node_numbers_result)
+                    if node_numbers_result is None:
+                        node_numbers_result = res_obj
         else:
             error_message = (
                 "We have nodes but no results in frd file, which means we only have a mesh in frd file. "
@@ -128,6 +144,7 @@ def importFrd(filename, analysis=None, result_name_prefix=None):
 
 
 # read a calculix result file and extract the nodes, displacement vectors and stress values.
+# line by line reader, importFrd uses the numpy based reader in readCcxFrd, which returns the same data
 def read_frd_result(frd_input):
     FreeCAD.Console.PrintMessage('Read ccx results from frd file: {}\n'.format(frd_input))
     inout_nodes = []
@@ -35,6 +35,7 @@ import FreeCADGui
 import os
 
 from . import importToolsFem
+from . import readFenicsXDMF
 from . import readFenicsXML
 from . import writeFenicsXML
 from . import writeFenicsXDMF
@@ -166,8 +167,10 @@ def export(objectslist, fileString):
 def import_fenics_mesh(filename, analysis=None):
     '''insert a FreeCAD FEM Mesh object in the ActiveDocument
     '''
-    mesh_data = readFenicsXML.read_fenics_mesh_xml(filename)
-    # xdmf not operational
+    if os.path.splitext(filename)[1].lower() == '.xdmf':
+        mesh_data = readFenicsXDMF.read_fenics_mesh_xdmf(filename)
+    else:
+        mesh_data = readFenicsXML.read_fenics_mesh_xml(filename)
 
     mesh_name = os.path.basename(os.path.splitext(filename)[0])
     femmesh = importToolsFem.make_femmesh(mesh_data)
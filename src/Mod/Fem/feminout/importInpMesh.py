@@ -30,7 +30,9 @@ __date__ = "04/08/2016"
 #  \brief FreeCAD INP file reader for FEM workbench
 
 import FreeCAD
+import numpy as np
 import os
+import re
 
 
 # ********* generic FreeCAD import and export methods *********
@@ -63,9 +65,9 @@ def read(filename):
     '''read a FemMesh from a inp mesh file and return the FemMesh
     '''
     # no document object is created, just the FemMesh is returned
-    mesh_data = read_inp(filename)
+    arrays = read_inp_arrays(filename)
     from . import importToolsFem
-    return importToolsFem.make_femmesh(mesh_data)
+    return importToolsFem.make_femmesh_from_arrays(arrays['Nodes'], arrays['Elements'], get_inp_groups(arrays))
 
 
 def import_inp(filename):
@@ -78,183 +80,327 @@ def import_inp(filename):
         mesh_object.FemMesh = femmesh
 
 
-def read_inp(file_name):
-    '''read .inp file '''
-    # ATM only mesh reading is supported (no boundary conditions)
+# CalculiX element type --> FreeCAD element key, number of nodes
+INP_ELEMENT_TYPES = {}
+for inp_types, key, node_count in (
+    (["S3", "CPS3", "CPE3", "CAX3"], 'Tria3Elem', 3),
+    (["S6", "CPS6", "CPE6", "CAX6"], 'Tria6Elem', 6),
+    (["S4", "S4R", "CPS4", "CPS4R", "CPE4", "CPE4R", "CAX4", "CAX4R"], 'Quad4Elem', 4),
+    (["S8", "S8R", "CPS8", "CPS8R", "CPE8", "CPE8R", "CAX8", "CAX8R"], 'Quad8Elem', 8),
+    (["C3D4"], 'Tetra4Elem', 4),
+    (["C3D10"], 'Tetra10Elem', 10),
+    (["C3D8", "C3D8R", "C3D8I"], 'Hexa8Elem', 8),
+    (["C3D20", "C3D20R", "C3D20RI"], 'Hexa20Elem', 20),
+    (["C3D6"], 'Penta6Elem', 6),
+    (["C3D15"], 'Penta15Elem', 15),
+    (["B31", "B31R", "T3D2"], 'Seg2Elem', 2),
+    (["B32", "B32R", "T3D3"], 'Seg3Elem', 3),
+):
+    for inp_type in inp_types:
+        INP_ELEMENT_TYPES[inp_type] = (key, node_count)
+
+# switch from the CalculiX node numbering to the FreeCAD node numbering
+# the orders are indices into the CalculiX nodes of an element
+# numbering do not change: tria3, tria6, quad4, quad8, seg2
+INP_NODE_ORDERS = {
+    'Tetra4Elem': [1, 0, 2, 3],
+    'Tetra10Elem': [1, 0, 2, 3, 4, 6, 5, 8, 7, 9],
+    'Hexa8Elem': [5, 6, 7, 4, 1, 2, 3, 0],
+    'Hexa20Elem': [5, 6, 7, 4, 1, 2, 3, 0, 13, 14, 15, 12, 9, 10, 11, 8, 17, 18, 19, 16],
+    'Penta6Elem': [4, 5, 3, 1, 2, 0],
+    'Penta15Elem': [4, 5, 3, 1, 2, 0, 10, 11, 9, 7, 8, 6, 13, 14, 12],
+    'Seg3Elem': [0, 2, 1],
+}
+
+# characters of data lines tokenized at once
+INP_CHUNK_SIZE = 1 << 24
+
+_keyword_line = re.compile(r'^[ \t]*\*[^\n]*', re.MULTILINE)
+_data_line = re.compile(r'^[ \t,]*[^\s,]', re.MULTILINE)
+_set_name = re.compile(r'[^\d\s,+-]')
+
+
+def parse_keyword(line):
+    ''' returns the upper case keyword and a dict of its upper case parameters,
+    *ELEMENT, TYPE=C3D10, ELSET=Eall --> ('*ELEMENT', {'TYPE': 'C3D10', 'ELSET': 'Eall'})
+    '''
+    parts = line.strip().split(',')
+    params = {}
+    for part in parts[1:]:
+        if '=' in part:
+            name, value = part.split('=', 1)
+            params[name.strip().upper()] = value.strip().strip('"')
+        elif part.strip():
+            params[part.strip().upper()] = ''
+    return parts[0].strip().upper(), params
+
+
+def get_include_path(include, file_name):
+    include_path = os.path.normpath(include)
+    if os.path.isfile(include_path):
+        return include_path
+    return os.path.join(os.path.split(file_name)[0], include_path)
+
+
+def iter_inp_blocks(file_name, chunk_size=INP_CHUNK_SIZE, keyword=None):
+    ''' yields (keyword line, None) for each keyword and (keyword line, data) for the data lines after it
+    the data lines are yielded in parts of about chunk_size characters, every part ends at a line end,
+    thus only one part of a big data block is held in memory
+    the lines of *INCLUDE files are yielded in place of the *INCLUDE keyword, comments are skipped,
+    data lines at the beginning of an *INCLUDE file continue the block of the keyword before the *INCLUDE
+    '''
+    with pyopen(file_name, "r") as f:
+        while True:
+            text = f.read(chunk_size)
+            if not text:
+                break
+            if not text.endswith('\n'):
+                text += f.readline()
+            pos = 0
+            for match in _keyword_line.finditer(text):
+                if keyword is not None and _data_line.search(text, pos, match.start()):
+                    yield keyword, text[pos:match.start()]
+                pos = match.end()
+                line = match.group().strip()
+                if line.startswith('**'):
+                    continue
+                name, params = parse_keyword(line)
+                if name == '*INCLUDE':
+                    include = line[line.index('=') + 1:].strip().strip('"')
+                    # the lines after the *INCLUDE continue the block of the last keyword of the include file
+                    for keyword, data in iter_inp_blocks(get_include_path(include, file_name), chunk_size, keyword):
+                        yield keyword, data
+                    continue
+                keyword = line
+                yield keyword, None
+            if keyword is not None and _data_line.search(text, pos):
+                yield keyword, text[pos:]
+
+
+def get_numbers(data, dtype):
+    ''' all comma or white space separated numbers of data in one array
+    '''
+    return np.fromstring(data.replace(',', ' '), dtype=dtype, sep=' ')
+
+
+class _NodeBlock(object):
+
+    def __init__(self, set_name=None):
+        self.set_name = set_name
+        self.ids = []
+        self.coords = []
+
+    def add(self, data):
+        # all node lines of a block have the same number of columns
+        first_line = data[_data_line.search(data).start():].split('\n', 1)[0]
+        columns = len(re.findall(r'[^,\s]+', first_line))
+        values = get_numbers(data, np.float64)
+        lines = len(values) // columns
+        if columns * lines != len(values) or columns < 2:
+            raise ValueError("Badly formatted node lines: " + first_line)
+        values = values.reshape(lines, columns)
+        coords = np.zeros((lines, 3), dtype=np.float64)
+        coords[:, :min(3, columns - 1)] = values[:, 1:4]
+        self.ids.append(values[:, 0].astype(np.int64))
+        self.coords.append(coords)
+
+    def finish(self):
+        if not self.ids:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 3), dtype=np.float64)
+        return np.concatenate(self.ids), np.concatenate(self.coords)
+
+
+class _ElementBlock(object):
+
+    def __init__(self, key, node_count, set_name=None):
+        self.key = key
+        self.row_length = node_count + 1
+        self.set_name = set_name
+        self.rows = []
+        # the numbers of an element which continues in the next part
+        self.pending = np.zeros(0, dtype=np.int64)
+
+    def add(self, data):
+        values = np.concatenate((self.pending, get_numbers(data, np.int64)))
+        count = len(values) // self.row_length
+        self.rows.append(values[:count * self.row_length].reshape(count, self.row_length))
+        self.pending = values[count * self.row_length:]
 
-    class elements():
-
-        tria3 = {}
-        tria6 = {}
-        quad4 = {}
-        quad8 = {}
-        tetra4 = {}
-        tetra10 = {}
-        hexa8 = {}
-        hexa20 = {}
-        penta6 = {}
-        penta15 = {}
-        seg2 = {}
-        seg3 = {}
+    def finish(self):
+        if len(self.pending):
+            FreeCAD.Console.PrintError("Incomplete {} element found in inp file.\n".format(self.key))
+        if self.rows:
+            rows = np.concatenate(self.rows)
+        else:
+            rows = np.zeros((0, self.row_length), dtype=np.int64)
+        nodes = rows[:, 1:]
+        if self.key in INP_NODE_ORDERS:
+            nodes = nodes[:, INP_NODE_ORDERS[self.key]]
+        return rows[:, 0], nodes
+
+
+class _SetBlock(object):
+
+    def __init__(self, sets, name, generate=False):
+        self.sets = sets
+        self.name = name
+        self.generate = generate
+        # id arrays and names of other sets, the names are resolved on finish
+        self.items = []
+
+    def add(self, data):
+        if self.generate:
+            for start, end, step in get_numbers(data, np.int64).reshape(-1, 3).tolist():
+                self.items.append(np.arange(start, end + 1, step, dtype=np.int64))
+            return
+        if not _set_name.search(data):
+            self.items.append(get_numbers(data, np.int64))
+            return
+        # the set contains other sets
+        for token in re.findall(r'[^,\s]+', data):
+            try:
+                self.items.append(np.array([int(token)], dtype=np.int64))
+            except ValueError:
+                self.items.append(token)
+
+    def finish(self):
+        ids = []
+        for item in self.items:
+            if not isinstance(item, np.ndarray):
+                if item.upper() not in self.sets:
+                    FreeCAD.Console.PrintWarning("Set {} not found in inp file.\n".format(item))
+                    continue
+                item = self.sets[item.upper()][1]
+            ids.append(item)
+        key = self.name.upper()
+        name = self.name
+        if key in self.sets:
+            name = self.sets[key][0]
+            ids.insert(0, self.sets[key][1])
+        self.sets[key] = (name, np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64))
+
+
+def read_inp_arrays(file_name):
+    ''' reads the mesh of an .inp file into numpy arrays, the data lines are tokenized in big parts
+    returns a dict with
+        'Nodes': (node ids, coordinates (N, 3))
+        'Elements': FreeCAD element key --> (element ids, nodes (E, number of element nodes))
+        'NodeSets': upper case set name --> (set name, node ids)
+        'ElementSets': upper case set name --> (set name, element ids)
+    '''
+    # ATM only mesh reading is supported (no boundary conditions)
+    node_sets = {}
+    element_sets = {}
     error_seg3 = False  # to print "not supported"
-    nodes = {}
     model_definition = True
+    block = None
+    blocks = []
 
-    f = pyopen(file_name, "r")
-    line = "\n"
-    include = ""
-    f_include = None
-    while line != "":
-        if include:
-            line = f_include.readline()
-            if line == "":
-                f_include.close()
-                include = ""
-                line = f.readline()
-        else:
-            line = f.readline()
-        if line.strip() == '':
+    for keyword, data in iter_inp_blocks(file_name):
+        if data is not None:
+            if block is not None:
+                block.add(data)
             continue
-        elif line[0] == '*':  # start/end of a reading set
-            if line[0:2] == '**':  # comments
-                continue
-            if line[:8].upper() == "*INCLUDE":
-                start = 1 + line.index("=")
-                include = line[start:].strip().strip('"')
-                include_path = os.path.normpath(include)
-                if os.path.isfile(include_path) is True:
-                    f_include = pyopen(include_path, "r")
-                else:
-                    path_start = os.path.split(file_name)[0]
-                    include_full_path = os.path.join(path_start, include_path)
-                    f_include = pyopen(include_full_path, "r")
+        block = None
+        name, params = parse_keyword(keyword)
+        if name == "*STEP":
+            model_definition = False
+        elif name == "*END STEP":
+            model_definition = True
+        if not model_definition:
+            continue
+        if name == "*NODE":
+            block = _NodeBlock(params.get('NSET'))
+        elif name == "*ELEMENT":
+            elm_type = params.get('TYPE', '').upper()
+            if elm_type not in INP_ELEMENT_TYPES:
+                FreeCAD.Console.PrintWarning(
+                    "Element type {} not supported, the elements are skipped.\n".format(elm_type)
+                )
                 continue
-            read_node = False
-            elm_category = []
-            elm_2nd_line = False
-
-        # reading nodes
-        if (line[:5].upper() == "*NODE") and (model_definition is True):
-            read_node = True
-        elif read_node is True:
-            line_list = line.split(',')
-            number = int(line_list[0])
-            x = float(line_list[1])
-            y = float(line_list[2])
-            z = float(line_list[3])
-            nodes[number] = [x, y, z]
-
-        # reading elements
-        elif line[:8].upper() == "*ELEMENT":
-            line_list = line[8:].upper().split(',')
-            for line_part in line_list:
-                if line_part.lstrip()[:4] == "TYPE":
-                    elm_type = line_part.split('=')[1].strip()
-
-            if elm_type in ["S3", "CPS3", "CPE3", "CAX3"]:
-                elm_category = elements.tria3
-                number_of_nodes = 3
-            elif elm_type in ["S6", "CPS6", "CPE6", "CAX6"]:
-                elm_category = elements.tria6
-                number_of_nodes = 6
-            elif elm_type in ["S4", "S4R", "CPS4", "CPS4R", "CPE4", "CPE4R",
-                              "CAX4", "CAX4R"]:
-                elm_category = elements.quad4
-                number_of_nodes = 4
-            elif elm_type in ["S8", "S8R", "CPS8", "CPS8R", "CPE8", "CPE8R",
-                              "CAX8", "CAX8R"]:
-                elm_category = elements.quad8
-                number_of_nodes = 8
-            elif elm_type == "C3D4":
-                elm_category = elements.tetra4
-                number_of_nodes = 4
-            elif elm_type == "C3D10":
-                elm_category = elements.tetra10
-                number_of_nodes = 10
-            elif elm_type in ["C3D8", "C3D8R", "C3D8I"]:
-                elm_category = elements.hexa8
-                number_of_nodes = 8
-            elif elm_type in ["C3D20", "C3D20R", "C3D20RI"]:
-                elm_category = elements.hexa20
-                number_of_nodes = 20
-            elif elm_type == "C3D6":
-                elm_category = elements.penta6
-                number_of_nodes = 6
-            elif elm_type == "C3D15":
-                elm_category = elements.penta15
-                number_of_nodes = 15
-            elif elm_type in ["B31", "B31R", "T3D2"]:
-                elm_category = elements.seg2
-                number_of_nodes = 2
-            elif elm_type in ["B32", "B32R", "T3D3"]:
-                elm_category = elements.seg3
-                number_of_nodes = 3
+            key, node_count = INP_ELEMENT_TYPES[elm_type]
+            if key == 'Seg3Elem':
                 error_seg3 = True  # to print "not supported"
-
-        elif elm_category != []:
-            line_list = line.split(',')
-            if elm_2nd_line is False:
-                number = int(line_list[0])
-                elm_category[number] = []
-                pos = 1
-            else:
-                pos = 0
-                elm_2nd_line = False
-            for en in range(pos, pos + number_of_nodes - len(elm_category[number])):
-                try:
-                    enode = int(line_list[en])
-                    elm_category[number].append(enode)
-                except:
-                    elm_2nd_line = True
-                    break
-
-        elif line[:5].upper() == "*STEP":
-            model_definition = False
+            block = _ElementBlock(key, node_count, params.get('ELSET'))
+        elif name == "*NSET" and 'NSET' in params:
+            block = _SetBlock(node_sets, params['NSET'], 'GENERATE' in params)
+        elif name == "*ELSET" and 'ELSET' in params:
+            block = _SetBlock(element_sets, params['ELSET'], 'GENERATE' in params)
+        if block is not None:
+            blocks.append(block)
     if error_seg3 is True:  # to print "not supported"
         FreeCAD.Console.PrintError("Error: seg3 (3-node beam element type) not supported, yet.\n")
-    f.close()
-
-    # switch from the CalculiX node numbering to the FreeCAD node numbering
-    # numbering do not change: tria3, tria6, quad4, quad8, seg2
-    for en in elements.tetra4:
-        n = elements.tetra4[en]
-        elements.tetra4[en] = [n[1], n[0], n[2], n[3]]
-    for en in elements.tetra10:
-        n = elements.tetra10[en]
-        elements.tetra10[en] = [n[1], n[0], n[2], n[3], n[4], n[6], n[5],
-                                n[8], n[7], n[9]]
-    for en in elements.hexa8:
-        n = elements.hexa8[en]
-        elements.hexa8[en] = [n[5], n[6], n[7], n[4], n[1], n[2], n[3], n[0]]
-    for en in elements.hexa20:
-        n = elements.hexa20[en]
-        elements.hexa20[en] = [n[5], n[6], n[7], n[4], n[1], n[2], n[3], n[0],
-                               n[13], n[14], n[15], n[12], n[9], n[10], n[11],
-                               n[8], n[17], n[18], n[19], n[16]]
-    for en in elements.penta6:
-        n = elements.penta6[en]
-        elements.penta6[en] = [n[4], n[5], n[3], n[1], n[2], n[0]]
-    for en in elements.penta15:
-        n = elements.penta15[en]
-        elements.penta15[en] = [n[4], n[5], n[3], n[1], n[2], n[0],
-                                n[10], n[11], n[9], n[7], n[8], n[6], n[13],
-                                n[14], n[12]]
-    for en in elements.seg3:
-        n = elements.seg3[en]
-        elements.seg3[en] = [n[0], n[2], n[1]]
 
+    # the blocks are finished in file order, thus sets refer to the sets defined before them
+    nodes = []
+    elements = {}
+    for block in blocks:
+        if isinstance(block, _SetBlock):
+            block.finish()
+            continue
+        ids, values = block.finish()
+        if isinstance(block, _NodeBlock):
+            nodes.append((ids, values))
+            sets = node_sets
+        else:
+            if block.key in elements:
+                ids = np.concatenate((elements[block.key][0], ids))
+                values = np.vstack((elements[block.key][1], values))
+            elements[block.key] = (ids, values)
+            sets = element_sets
+        if block.set_name:
+            set_block = _SetBlock(sets, block.set_name)
+            set_block.items.append(ids)
+            set_block.finish()
+    if nodes:
+        nodes = (np.concatenate([n[0] for n in nodes]), np.vstack([n[1] for n in nodes]))
+    else:
+        nodes = (np.zeros(0, dtype=np.int64), np.zeros((0, 3), dtype=np.float64))
     return {
         'Nodes': nodes,
-        'Seg2Elem': elements.seg2,
-        'Seg3Elem': elements.seg3,
-        'Tria3Elem': elements.tria3,
-        'Tria6Elem': elements.tria6,
-        'Quad4Elem': elements.quad4,
-        'Quad8Elem': elements.quad8,
-        'Tetra4Elem': elements.tetra4,
-        'Tetra10Elem': elements.tetra10,
-        'Hexa8Elem': elements.hexa8,
-        'Hexa20Elem': elements.hexa20,
-        'Penta6Elem': elements.penta6,
-        'Penta15Elem': elements.penta15
+        'Elements': elements,
+        'NodeSets': node_sets,
+        'ElementSets': element_sets
     }
+
+
+def get_inp_groups(arrays):
+    ''' the node sets and element sets of read_inp_arrays() as groups for importToolsFem.make_femmesh_from_arrays()
+    an element set with elements of more than one kind gives a group of the same name for each kind
+    '''
+    from .importToolsFem import FEM_ELEMENT_KINDS
+    groups = []
+    for name, ids in sorted(arrays['NodeSets'].values(), key=lambda s: s[0]):
+        groups.append((name, 'Node', np.unique(ids)))
+    if not arrays['ElementSets']:
+        return groups
+    kind_names = sorted(set(kind for key, kind in FEM_ELEMENT_KINDS))
+    element_kinds = dict((key, kind_names.index(kind)) for key, kind in FEM_ELEMENT_KINDS)
+    keys = [key for key in arrays['Elements'] if len(arrays['Elements'][key][0])]
+    if not keys:
+        return groups
+    element_ids = np.concatenate([arrays['Elements'][key][0] for key in keys])
+    kinds = np.concatenate([np.full(len(arrays['Elements'][key][0]), element_kinds[key]) for key in keys])
+    order = np.argsort(element_ids)
+    element_ids, kinds = element_ids[order], kinds[order]
+    for name, ids in sorted(arrays['ElementSets'].values(), key=lambda s: s[0]):
+        ids = np.unique(ids)
+        rows = np.minimum(np.searchsorted(element_ids, ids), len(element_ids) - 1)
+        found = element_ids[rows] == ids
+        for i, kind in enumerate(kind_names):
+            kind_ids = ids[found & (kinds[rows] == i)]
+            if len(kind_ids):
+                groups.append((name, kind, kind_ids))
+    return groups
+
+
+def read_inp(file_name):
+    ''' read .inp file, returns the mesh data dicts of importToolsFem.make_femmesh()
+    '''
+    arrays = read_inp_arrays(file_name)
+    node_ids, coords = arrays['Nodes']
+    mesh_data = {'Nodes': dict(zip(node_ids.tolist(), [FreeCAD.Vector(*c) for c in coords.tolist()]))}
+    for key, node_count in set(INP_ELEMENT_TYPES.values()):
+        ids, nodes = arrays['Elements'].get(key, ([], []))
+        mesh_data[key] = dict(zip(np.asarray(ids).tolist(), [tuple(n) for n in np.asarray(nodes).tolist()]))
+    return mesh_data
@@ -29,6 +29,7 @@ __url__ = "http://www.freecadweb.org"
 #  \brief FreeCAD FEM import tools
 
 import FreeCAD
+import numpy as np
 
 
 def get_FemMeshObjectMeshGroups(fem_mesh_obj):
@@ -117,97 +118,130 @@ def get_MaxDimElementFromList(elem_list):
     return elem_list[-1]
 
 
-def make_femmesh(mesh_data):
-    ''' makes an FreeCAD FEM Mesh object from FEM Mesh data
+# FEM element key --> FemMesh element kind, in the order the elements are added to the mesh
+FEM_ELEMENT_KINDS = (
+    ('Hexa8Elem', 'Volume'),
+    ('Penta6Elem', 'Volume'),
+    ('Tetra4Elem', 'Volume'),
+    ('Tetra10Elem', 'Volume'),
+    ('Penta15Elem', 'Volume'),
+    ('Hexa20Elem', 'Volume'),
+    ('Tria3Elem', 'Face'),
+    ('Tria6Elem', 'Face'),
+    ('Quad4Elem', 'Face'),
+    ('Quad8Elem', 'Face'),
+    ('Seg2Elem', 'Edge'),
+    ('Seg3Elem', 'Edge'),
+)
+
+
+def get_mesh_data_arrays(data, dtype):
+    ''' returns (ids, values) arrays of a dict of FEM Mesh data: id --> node vector or element nodes
+    array based dicts like readCcxFrd.FrdArrayDict give their arrays without building the dict
+    '''
+    if hasattr(data, 'ids') and hasattr(data, 'data'):
+        ids = np.asarray(data.ids, dtype=np.int64)
+        values = np.asarray(data.data, dtype=dtype)
+        if len(np.unique(ids)) != len(ids):
+            # the last value of an id wins, like in the dict
+            reverse_ids = ids[::-1]
+            unused, last = np.unique(reverse_ids, return_index=True)
+            keep = len(ids) - 1 - last
+            ids, values = ids[keep], values[keep]
+        return ids, values
+    ids = np.fromiter(data.keys(), dtype=np.int64, count=len(data))
+    if not len(ids):
+        return ids, np.zeros((0, 0), dtype=dtype)
+    values = np.array([tuple(v) for v in data.values()], dtype=dtype)
+    return ids, values.reshape(len(ids), -1)
+
+
+def add_femmesh_nodes(mesh, node_ids, node_coords):
+    ''' adds the nodes to the mesh in one call, node_coords has one row of x, y, z for each node
+    '''
+    node_ids = np.asarray(node_ids, dtype=np.int64)
+    node_coords = np.asarray(node_coords, dtype=np.float64).reshape(-1, 3)
+    if hasattr(mesh, 'addNodes'):
+        mesh.addNodes(node_ids.tolist(), node_coords.ravel().tolist())
+    else:
+        for i, n in zip(node_ids.tolist(), node_coords.tolist()):
+            mesh.addNode(n[0], n[1], n[2], i)
+
+
+def add_femmesh_elements(mesh, kind, element_ids, element_nodes):
+    ''' adds elements of one kind ('Edge', 'Face' or 'Volume') and one number of nodes to the mesh in one call,
+    element_nodes has one row of node ids for each element
+    '''
+    element_ids = np.asarray(element_ids, dtype=np.int64)
+    element_nodes = np.asarray(element_nodes, dtype=np.int64).reshape(len(element_ids), -1)
+    if hasattr(mesh, 'addElements'):
+        mesh.addElements(kind, element_ids.tolist(), element_nodes.ravel().tolist())
+    else:
+        add_element = getattr(mesh, 'add' + kind)
+        for i, e in zip(element_ids.tolist(), element_nodes.tolist()):
+            add_element(e, i)
+
+
+def add_femmesh_groups(mesh, groups):
+    ''' adds groups to the mesh, groups is a list of (name, 'Node'|'Edge'|'Face'|'Volume', ids)
+    '''
+    if not hasattr(mesh, 'addGroup'):
+        FreeCAD.Console.PrintWarning("Groups are not supported by this FEM Mesh, {} groups skipped.\n".format(len(groups)))
+        return
+    for name, group_type, ids in groups:
+        group_id = mesh.addGroup(name, group_type)
+        mesh.addGroupElements(group_id, np.asarray(ids, dtype=np.int64).tolist())
+
+
+def make_femmesh_from_arrays(nodes, elements, groups=None):
+    ''' makes an FreeCAD FEM Mesh object from arrays
+    nodes: (node ids, coordinates (N, 3))
+    elements: FEM element key like 'Tetra10Elem' --> (element ids, connectivity (E, nodes))
+    groups: optional list of (name, 'Node'|'Edge'|'Face'|'Volume', ids), see add_femmesh_groups()
     '''
     import Fem
     mesh = Fem.FemMesh()
-    m = mesh_data
-    if ('Nodes' in m) and (len(m['Nodes']) > 0):
-        FreeCAD.Console.PrintLog("Found: nodes\n")
-        if (
-            ('Seg2Elem' in m)
-            or ('Seg3Elem' in m)
-            or ('Tria3Elem' in m)
-            or ('Tria6Elem' in m)
-            or ('Quad4Elem' in m)
-            or ('Quad8Elem' in m)
-            or ('Tetra4Elem' in m)
-            or ('Tetra10Elem' in m)
-            or ('Penta6Elem' in m)
-            or ('Penta15Elem' in m)
-            or ('Hexa8Elem' in m)
-            or ('Hexa20Elem' in m)
-        ):
-
-            nds = m['Nodes']
-            FreeCAD.Console.PrintLog("Found: elements\n")
-            for i in nds:
-                n = nds[i]
-                mesh.addNode(n[0], n[1], n[2], i)
-            elms_hexa8 = m['Hexa8Elem']
-            for i in elms_hexa8:
-                e = elms_hexa8[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7]], i)
-            elms_penta6 = m['Penta6Elem']
-            for i in elms_penta6:
-                e = elms_penta6[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5]], i)
-            elms_tetra4 = m['Tetra4Elem']
-            for i in elms_tetra4:
-                e = elms_tetra4[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3]], i)
-            elms_tetra10 = m['Tetra10Elem']
-            for i in elms_tetra10:
-                e = elms_tetra10[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9]], i)
-            elms_penta15 = m['Penta15Elem']
-            for i in elms_penta15:
-                e = elms_penta15[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9],
-                                e[10], e[11], e[12], e[13], e[14]], i)
-            elms_hexa20 = m['Hexa20Elem']
-            for i in elms_hexa20:
-                e = elms_hexa20[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9],
-                                e[10], e[11], e[12], e[13], e[14], e[15], e[16], e[17], e[18], e[19]], i)
-            elms_tria3 = m['Tria3Elem']
-            for i in elms_tria3:
-                e = elms_tria3[i]
-                mesh.addFace([e[0], e[1], e[2]], i)
-            elms_tria6 = m['Tria6Elem']
-            for i in elms_tria6:
-                e = elms_tria6[i]
-                mesh.addFace([e[0], e[1], e[2], e[3], e[4], e[5]], i)
-            elms_quad4 = m['Quad4Elem']
-            for i in elms_quad4:
-                e = elms_quad4[i]
-                mesh.addFace([e[0], e[1], e[2], e[3]], i)
-            elms_quad8 = m['Quad8Elem']
-            for i in elms_quad8:
-                e = elms_quad8[i]
-                mesh.addFace([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7]], i)
-            elms_seg2 = m['Seg2Elem']
-            for i in elms_seg2:
-                e = elms_seg2[i]
-                mesh.addEdge([e[0], e[1]], i)
-            elms_seg3 = m['Seg3Elem']
-            for i in elms_seg3:
-                e = elms_seg3[i]
-                mesh.addEdge([e[0], e[1], e[2]], i)
-            FreeCAD.Console.PrintLog("imported mesh: {} nodes, {} HEXA8, {} PENTA6, {} TETRA4, {} TETRA10, {} PENTA15".format(
-                len(nds), len(elms_hexa8), len(elms_penta6), len(elms_tetra4), len(elms_tetra10), len(elms_penta15)
-            ))
-            FreeCAD.Console.PrintLog("imported mesh: {} HEXA20, {} TRIA3, {} TRIA6, {} QUAD4, {} QUAD8, {} SEG2, {} SEG3".format(
-                len(elms_hexa20), len(elms_tria3), len(elms_tria6), len(elms_quad4), len(elms_quad8), len(elms_seg2), len(elms_seg3)
-            ))
-        else:
-            FreeCAD.Console.PrintError("No Elements found!\n")
-    else:
+    node_ids, node_coords = nodes
+    if not len(node_ids):
         FreeCAD.Console.PrintError("No Nodes found!\n")
+        return mesh
+    FreeCAD.Console.PrintLog("Found: nodes\n")
+    counts = dict((key, len(elements[key][0]) if key in elements else 0) for key, kind in FEM_ELEMENT_KINDS)
+    if not any(key in elements for key, kind in FEM_ELEMENT_KINDS):
+        FreeCAD.Console.PrintError("No Elements found!\n")
+        return mesh
+    FreeCAD.Console.PrintLog("Found: elements\n")
+    add_femmesh_nodes(mesh, node_ids, node_coords)
+    for key, kind in FEM_ELEMENT_KINDS:
+        if counts[key]:
+            add_femmesh_elements(mesh, kind, elements[key][0], elements[key][1])
+    if groups:
+        add_femmesh_groups(mesh, groups)
+    FreeCAD.Console.PrintLog("imported mesh: {} nodes, {} HEXA8, {} PENTA6, {} TETRA4, {} TETRA10, {} PENTA15".format(
+        len(node_ids), counts['Hexa8Elem'], counts['Penta6Elem'], counts['Tetra4Elem'], counts['Tetra10Elem'], counts['Penta15Elem']
+    ))
+    FreeCAD.Console.PrintLog("imported mesh: {} HEXA20, {} TRIA3, {} TRIA6, {} QUAD4, {} QUAD8, {} SEG2, {} SEG3".format(
+        counts['Hexa20Elem'], counts['Tria3Elem'], counts['Tria6Elem'], counts['Quad4Elem'], counts['Quad8Elem'], counts['Seg2Elem'], counts['Seg3Elem']
+    ))
     return mesh
 
 
+def make_femmesh(mesh_data):
+    ''' makes an FreeCAD FEM Mesh object from FEM Mesh data
+    the nodes and elements are added in bulk, see make_femmesh_from_arrays()
+    '''
+    m = mesh_data
+    if 'Nodes' in m:
+        nodes = get_mesh_data_arrays(m['Nodes'], np.float64)
+    else:
+        nodes = (np.zeros(0, dtype=np.int64), np.zeros((0, 3), dtype=np.float64))
+    elements = {}
+    for key, kind in FEM_ELEMENT_KINDS:
+        if key in m:
+            elements[key] = get_mesh_data_arrays(m[key], np.int64)
+    return make_femmesh_from_arrays(nodes, elements)
+
+
 def fill_femresult_mechanical(res_obj, result_set):
     ''' fills a FreeCAD FEM mechanical result object with result data
     '''
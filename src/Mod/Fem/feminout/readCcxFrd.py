@@ -0,0 +1,746 @@
+# ***************************************************************************
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This file is part of the FreeCAD CAx development system.              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+__title__ = "FreeCAD Calculix frd array reader"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+## @package readCcxFrd
+#  \ingroup FEM
+#  \brief column oriented CalculiX frd reader based on numpy arrays
+#
+#  The fixed width node, element and result records of a frd file are not
+#  parsed line by line. Every data block (everything between the block
+#  header and the closing -3 line) is cut out of the memory mapped file and
+#  converted in one go into numpy arrays. The classic dict structure of
+#  importCcxFrdResults.read_frd_result() is only built from those arrays
+#  if somebody accesses it, see FrdArrayDict.
+#  FrdStepIndex only keeps the byte offsets of the blocks and reads the
+#  result steps one by one on request.
+#  Binary frd files (ccx -o bin) are read with numpy.frombuffer directly
+#  out of the memory map, the binary records are skipped by their size.
+
+import FreeCAD
+import contextlib
+import mmap
+import os
+import struct
+import numpy as np
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python2
+    from collections import Mapping
+
+
+# frd element type --> FreeCAD element key, number of nodes, FreeCAD node order
+# the node orders are the same as in importCcxFrdResults.read_frd_result(),
+# they are zero based indices into the node list of the frd element record
+FRD_ELEMENT_TYPES = {
+    1: ('Hexa8Elem', 8, (5, 6, 7, 4, 1, 2, 3, 0)),
+    2: ('Penta6Elem', 6, (4, 5, 3, 1, 2, 0)),
+    3: ('Tetra4Elem', 4, (1, 0, 2, 3)),
+    4: ('Hexa20Elem', 20, (7, 4, 5, 6, 3, 0, 1, 2, 19, 16, 17, 18, 11, 8, 9, 10, 15, 12, 13, 14)),
+    5: ('Penta15Elem', 15, (4, 5, 3, 1, 2, 0, 13, 14, 12, 7, 8, 6, 10, 11, 9)),
+    6: ('Tetra10Elem', 10, (1, 0, 2, 3, 4, 6, 5, 8, 7, 9)),
+    7: ('Tria3Elem', 3, (0, 1, 2)),
+    8: ('Tria6Elem', 6, (0, 1, 2, 3, 4, 5)),
+    9: ('Quad4Elem', 4, (0, 1, 2, 3)),
+    10: ('Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    11: ('Seg2Elem', 2, (0, 1)),
+    12: ('Seg3Elem', 3, (0, 1, 2)),
+}
+
+FEM_ELEMENT_KEYS = (
+    'Seg2Elem', 'Seg3Elem',
+    'Tria3Elem', 'Tria6Elem', 'Quad4Elem', 'Quad8Elem',
+    'Tetra4Elem', 'Tetra10Elem', 'Hexa8Elem', 'Hexa20Elem', 'Penta6Elem', 'Penta15Elem'
+)
+
+# frd result block name --> result key, number of values per node
+# the names are compared with the beginning of the block name,
+# the order is the order the old line reader checks them
+FRD_RESULT_TYPES = (
+    ('DISP', 'disp', 3),
+    ('STRESS', 'stress', 6),
+    ('TOSTRAIN', 'strain', 6),
+    ('PE', 'peeq', 1),
+    ('NDTEMP', 'temp', 1),
+    ('MAFLOW', 'mflow', 1),
+    ('STPRES', 'npressure', 1),
+)
+
+# width of the fixed format fields in ascii frd files
+NODE_ID_COLUMNS = (4, 13)
+VALUE_START = 13
+VALUE_WIDTH = 12
+ELEMENT_NODE_START = 3
+ELEMENT_NODE_WIDTH = 10
+ELEMENT_NODES_PER_LINE = 10
+
+# format flag at the end of the block header lines, 0 and 1 are ascii, all others are binary
+# the binary node coordinates are float with flag 2 and double with flag 3 (written by ccx -o bin)
+FRD_FORMAT_BINARY = 2
+FRD_FORMAT_BINARY_DOUBLE = 3
+
+# binary frd records, ccx writes them with fwrite
+# node: number (int), coordinates (3 float or double), see binary_node_dtype()
+# element: number, type, group, material (4 int), followed by the nodes (int)
+# result: node number (int), values (float), see binary_result_dtype()
+BINARY_INT_DTYPE = np.dtype('<i4')
+BINARY_ELEMENT_HEADER_INTS = 4
+
+
+class FrdArrayDict(Mapping):
+    """ Read only dict on top of an id array and a value array.
+
+    The Python dict (id --> FreeCAD.Vector, tuple or float) is only created
+    on first access. Bulk consumers should use the arrays 'ids' and 'data'.
+    If ids are not unique the last value wins, like on consecutive dict
+    assignments.
+    """
+
+    def __init__(self, ids, data, value_type=None):
+        self.ids = ids
+        self.data = data
+        self.value_type = value_type
+        self._dict = None
+
+    def _materialize(self):
+        if self._dict is None:
+            if self.value_type == 'vector':
+                values = [FreeCAD.Vector(*v) for v in self.data.tolist()]
+            elif self.data.ndim > 1:
+                values = [tuple(v) for v in self.data.tolist()]
+            else:
+                values = self.data.tolist()
+            self._dict = dict(zip(self.ids.tolist(), values))
+        return self._dict
+
+    def to_dict(self):
+        return dict(self._materialize())
+
+    def __getitem__(self, key):
+        return self._materialize()[key]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __len__(self):
+        return len(self._materialize())
+
+    def __repr__(self):
+        return 'FrdArrayDict({} entries)'.format(len(self.ids))
+
+
+def read_inout_nodes(frd_input):
+    ''' reads the special 1DFlow in and out nodes file written by the ccx writer
+    '''
+    inout_nodes = []
+    inout_nodes_file = frd_input.rsplit('.', 1)[0] + '_inout_nodes.txt'
+    if os.path.exists(inout_nodes_file):
+        print('Read special 1DFlow nodes data form: ' + inout_nodes_file)
+        with open(inout_nodes_file, "r") as f:
+            for line in f.readlines():
+                inout_nodes.append(line.split(','))
+        print(inout_nodes)
+    return inout_nodes
+
+
+def fixed_width_chars(block):
+    ''' returns a 2D array (lines x characters) of a block of fixed width lines
+    '''
+    if not block:
+        return np.zeros((0, 0), dtype='S1')
+    first_line_end = block.find(b'\n')
+    if first_line_end != -1:
+        # fast path, all lines have the same length, the block can be used as it is
+        stride = first_line_end + 1
+        buf = block + b'\n'
+        if len(buf) % stride == 0:
+            chars = np.frombuffer(buf, dtype='S1').reshape(-1, stride)
+            if (chars[:, -1] == b'\n').all():
+                return chars
+    lines = block.splitlines()
+    width = max(len(line) for line in lines)
+    buf = b''.join(line.ljust(width) for line in lines)
+    return np.frombuffer(buf, dtype='S1').reshape(len(lines), width)
+
+
+def fixed_width_fields(chars, start, width, count, dtype):
+    ''' converts count consecutive fields of the given width starting at
+    character start of every line into an array of shape (lines, count)
+    '''
+    stop = start + width * count
+    if chars.shape[1] < stop:
+        chars = np.hstack((chars, np.full((chars.shape[0], stop - chars.shape[1]), b' ', dtype='S1')))
+    fields = np.ascontiguousarray(chars[:, start:stop]).view('S{}'.format(width))
+    return fields.astype(dtype).reshape(-1, count)
+
+
+def parse_node_block(block):
+    chars = fixed_width_chars(block)
+    ids = fixed_width_fields(chars, NODE_ID_COLUMNS[0], NODE_ID_COLUMNS[1] - NODE_ID_COLUMNS[0], 1, np.int64)
+    coords = fixed_width_fields(chars, VALUE_START, VALUE_WIDTH, 3, np.float64)
+    return ids.ravel(), coords
+
+
+def parse_element_block(block):
+    ''' returns a dict FreeCAD element key --> (element ids, connectivity)
+    the connectivity is already in FreeCAD node order
+    '''
+    elements = {}
+    chars = fixed_width_chars(block)
+    if not len(chars):
+        return elements
+    kind = np.ascontiguousarray(chars[:, 1:3]).view('S2').ravel()
+    header = np.flatnonzero(kind == b'-1')
+    ele_ids = fixed_width_fields(chars[header], 4, 9, 1, np.int64).ravel()
+    ele_types = fixed_width_fields(chars[header], 14, 4, 1, np.int64).ravel()
+    for ele_type in np.unique(ele_types).tolist():
+        if ele_type not in FRD_ELEMENT_TYPES:
+            FreeCAD.Console.PrintWarning('FEM: frd element type {} is not supported.\n'.format(ele_type))
+            continue
+        key, node_count, node_order = FRD_ELEMENT_TYPES[ele_type]
+        selection = ele_types == ele_type
+        first_lines = header[selection] + 1
+        nodes = fixed_width_fields(
+            chars[first_lines],
+            ELEMENT_NODE_START,
+            ELEMENT_NODE_WIDTH,
+            min(node_count, ELEMENT_NODES_PER_LINE),
+            np.int64
+        )
+        if node_count > ELEMENT_NODES_PER_LINE:
+            # hexa20 and penta15 continue on a second -2 line
+            second = fixed_width_fields(
+                chars[first_lines + 1],
+                ELEMENT_NODE_START,
+                ELEMENT_NODE_WIDTH,
+                node_count - ELEMENT_NODES_PER_LINE,
+                np.int64
+            )
+            nodes = np.hstack((nodes, second))
+        elements[key] = (ele_ids[selection], nodes[:, node_order])
+    return elements
+
+
+def binary_node_dtype(node_format):
+    coords_type = '<f4' if node_format == FRD_FORMAT_BINARY else '<f8'
+    return np.dtype([('id', '<i4'), ('coords', coords_type, (3, ))])
+
+
+def binary_result_dtype(stored_value_count):
+    return np.dtype([('id', '<i4'), ('values', '<f4', (stored_value_count, ))])
+
+
+def binary_element_offsets(data, start, count):
+    ''' returns the offsets (in ints from start) and the types of the binary element records
+    '''
+    first_type = int(np.frombuffer(data, BINARY_INT_DTYPE, BINARY_ELEMENT_HEADER_INTS, start)[1])
+    if first_type not in FRD_ELEMENT_TYPES:
+        raise ValueError('FEM: frd element type {} is not supported.'.format(first_type))
+    record_ints = BINARY_ELEMENT_HEADER_INTS + FRD_ELEMENT_TYPES[first_type][1]
+    if start + count * record_ints * BINARY_INT_DTYPE.itemsize <= len(data):
+        # fast path, all elements have the type of the first one
+        records = np.frombuffer(data, BINARY_INT_DTYPE, count * record_ints, start).reshape(count, record_ints)
+        if (records[:, 1] == first_type).all():
+            offsets = np.arange(count, dtype=np.int64) * record_ints
+            return offsets, np.full(count, first_type, dtype=np.int64)
+    # mixed element types, the records have to be walked one by one
+    offsets = np.zeros(count, dtype=np.int64)
+    types = np.zeros(count, dtype=np.int64)
+    offset = 0
+    for i in range(count):
+        ele_type = struct.unpack_from('<i', data, start + (offset + 1) * BINARY_INT_DTYPE.itemsize)[0]
+        if ele_type not in FRD_ELEMENT_TYPES:
+            raise ValueError('FEM: frd element type {} is not supported.'.format(ele_type))
+        offsets[i] = offset
+        types[i] = ele_type
+        offset += BINARY_ELEMENT_HEADER_INTS + FRD_ELEMENT_TYPES[ele_type][1]
+    return offsets, types
+
+
+def binary_element_block_size(data, start, count):
+    if count == 0:
+        return 0
+    offsets, types = binary_element_offsets(data, start, count)
+    last_ints = BINARY_ELEMENT_HEADER_INTS + FRD_ELEMENT_TYPES[int(types[-1])][1]
+    return int(offsets[-1] + last_ints) * BINARY_INT_DTYPE.itemsize
+
+
+def parse_binary_node_block(data, start, end, node_format):
+    dtype = binary_node_dtype(node_format)
+    count = (end - start) // dtype.itemsize
+    records = np.frombuffer(data, dtype, count, start)
+    return records['id'].astype(np.int64), records['coords'].astype(np.float64)
+
+
+def parse_binary_element_block(data, start, count):
+    elements = {}
+    if count == 0:
+        return elements
+    offsets, types = binary_element_offsets(data, start, count)
+    ints = np.frombuffer(data, BINARY_INT_DTYPE, binary_element_block_size(data, start, count) // BINARY_INT_DTYPE.itemsize, start)
+    for ele_type in np.unique(types).tolist():
+        key, node_count, node_order = FRD_ELEMENT_TYPES[ele_type]
+        selection = offsets[types == ele_type]
+        node_columns = BINARY_ELEMENT_HEADER_INTS + np.array(node_order, dtype=np.int64)
+        nodes = ints[selection[:, None] + node_columns].astype(np.int64)
+        elements[key] = (ints[selection].astype(np.int64), nodes)
+    return elements
+
+
+def parse_binary_result_block(data, start, end, value_count, stored_value_count):
+    dtype = binary_result_dtype(stored_value_count)
+    records = np.frombuffer(data, dtype, (end - start) // dtype.itemsize, start)
+    return records['id'].astype(np.int64), records['values'][:, :value_count].astype(np.float64)
+
+
+def parse_result_block(block, value_count):
+    chars = fixed_width_chars(block)
+    ids = fixed_width_fields(chars, NODE_ID_COLUMNS[0], NODE_ID_COLUMNS[1] - NODE_ID_COLUMNS[0], 1, np.int64)
+    values = fixed_width_fields(chars, VALUE_START, VALUE_WIDTH, value_count, np.float64)
+    return ids.ravel(), values
+
+
+def header_format(line):
+    ''' the format flag is the last entry of the 2C, 3C and 100CL block header lines
+    '''
+    try:
+        return int(line.split()[-1])
+    except (IndexError, ValueError):
+        return 1
+
+
+def result_type_of_header(line):
+    for name, key, value_count in FRD_RESULT_TYPES:
+        if line[5:5 + len(name)] == name:
+            return key, value_count
+    return None
+
+
+def finish_result(key, ids, values, inout_nodes):
+    ''' converts the raw frd values of one result block into FreeCAD conventions
+    '''
+    if key in ('stress', 'strain'):
+        # CalculiX frd files: (Sxx, Syy, Szz, Sxy, Syz, Szx)
+        # FreeCAD:            (Sxx, Syy, Szz, Sxy, Sxz, Syz)
+        # thus exchange the last two entries
+        values = values[:, (0, 1, 2, 3, 5, 4)]
+    elif values.shape[1] == 1:
+        values = values[:, 0]
+    if key == 'mflow':
+        values = values * 1000  # convert units to kg/s from t/s
+    if inout_nodes and key in ('mflow', 'npressure'):
+        # the in and out node gets the value of the node they are connected with
+        # they are inserted right after it to get the same order as in the line reader
+        inout = [(int(n[1]), int(n[2])) for n in inout_nodes]
+        rows = []
+        extra_ids = []
+        for i, node in enumerate(ids.tolist()):
+            rows.append(i)
+            extra_ids.append(node)
+            for connected, inout_node in inout:
+                if node == connected:
+                    rows.append(i)
+                    extra_ids.append(inout_node)
+        ids = np.array(extra_ids, dtype=np.int64)
+        values = values[rows]
+    return ids, values
+
+
+def apply_inout_nodes_seg3(seg3, inout_nodes):
+    ''' seg3 of 1D flow networks get the in and out nodes instead of the
+    middle node, seg3 without in or out node are not used
+    '''
+    ids, nodes = seg3
+    inout = [(int(n[1]), int(n[2])) for n in inout_nodes]
+    new_ids = []
+    new_nodes = []
+    for ele, (nd1, nd2, nd3) in zip(ids.tolist(), nodes.tolist()):
+        found = None
+        for connected, inout_node in inout:
+            if nd1 == connected:
+                found = (inout_node, nd3, nd1)  # fluid inlet node numbering
+            elif nd3 == connected:
+                found = (nd1, inout_node, nd3)  # fluid outlet node numbering
+        if found:
+            new_ids.append(ele)
+            new_nodes.append(found)
+    return np.array(new_ids, dtype=np.int64), np.array(new_nodes, dtype=np.int64).reshape(-1, 3)
+
+
+@contextlib.contextmanager
+def open_frd_data(frd_input):
+    ''' memory maps the frd file, the data is only read by the operating
+    system if a part of it is accessed
+    '''
+    with open(frd_input, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+        else:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield data
+            finally:
+                data.close()
+
+
+def scan_frd(data):
+    ''' one pass over the frd data, only the header lines are looked at,
+    the data records are skipped by searching for the next -3 line
+
+    returns a dict with the byte ranges (start, end, binary) of the data records
+        'Nodes': list of node block ranges
+        'Elements': list of element block ranges
+        'Results': list of dicts with 'number', 'time' and
+                   result key --> (value count, start, end, binary)
+    binary is None for ascii blocks, the format flag for binary node blocks, the number of
+    elements for binary element blocks and the number of stored values per node for binary result blocks
+    The result sets are grouped into steps the same way
+    importCcxFrdResults.read_frd_result() does it.
+    '''
+    node_blocks = []
+    element_blocks = []
+    results = []
+    mode_results = {'number': float('NaN'), 'time': float('NaN')}
+
+    section = None  # 'nodes', 'elements', (result key, value count) or None
+    section_range = None
+    binary_count = None  # number of binary result records of the current block
+    binary_components = 0
+    binary_stored = 0
+    node_element_section = False
+    end_of_section_found = False
+    end_of_frd_data_found = False
+    mode_time_found = False
+    eigenmode = 0
+    timestep = 0
+
+    size = len(data)
+    pos = 0
+    while pos < size:
+        line_end = data.find(b'\n', pos)
+        if line_end == -1:
+            line_end = size
+        raw_line = data[pos:line_end]
+
+        if raw_line[1:3] in (b'-1', b'-2'):
+            # data records, they end before the next -3 line
+            block_end = data.find(b'\n -3', pos)
+            if block_end == -1:
+                block_end = size
+            section_range = (pos, block_end, None)
+            pos = block_end + 1
+            continue
+        pos = line_end + 1
+
+        line = raw_line.decode('latin-1')
+        mode_eigen_changed = False
+        mode_time_changed = False
+
+        # Check for the beginning of a section
+        if line[4:6] == "2C":
+            section = 'nodes'
+        elif line[4:6] == "3C":
+            section = 'elements'
+        elif line[1:3] == "-4":
+            section = result_type_of_header(line)
+
+        # binary data records directly follow the header lines, they are skipped by their size
+        binary_range = None
+        if line[4:6] in ("2C", "3C") and header_format(line) >= FRD_FORMAT_BINARY:
+            count = int(line[24:36])
+            if section == 'nodes':
+                node_format = header_format(line)
+                binary_range = (pos, pos + count * binary_node_dtype(node_format).itemsize, node_format)
+            else:
+                binary_range = (pos, pos + binary_element_block_size(data, pos, count), count)
+        if line[2:7] == "100CL" and header_format(line) >= FRD_FORMAT_BINARY:
+            binary_count = int(line[24:36])
+        if binary_count is not None:
+            if line[1:3] == "-4":
+                binary_components = int(line[13:18])
+                binary_stored = 0
+            elif line[1:3] == "-5":
+                # components with the exist flag 1 (like ALL) are calculated, not stored
+                binary_components -= 1
+                if line[33:38].strip() != '1':
+                    binary_stored += 1
+                if binary_components == 0:
+                    block_size = binary_count * binary_result_dtype(binary_stored).itemsize
+                    binary_range = (pos, pos + block_size, binary_stored)
+        if binary_range is not None:
+            section_range = binary_range
+            pos = binary_range[1]
+
+        # Check if we found new eigenmode line
+        if line[5:10] == "PMODE":
+            eigentemp = int(line[30:36])
+            if eigentemp > eigenmode:
+                eigenmode = eigentemp
+                mode_eigen_changed = True
+
+        # Check if we found new time step
+        if line[4:10] == "1PSTEP":
+            mode_time_found = True
+        if mode_time_found and (line[2:7] == "100CL"):
+            timetemp = float(line[13:25])
+            if timetemp > timestep:
+                timestep = timetemp
+                mode_time_changed = True
+
+        # Check if we found the end of a section
+        if line[1:3] == "-3":
+            end_of_section_found = True
+            if section_range is None:
+                # section without data records
+                section_range = (pos, pos, None)
+            if section == 'nodes':
+                node_blocks.append(section_range)
+                node_element_section = True
+            elif section == 'elements':
+                element_blocks.append(section_range)
+                node_element_section = True
+            elif section is not None:
+                key, value_count = section
+                mode_results[key] = (value_count, ) + section_range
+                node_element_section = False
+            section = None
+            section_range = None
+            binary_count = None
+
+        # Check if we found the end of frd data
+        if line[1:5] == "9999":
+            end_of_frd_data_found = True
+
+        if (mode_eigen_changed or mode_time_changed or end_of_frd_data_found) and end_of_section_found and not node_element_section:
+            # append mode_results to results and reset mode_result
+            results.append(mode_results)
+            mode_results = {'number': float('NaN'), 'time': float('NaN')}
+            end_of_section_found = False
+
+        # on changed --> write changed values in mode_result
+        if mode_eigen_changed:
+            mode_results['number'] = eigenmode
+        if mode_time_changed:
+            mode_results['time'] = timestep
+            mode_time_found = False
+
+    return {
+        'Nodes': node_blocks,
+        'Elements': element_blocks,
+        'Results': results
+    }
+
+
+def parse_mesh(data, frd_index, inout_nodes):
+    node_ids = np.zeros(0, dtype=np.int64)
+    node_coords = np.zeros((0, 3), dtype=np.float64)
+    for start, end, binary in frd_index['Nodes']:
+        if binary is None:
+            ids, coords = parse_node_block(data[start:end])
+        else:
+            ids, coords = parse_binary_node_block(data, start, end, binary)
+        node_ids = np.concatenate((node_ids, ids))
+        node_coords = np.vstack((node_coords, coords))
+    elements = {}
+    for start, end, binary in frd_index['Elements']:
+        if binary is None:
+            block_elements = parse_element_block(data[start:end])
+        else:
+            block_elements = parse_binary_element_block(data, start, binary)
+        for key, value in block_elements.items():
+            if key in elements:
+                value = (
+                    np.concatenate((elements[key][0], value[0])),
+                    np.vstack((elements[key][1], value[1]))
+                )
+            elements[key] = value
+    if 'Seg3Elem' in elements and inout_nodes:
+        elements['Seg3Elem'] = apply_inout_nodes_seg3(elements['Seg3Elem'], inout_nodes)
+    return (node_ids, node_coords), elements
+
+
+def parse_result(data, result_range, key, inout_nodes):
+    value_count, start, end, binary = result_range
+    if binary is None:
+        ids, values = parse_result_block(data[start:end], value_count)
+    else:
+        ids, values = parse_binary_result_block(data, start, end, value_count, binary)
+    return finish_result(key, ids, values, inout_nodes)
+
+
+def parse_result_set(data, index_set, inout_nodes, keys=None):
+    result_set = {}
+    for key, value in index_set.items():
+        if key in ('number', 'time'):
+            result_set[key] = value
+        elif keys is None or key in keys:
+            result_set[key] = parse_result(data, value, key, inout_nodes)
+    return result_set
+
+
+def check_frd_data(frd_arrays, inout_nodes):
+    if not inout_nodes:
+        if frd_arrays['Results']:
+            if 'mflow' in frd_arrays['Results'][0] or 'npressure' in frd_arrays['Results'][0]:
+                FreeCAD.Console.PrintError('We have mflow or npressure, but no inout_nodes file.\n')
+    if not len(frd_arrays['Nodes'][0]):
+        FreeCAD.Console.PrintError('FEM: No nodes found in Frd file.\n')
+
+
+def read_frd_arrays(frd_input):
+    ''' reads a CalculiX frd file (ascii or binary) into numpy arrays
+
+    returns a dict with
+        'Nodes': (node ids, coordinates (N, 3))
+        'Elements': FreeCAD element key --> (element ids, connectivity (E, nodes))
+        'Results': list of dicts with 'number', 'time' and
+                   result key --> (node ids, values (N, count) or (N,))
+    '''
+    FreeCAD.Console.PrintMessage('Read ccx results from frd file: {}\n'.format(frd_input))
+    inout_nodes = read_inout_nodes(frd_input)
+    with open_frd_data(frd_input) as data:
+        frd_index = scan_frd(data)
+        nodes, elements = parse_mesh(data, frd_index, inout_nodes)
+        results = [parse_result_set(data, index_set, inout_nodes) for index_set in frd_index['Results']]
+    frd_arrays = {
+        'Nodes': nodes,
+        'Elements': elements,
+        'Results': results
+    }
+    check_frd_data(frd_arrays, inout_nodes)
+    return frd_arrays
+
+
+def arrays_set_to_result_set(arrays_set):
+    result_value_types = {'disp': 'vector'}
+    result_set = {}
+    for key, value in arrays_set.items():
+        if key in ('number', 'time'):
+            result_set[key] = value
+        else:
+            result_set[key] = FrdArrayDict(value[0], value[1], result_value_types.get(key))
+    return result_set
+
+
+def frd_arrays_to_result(frd_arrays):
+    ''' returns the dict structure of importCcxFrdResults.read_frd_result()
+    the dicts are FrdArrayDict, they are only filled on first access
+    '''
+    empty_elements = (np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.int64))
+    m = {'Nodes': FrdArrayDict(frd_arrays['Nodes'][0], frd_arrays['Nodes'][1], 'vector')}
+    for key in FEM_ELEMENT_KEYS:
+        ids, nodes = frd_arrays['Elements'].get(key, empty_elements)
+        m[key] = FrdArrayDict(ids, nodes)
+    m['Results'] = [arrays_set_to_result_set(arrays_set) for arrays_set in frd_arrays['Results']]
+    return m
+
+
+def read_frd_result(frd_input):
+    ''' drop in replacement for importCcxFrdResults.read_frd_result()
+    '''
+    return frd_arrays_to_result(read_frd_arrays(frd_input))
+
+
+class FrdStepIndex(object):
+    """ Streaming access to the result steps of a frd file.
+
+    On creation the file is scanned once and only the byte offsets of the
+    mesh and of every result block are kept. The values of a step are read
+    from the file if they are asked for, thus a single step out of hundreds
+    can be looked at without holding all of them in memory.
+
+    index = FrdStepIndex('/tmp/FEMWB/FEMMeshGmsh.frd')
+    len(index)  # number of steps
+    index.get_step_info(249)  # {'number': ..., 'time': ..., 'results': ['disp', 'stress']}
+    ids, disp = index.get_result_arrays(249, 'disp')
+    result_set = index.get_result_set(249)  # same as read_frd_result()['Results'][249]
+    """
+
+    def __init__(self, frd_input):
+        FreeCAD.Console.PrintMessage('Index ccx results in frd file: {}\n'.format(frd_input))
+        self.frd_input = frd_input
+        self.inout_nodes = read_inout_nodes(frd_input)
+        with open_frd_data(frd_input) as data:
+            self.index = scan_frd(data)
+        self._mesh = None
+        if not self.inout_nodes and self.index['Results']:
+            if 'mflow' in self.index['Results'][0] or 'npressure' in self.index['Results'][0]:
+                FreeCAD.Console.PrintError('We have mflow or npressure, but no inout_nodes file.\n')
+
+    def __len__(self):
+        return len(self.index['Results'])
+
+    def get_step_info(self, step):
+        index_set = self.index['Results'][step]
+        return {
+            'number': index_set['number'],
+            'time': index_set['time'],
+            'results': sorted(key for key in index_set.keys() if key not in ('number', 'time'))
+        }
+
+    def get_mesh_arrays(self):
+        ''' returns the nodes and elements as in read_frd_arrays(), they are cached
+        '''
+        if self._mesh is None:
+            with open_frd_data(self.frd_input) as data:
+                self._mesh = parse_mesh(data, self.index, self.inout_nodes)
+            if not len(self._mesh[0][0]):
+                FreeCAD.Console.PrintError('FEM: No nodes found in Frd file.\n')
+        return self._mesh
+
+    def get_mesh(self):
+        ''' returns the mesh part of read_frd_result(), usable for importToolsFem.make_femmesh()
+        '''
+        nodes, elements = self.get_mesh_arrays()
+        m = frd_arrays_to_result({'Nodes': nodes, 'Elements': elements, 'Results': []})
+        del m['Results']
+        return m
+
+    def get_result_arrays(self, step, key):
+        ''' returns (node ids, values) of one result type of one step
+        '''
+        index_set = self.index['Results'][step]
+        if key not in index_set or key in ('number', 'time'):
+            raise KeyError('FEM: No {} results in step {} of {}'.format(key, step, self.frd_input))
+        with open_frd_data(self.frd_input) as data:
+            return parse_result(data, index_set[key], key, self.inout_nodes)
+
+    def get_result_arrays_set(self, step, keys=None):
+        ''' returns one result set as in read_frd_arrays(), keys limits the result types read
+        '''
+        with open_frd_data(self.frd_input) as data:
+            return parse_result_set(data, self.index['Results'][step], self.inout_nodes, keys)
+
+    def get_result_set(self, step, keys=None):
+        ''' returns one result set as in read_frd_result(), keys limits the result types read
+        '''
+        return arrays_set_to_result_set(self.get_result_arrays_set(step, keys))
+
+    def iter_result_sets(self, keys=None):
+        ''' yields the result sets one after the other, only one is held in memory
+        '''
+        for step in range(len(self)):
+            yield self.get_result_set(step, keys)
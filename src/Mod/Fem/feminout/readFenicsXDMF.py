@@ -29,14 +29,98 @@ __url__ = "http://www.freecadweb.org"
 #  \brief FreeCAD Fenics Mesh XDMF reader for FEM workbench
 
 import FreeCAD
+from xml.etree import ElementTree as ET
+import numpy as np
+import os
+from .readCcxFrd import FrdArrayDict
+
+
+# lower case Fenics XDMF topology type --> FreeCAD element key
+Fenics_XDMF_to_FreeCAD_dict = {
+    "polyline": "Seg2Elem",
+    "edge_3": "Seg3Elem",
+    "triangle": "Tria3Elem",
+    "tri_6": "Tria6Elem",
+    "triangle_6": "Tria6Elem",
+    "quadrilateral": "Quad4Elem",
+    "quad_8": "Quad8Elem",
+    "quadrilateral_8": "Quad8Elem",
+    "tetrahedron": "Tetra4Elem",
+    "tet_10": "Tetra10Elem",
+    "tetrahedron_10": "Tetra10Elem",
+    "hexahedron": "Hexa8Elem",
+    "hex_20": "Hexa20Elem",
+    "hexahedron_20": "Hexa20Elem",
+}
+
+
+def get_dataitem_dtype(dataitem):
+    number_type = dataitem.get("NumberType", dataitem.get("DataType", "Float"))
+    precision = dataitem.get("Precision", "4")
+    kind = {"Float": "f", "Int": "i", "UInt": "u", "Char": "i", "UChar": "u"}[number_type]
+    if number_type in ("Char", "UChar"):
+        precision = "1"
+    endian = {"Little": "<", "Big": ">"}.get(dataitem.get("Endian"), "=")
+    return np.dtype(endian + kind + precision)
+
+
+def read_dataitem(dataitem, xdmfdir):
+    '''
+        Returns the array of a DataItem. The data of the XML and HDF
+        formats is read, raw binary data files are memory mapped.
+    '''
+    shape = tuple(int(d) for d in dataitem.get("Dimensions").split())
+    dtype = get_dataitem_dtype(dataitem)
+    data_format = dataitem.get("Format", "XML")
+    text = dataitem.text.strip() if dataitem.text else ""
+    if data_format == "XML":
+        return np.fromstring(text, dtype=np.float64, sep=" ").astype(dtype.newbyteorder("=")).reshape(shape)
+    elif data_format == "Binary":
+        offset = int(dataitem.get("Seek", "0"))
+        return np.memmap(os.path.join(xdmfdir, text), dtype=dtype, mode="r", offset=offset, shape=shape)
+    elif data_format == "HDF":
+        import h5py
+        (filename, path) = text.split(":", 1)
+        filename = os.path.join(xdmfdir, filename)
+        with h5py.File(filename, "r") as h5file:
+            dataset = h5file[path]
+            offset = dataset.id.get_offset()
+            if offset is not None and dataset.compression is None:
+                # contiguous datasets are memory mapped like raw binary data
+                return np.memmap(filename, dtype=dataset.dtype, mode="r", offset=offset, shape=dataset.shape)
+            return dataset[()].reshape(shape)
+    raise ValueError("DataItem format %s is not supported" % (data_format,))
 
 
 def read_fenics_mesh_xdmf(xdmffilename):
+    '''
+        Returns element dictionary to be evaluated by make_femmesh later.
+        Only the first grid is read, the grids of the mesh functions are skipped.
+        The dicts are backed by the node and element arrays, see readCcxFrd.FrdArrayDict.
+    '''
+    mesh_data = {
+        'Nodes': {},
+        'Hexa8Elem': {}, 'Penta6Elem': {}, 'Tetra4Elem': {}, 'Tetra10Elem': {},
+        'Penta15Elem': {}, 'Hexa20Elem': {}, 'Tria3Elem': {}, 'Tria6Elem': {},
+        'Quad4Elem': {}, 'Quad8Elem': {}, 'Seg2Elem': {}, 'Seg3Elem': {}
+    }
+    xdmfdir = os.path.dirname(os.path.abspath(xdmffilename))
+    grid = ET.parse(xdmffilename).getroot().find("Domain/Grid")
+    if grid is None:
+        FreeCAD.Console.PrintError("No grid found in XDMF file.\n")
+        return mesh_data
 
-    FreeCAD.Console.PrintMessage("Not operational, yet\n")
+    geometry = read_dataitem(grid.find("Geometry/DataItem"), xdmfdir)
+    points = np.zeros((len(geometry), 3), dtype=np.float64)
+    points[:, :geometry.shape[1]] = geometry
+    # Fenics numbers the nodes and the cells from 0
+    mesh_data['Nodes'] = FrdArrayDict(np.arange(1, len(points) + 1), points, 'vector')
 
-    return {'Nodes': {},
-            'Hexa8Elem': {}, 'Penta6Elem': {}, 'Tetra4Elem': {}, 'Tetra10Elem': {},
-            'Penta15Elem': {}, 'Hexa20Elem': {}, 'Tria3Elem': {}, 'Tria6Elem': {},
-            'Quad4Elem': {}, 'Quad8Elem': {}, 'Seg2Elem': {}
-            }
+    topology_node = grid.find("Topology")
+    topology_type = topology_node.get("TopologyType", "").lower()
+    if topology_type not in Fenics_XDMF_to_FreeCAD_dict:
+        FreeCAD.Console.PrintError("Topology type %s not supported.\n" % (topology_type,))
+        return mesh_data
+    topology = read_dataitem(topology_node.find("DataItem"), xdmfdir).astype(np.int64) + 1
+    mesh_data[Fenics_XDMF_to_FreeCAD_dict[topology_type]] = FrdArrayDict(np.arange(1, len(topology) + 1), topology)
+    return mesh_data
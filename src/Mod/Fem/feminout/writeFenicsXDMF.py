@@ -29,6 +29,7 @@ from .importToolsFem import \
     get_FemMeshObjectMeshGroups
 from xml.etree import ElementTree as ET  # parsing xml files and exporting
 import numpy as np
+import os
 
 
 __title__ = "FreeCAD Fenics XDMF mesh writer"
@@ -41,6 +42,7 @@ __url__ = "http://www.freecadweb.org"
 
 ENCODING_ASCII = 'ASCII'
 ENCODING_HDF5 = 'HDF5'
+ENCODING_BINARY = 'Binary'
 
 FreeCAD_Group_Dimensions = {
     "Vertex": 0,
@@ -67,10 +69,76 @@ def numpy_array_to_str(npa):
     res = ""
     dt = str(npa.dtype)
     if 'int' in dt:
-        res = "\n".join([" ".join([("%d" % s) for s in a]) for a in npa.tolist()])
+        fmt = "%d"
     elif 'float' in dt:
-        res = "\n".join([" ".join([("%3.6f" % s) for s in a]) for a in npa.tolist()])
-    return res
+        fmt = "%3.6f"
+    else:
+        return res
+    if npa.size == 0:
+        return res
+    (rows, cols) = np.shape(npa)
+    # one formatting operation for the whole array
+    line = " ".join([fmt] * cols)
+    return "\n".join([line] * rows) % tuple(npa.ravel().tolist())
+
+
+class XDMFHeavyData(object):
+    """
+        Writes the DataItems of a XDMF file. With ENCODING_ASCII the data is the
+        text of the DataItem. With ENCODING_HDF5 the data is stored in chunked
+        and compressed datasets of a HDF5 file next to the XDMF file, with
+        ENCODING_BINARY as raw little endian data in a binary file next to the
+        XDMF file. The DataItems reference the datasets or the file offsets.
+    """
+
+    def __init__(self, outputfile, encoding=ENCODING_ASCII):
+        self.encoding = encoding
+        self.heavyfile = None
+        self.heavy = None
+        self.count = 0
+        if encoding != ENCODING_ASCII and outputfile is None:
+            raise ValueError("XDMF encoding %s needs the output file for its data file" % (encoding,))
+        if encoding == ENCODING_HDF5:
+            import h5py
+            self.heavyfile = os.path.splitext(outputfile)[0] + ".h5"
+            self.heavy = h5py.File(self.heavyfile, "w")
+        elif encoding == ENCODING_BINARY:
+            self.heavyfile = os.path.splitext(outputfile)[0] + ".bin"
+            self.heavy = open(self.heavyfile, "wb")
+        elif encoding != ENCODING_ASCII:
+            raise ValueError("Unknown XDMF encoding: %s" % (encoding,))
+
+    def add_dataitem(self, parentnode, npa, name="data"):
+        if 'int' in str(npa.dtype):
+            (numbertype, npa) = ("Int", npa.astype("<i8"))
+        else:
+            (numbertype, npa) = ("Float", npa.astype("<f8"))
+        dataitem = ET.SubElement(parentnode, "DataItem", Dimensions="%d %d" % np.shape(npa),
+                                 NumberType=numbertype, Precision="8")
+        if self.encoding == ENCODING_ASCII:
+            dataitem.set("Format", "XML")
+            dataitem.text = numpy_array_to_str(npa)
+        elif self.encoding == ENCODING_HDF5:
+            # datasets are named uniquely, groups may have the same name
+            self.count += 1
+            path = "/%s_%d" % (name, self.count)
+            chunks = (max(1, min(len(npa), 65536)), np.shape(npa)[1]) if npa.size else None
+            self.heavy.create_dataset(path, data=npa, chunks=chunks,
+                                      compression="gzip" if npa.size else None, shuffle=bool(npa.size))
+            dataitem.set("Format", "HDF")
+            dataitem.text = "%s:%s" % (os.path.basename(self.heavyfile), path)
+        elif self.encoding == ENCODING_BINARY:
+            dataitem.set("Format", "Binary")
+            dataitem.set("Endian", "Little")
+            dataitem.set("Seek", "%d" % (self.heavy.tell(),))
+            self.heavy.write(np.ascontiguousarray(npa).tobytes())
+            dataitem.text = os.path.basename(self.heavyfile)
+        return dataitem
+
+    def close(self):
+        if self.heavy is not None:
+            self.heavy.close()
+            self.heavy = None
 
 
 def points_to_numpy(pts, dim=3):
@@ -81,10 +149,12 @@ def tuples_to_numpy(tpls, numbers_per_line):
     return np.array([list(t) for t in tpls])[:, :numbers_per_line]
 
 
-def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_ASCII):
+def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_ASCII, heavydata=None):
     """
         Writes either into hdf5 file or into open mesh file
     """
+    if heavydata is None:
+        heavydata = XDMFHeavyData(None, encoding)
 
     numnodes = fem_mesh_obj.FemMesh.NodeCount
 
@@ -98,16 +168,12 @@ def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_
 
     recalc_nodes_ind_dict = {}
 
-    if encoding == ENCODING_ASCII:
-        dataitem = ET.SubElement(geometrynode, "DataItem", Dimensions="%d %d" % (numnodes, effective_dim), Format="XML")
-        nodes = []
-        for (ind, (key, node)) in enumerate(list(fem_mesh_obj.FemMesh.Nodes.items())):
-            nodes.append(node)
-            recalc_nodes_ind_dict[key] = ind
-
-        dataitem.text = numpy_array_to_str(points_to_numpy(nodes, dim=effective_dim))
-    elif encoding == ENCODING_HDF5:
-        pass
+    nodes = []
+    for (ind, (key, node)) in enumerate(list(fem_mesh_obj.FemMesh.Nodes.items())):
+        nodes.append(node)
+        recalc_nodes_ind_dict[key] = ind
+    points = points_to_numpy(nodes, dim=effective_dim).reshape(numnodes, effective_dim)
+    heavydata.add_dataitem(geometrynode, points, name="geometry")
 
     return recalc_nodes_ind_dict
 
@@ -116,7 +182,10 @@ def write_fenics_mesh_codim_xdmf(fem_mesh_obj,
                                  topologynode,
                                  nodes_dict,
                                  codim=0,
-                                 encoding=ENCODING_ASCII):
+                                 encoding=ENCODING_ASCII,
+                                 heavydata=None):
+    if heavydata is None:
+        heavydata = XDMFHeavyData(None, encoding)
     mesh_dimension = get_FemMeshObjectDimension(fem_mesh_obj)
 
     element_types = get_FemMeshObjectElementTypes(fem_mesh_obj, remove_zero_element_entries=True)
@@ -150,27 +219,21 @@ def write_fenics_mesh_codim_xdmf(fem_mesh_obj,
 
     nodeindices = [(nodes_dict[ind] for ind in fem_mesh_obj.FemMesh.getElementNodes(fc_topo_ind)) for (fen_ind, fc_topo_ind) in enumerate(fc_topo)]
 
-    if encoding == ENCODING_ASCII:
-        dataitem = ET.SubElement(topologynode, "DataItem", NumberType="UInt", Dimensions="%d %d" % (num_topo, nodes_per_element), Format="XML")
-        dataitem.text = numpy_array_to_str(tuples_to_numpy(nodeindices, nodes_per_element))
-    elif encoding == ENCODING_HDF5:
-        pass
+    topology = tuples_to_numpy(nodeindices, nodes_per_element).reshape(len(nodeindices), nodes_per_element)
+    dataitem = heavydata.add_dataitem(topologynode, topology, name="topology")
+    dataitem.set("NumberType", "UInt")
 
     return fc_topo
 
 
-def write_fenics_mesh_scalar_cellfunctions(name, cell_array, attributenode, encoding=ENCODING_ASCII):
+def write_fenics_mesh_scalar_cellfunctions(name, cell_array, attributenode, encoding=ENCODING_ASCII, heavydata=None):
+    if heavydata is None:
+        heavydata = XDMFHeavyData(None, encoding)
     attributenode.set("AttributeType", "Scalar")
     attributenode.set("Center", "Cell")
     attributenode.set("Name", name)
 
-    (num_cells, num_dims) = np.shape(cell_array)
-
-    if encoding == ENCODING_ASCII:
-        dataitem = ET.SubElement(attributenode, "DataItem", Dimensions="%d %d" % (num_cells, num_dims), Format="XML")
-        dataitem.text = numpy_array_to_str(cell_array)
-    elif encoding == ENCODING_HDF5:
-        pass
+    heavydata.add_dataitem(attributenode, cell_array, name="cellfunction")
 
 
 """
@@ -215,6 +278,8 @@ Example: mesh with two topologies and one mesh function for the facet one
 def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, group_values_dict={}, encoding=ENCODING_ASCII):
     """
         For the export of xdmf.
+        With ENCODING_HDF5 or ENCODING_BINARY the data is written into a
+        .h5 or .bin file next to the outputfile, see XDMFHeavyData.
     """
 
     FreeCAD_to_Fenics_dict = {
@@ -251,8 +316,9 @@ def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, group_values_dict={}, encod
 
     #####################################
     # write base topo and geometry
-    nodes_dict = write_fenics_mesh_points_xdmf(fem_mesh_obj, base_geometry, encoding=encoding)
-    write_fenics_mesh_codim_xdmf(fem_mesh_obj, base_topology, nodes_dict, codim=0, encoding=encoding)
+    heavydata = XDMFHeavyData(outputfile, encoding)
+    nodes_dict = write_fenics_mesh_points_xdmf(fem_mesh_obj, base_geometry, heavydata=heavydata)
+    write_fenics_mesh_codim_xdmf(fem_mesh_obj, base_topology, nodes_dict, codim=0, heavydata=heavydata)
     #####################################
 
     fem_mesh = fem_mesh_obj.FemMesh
@@ -275,7 +341,8 @@ def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, group_values_dict={}, encod
         mesh_function_topology_description = write_fenics_mesh_codim_xdmf(fem_mesh_obj,
                                                                           mesh_function_topology,
                                                                           nodes_dict,
-                                                                          codim=mesh_function_codim, encoding=encoding)
+                                                                          codim=mesh_function_codim,
+                                                                          heavydata=heavydata)
 
         mesh_function_geometry = ET.SubElement(mesh_function_grid, "Geometry", Reference="XML")
         mesh_function_geometry.text = "/Xdmf/Domain/Grid/Geometry"
@@ -295,9 +362,10 @@ def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, group_values_dict={}, encod
         topo_array = np.vstack((val_array,)).T
         write_fenics_mesh_scalar_cellfunctions(mesh_function_name,
                                                topo_array,
-                                               mesh_function_attribute, encoding=ENCODING_ASCII)
+                                               mesh_function_attribute, heavydata=heavydata)
 
     # TODO: improve cell functions support
+    heavydata.close()
 
     fp = open(outputfile, "wb")
     fp.write(b'''<?xml version="1.0"?>\n<!DOCTYPE Xdmf SYSTEM "Xdmf.dtd" []>\n''')
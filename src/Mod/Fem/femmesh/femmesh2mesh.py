@@ -28,6 +28,8 @@ __url__ = "http://www.freecadweb.org"
 #  \ingroup FEM
 
 import time
+import numpy as np
+from . import meshtools
 # import Mesh
 
 
@@ -73,6 +75,12 @@ pyraFaces = {      # pyra5 or pyra13 (ignoring mid-nodes)
     4: [2, 4, 3],
     5: [3, 4, 0]}
 
+triaFaces = {      # tria3 or tria6 (ignoring mid-nodes)
+    1: [0, 1, 2]}
+
+quadFaces = {      # quad4 or quad8 (ignoring mid-nodes)
+    1: [0, 1, 2, 3]}
+
 face_dicts = {
     4: tetFaces,
     5: pyraFaces,
@@ -83,117 +91,96 @@ face_dicts = {
     15: pentaFaces,
     20: hexaFaces}
 
+shell_face_dicts = {
+    3: triaFaces,
+    4: quadFaces,
+    6: triaFaces,
+    8: quadFaces}
+
+
+def get_face_templates(face_dict):
+    '''the faces of face_dict as index arrays, { number of face nodes : array with one row for each face }
+    '''
+    templates = {}
+    for key in sorted(face_dict):
+        face = face_dict[key]
+        templates.setdefault(len(face), []).append(face)
+    return {n: np.array(faces, dtype=np.int64) for n, faces in templates.items()}
 
-def femmesh_2_mesh(myFemMesh, myResults=None):
-    shiftBits = 20  # allows a million nodes, needs to be higher for more nodes in a FemMesh
 
-    # This code generates a dict and a faceCode for each face of all elements
-    # All faceCodes are than sorted.
+def get_boundary_faces(faces):
+    '''the faces which are only used once, a face is a row of node ids, the node order does not matter
+    '''
+    if not len(faces):
+        return faces
+    sorted_faces = np.sort(faces, axis=1)
+    unique_faces, inverse, counts = np.unique(sorted_faces, axis=0, return_inverse=True, return_counts=True)
+    return faces[counts[inverse.reshape(-1)] == 1]
 
-    start_time = time.clock()
-    faceCodeList = []
-    faceCodeDict = {}
 
+def femmesh_2_mesh(myFemMesh, myResults=None):
+    '''the surface of myFemMesh as a list of points, every three points are a triangle,
+    the points are [x, y, z] lists, Mesh.Mesh() takes the list as it is.
+    If myResults is given, the points are moved by the displacements of the results.
+    '''
+    # Every element is split into its faces by index templates for its number of nodes.
+    # A face which is used by two elements is inside the mesh, the faces used once are its surface.
+    # Faces are compared as rows of sorted node ids, there is no limit on the node ids.
+
+    start_time = time.time()
     if myFemMesh.VolumeCount > 0:
-        for ele in myFemMesh.Volumes:
-            element_nodes = myFemMesh.getElementNodes(ele)
-            # print('element_node: ', element_nodes)
-            faceDef = face_dicts[len(element_nodes)]
-
-            for key in faceDef:
-                nodeList = []
-                codeList = []
-                faceCode = 0
-                shifter = 0
-                for nodeIdx in faceDef[key]:
-                    nodeList.append(element_nodes[nodeIdx])
-                    codeList.append(element_nodes[nodeIdx])
-                codeList.sort()
-                for node in codeList:
-                    faceCode += (node << shifter)
-                    # x << n: x shifted left by n bits = Multiplication
-                    shifter += shiftBits
-                # print('codeList: ', codeList)
-                faceCodeDict[faceCode] = nodeList
-                faceCodeList.append(faceCode)
+        connectivity = meshtools.get_femelement_connectivity(myFemMesh, myFemMesh.Volumes)
+        dicts = face_dicts
     elif myFemMesh.FaceCount > 0:
-        for ele in myFemMesh.Faces:
-            element_nodes = myFemMesh.getElementNodes(ele)
-            # print('element_node: ', element_nodes)
-            faceDef = {1: [0, 1, 2]}
-
-            for key in faceDef:
-                nodeList = []
-                codeList = []
-                faceCode = 0
-                shifter = 0
-                for nodeIdx in faceDef[key]:
-                    nodeList.append(element_nodes[nodeIdx])
-                    codeList.append(element_nodes[nodeIdx])
-                codeList.sort()
-                for node in codeList:
-                    faceCode += (node << shifter)
-                    # x << n: x shifted left by n bits = Multiplication
-                    shifter += shiftBits
-                # print('codeList: ', codeList)
-                faceCodeDict[faceCode] = nodeList
-                faceCodeList.append(faceCode)
-
-    faceCodeList.sort()
-    allFaces = len(faceCodeList)
-    actFaceIdx = 0
-    singleFaces = []
-    # Here we search for faces, which do not have a counterpart.
-    # These are the faces on the surface of the mesh.
-    while actFaceIdx < allFaces:
-        if actFaceIdx < (allFaces - 1):
-            if faceCodeList[actFaceIdx] == faceCodeList[actFaceIdx + 1]:
-                actFaceIdx += 2
-            else:
-                # print('found a single Face: ', faceCodeList[actFaceIdx])
-                singleFaces.append(faceCodeList[actFaceIdx])
-                actFaceIdx += 1
+        connectivity = meshtools.get_femelement_connectivity(myFemMesh, myFemMesh.Faces)
+        dicts = shell_face_dicts
+    else:
+        return []
+
+    faces = {3: [], 4: []}
+    for length, (element_ids, element_nodes) in connectivity.items():
+        if length not in dicts:
+            print('elements with {} nodes are not supported'.format(length))
+            continue
+        for face_length, template in get_face_templates(dicts[length]).items():
+            faces[face_length].append(element_nodes[:, template].reshape(-1, face_length))
+
+    triangles = []
+    for face_length in (3, 4):
+        if not faces[face_length]:
+            continue
+        single_faces = get_boundary_faces(np.concatenate(faces[face_length]))
+        if face_length == 3:
+            triangles.append(single_faces)
         else:
-            print('found a last Face: ', faceCodeList[actFaceIdx])
-            singleFaces.append(faceCodeList[actFaceIdx])
-            actFaceIdx += 1
-
-    output_mesh = []
+            # quads are split into two triangles
+            triangles.append(single_faces[:, [0, 1, 2]])
+            triangles.append(single_faces[:, [2, 3, 0]])
+    if not triangles:
+        return []
+    triangles = np.concatenate(triangles)
+
+    # coordinates are needed for the surface nodes only
+    surface_nodes, corners = np.unique(triangles, return_inverse=True)
+    points = np.array(
+        [myFemMesh.getNodeById(n) for n in surface_nodes.tolist()],
+        dtype=np.float64
+    ).reshape(-1, 3)
     if myResults:
         print(myResults.Name)
-        for myFace in singleFaces:
-            face_nodes = faceCodeDict[myFace]
-            dispVec0 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[0])]
-            dispVec1 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[1])]
-            dispVec2 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[2])]
-            triangle = [myFemMesh.getNodeById(face_nodes[0]) + dispVec0,
-                        myFemMesh.getNodeById(face_nodes[1]) + dispVec1,
-                        myFemMesh.getNodeById(face_nodes[2]) + dispVec2]
-            output_mesh.extend(triangle)
-            # print('my triangle: ', triangle)
-            if len(face_nodes) == 4:
-                dispVec3 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[3])]
-                triangle = [myFemMesh.getNodeById(face_nodes[2]) + dispVec2,
-                            myFemMesh.getNodeById(face_nodes[3]) + dispVec3,
-                            myFemMesh.getNodeById(face_nodes[0]) + dispVec0]
-                output_mesh.extend(triangle)
-                # print('my 2. triangle: ', triangle)
-
-    else:
-        for myFace in singleFaces:
-            face_nodes = faceCodeDict[myFace]
-            triangle = [myFemMesh.getNodeById(face_nodes[0]),
-                        myFemMesh.getNodeById(face_nodes[1]),
-                        myFemMesh.getNodeById(face_nodes[2])]
-            output_mesh.extend(triangle)
-            # print('my triangle: ', triangle)
-            if len(face_nodes) == 4:
-                triangle = [myFemMesh.getNodeById(face_nodes[2]),
-                            myFemMesh.getNodeById(face_nodes[3]),
-                            myFemMesh.getNodeById(face_nodes[0])]
-                output_mesh.extend(triangle)
-                # print('my 2. triangle: ', triangle)
-
-    end_time = time.clock()
+        node_numbers = np.asarray(myResults.NodeNumbers, dtype=np.int64)
+        displacements = np.array(myResults.DisplacementVectors, dtype=np.float64).reshape(-1, 3)
+        missing = surface_nodes
+        if len(node_numbers):
+            order = np.argsort(node_numbers)
+            rows = np.searchsorted(node_numbers[order], surface_nodes)
+            rows = order[np.minimum(rows, len(order) - 1)]
+            missing = surface_nodes[node_numbers[rows] != surface_nodes]
+        if len(missing):
+            raise ValueError('No displacement for node {} in {}'.format(missing[0], myResults.Name))
+        points += displacements[rows]
+
+    output_mesh = points[corners.reshape(-1)].tolist()
+    end_time = time.time()
     print('Mesh by surface search method: ', end_time - start_time)
     return output_mesh
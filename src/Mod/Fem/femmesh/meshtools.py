@@ -28,6 +28,63 @@ __url__ = "http://www.freecadweb.org"
 #  @{
 
 import FreeCAD
+import numpy as np
+import threading
+from functools import partial
+from itertools import chain
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+class FemMeshLookupCache(object):
+    '''caches the geometry to mesh lookups of a femmesh
+    The node and element lookups of the reference shapes (getNodesByFace, getccxVolumesByFace, ...)
+    are done only once per shape. The cache is used instead of the femmesh,
+    all other attributes and methods are taken from the femmesh.
+    It should live for one writer run only, changes of the mesh or the shapes are not tracked.
+    '''
+
+    lookup_methods = (
+        'getNodesByVertex',
+        'getNodesByEdge',
+        'getNodesByFace',
+        'getNodesBySolid',
+        'getccxVolumesByFace'
+    )
+
+    def __init__(self, femmesh):
+        self.femmesh = femmesh
+        self.hits = 0
+        self.misses = 0
+        self._lookups = {}
+
+    def __getattr__(self, name):
+        # only called for attributes which are not found in the cache object
+        if name == 'femmesh':
+            raise AttributeError(name)
+        if name in self.lookup_methods:
+            return partial(self.lookup, name)
+        return getattr(self.femmesh, name)
+
+    def lookup(self, method_name, shape):
+        # the hashCode of a shape does not depend on the Python object of the shape, but could clash
+        key = (method_name, shape.ShapeType, shape.hashCode())
+        lookups = self._lookups.setdefault(key, [])
+        for cached_shape, result in lookups:
+            if cached_shape.isSame(shape):
+                self.hits += 1
+                return list(result)
+        self.misses += 1
+        result = getattr(self.femmesh, method_name)(shape)
+        lookups.append((shape, result))
+        return list(result)
+
+    def print_lookup_statistics(self):
+        FreeCAD.Console.PrintMessage(
+            'Mesh lookup cache: {} hits, {} misses\n'.format(self.hits, self.misses)
+        )
 
 
 def get_femnodes_by_femobj_with_references(femmesh, femobj):
@@ -119,6 +176,36 @@ def get_femelement_table(femmesh):
     return femelement_table
 
 
+def get_femelement_connectivity(femmesh, element_ids):
+    '''get_femelement_connectivity(femmesh, element_ids): { number of nodes : (element ids, node ids) }
+    the nodes of all elements are pulled in one pass, the elements are grouped by their number of nodes,
+    the node ids of each group are a matrix with one row for each element
+    '''
+    ele_nodes = [femmesh.getElementNodes(i) for i in element_ids]
+    lengths = np.fromiter((len(nodes) for nodes in ele_nodes), dtype=np.int64, count=len(ele_nodes))
+    nodes = np.fromiter(chain.from_iterable(ele_nodes), dtype=np.int64, count=int(lengths.sum()))
+    starts = np.cumsum(lengths) - lengths
+    ids = np.asarray(element_ids, dtype=np.int64)
+    connectivity = {}
+    for length in np.unique(lengths):
+        rows = lengths == length
+        connectivity[int(length)] = (ids[rows], nodes[starts[rows][:, None] + np.arange(length)])
+    return connectivity
+
+
+def get_femelement_table_by_connectivity(element_ids, connectivity):
+    '''get_femelement_table_by_connectivity(element_ids, connectivity): { elementid : ( nodeid, nodeid, ... , nodeid ) }
+    the femelement table in the order of element_ids made from the result of get_femelement_connectivity()
+    '''
+    ele_nodes = {}
+    for ids, nodes in connectivity.values():
+        ele_nodes.update(zip(ids.tolist(), map(tuple, nodes.tolist())))
+    femelement_table = {}
+    for i in element_ids:
+        femelement_table[i] = ele_nodes[i]
+    return femelement_table
+
+
 def get_femelement_volumes_table(femmesh):
     """ get_femelement_volumes_table(femmesh): { elementid : [ nodeid, nodeid, ... , nodeid ] }"""
     table = {}
@@ -173,6 +260,194 @@ def get_femnodes_ele_table(femnodes_mesh, femelement_table):
     return femnodes_ele_table
 
 
+class FemNodesElementsIndex(Mapping):
+    '''array based version of the femnodes_ele_table
+    the membership of the nodes in the elements is stored in CSR style:
+    the entries of the node node_ids[i] are entries offsets[i] up to offsets[i + 1],
+    every entry holds the row of the element in element_ids and the position of the node in the element.
+    The element rows are in femelement_table order, thus all results are in the order of the dict methods.
+    It can be used everywhere a femnodes_ele_table is used, it behaves like it if used as a dict.
+    '''
+
+    def __init__(self, femelement_table, femnodes_mesh=None):
+        ele_count = len(femelement_table)
+        self.element_ids = np.fromiter(femelement_table.keys(), dtype=np.int64, count=ele_count)
+        ele_nodes = list(femelement_table.values())
+        self.element_lengths = np.fromiter((len(nodes) for nodes in ele_nodes), dtype=np.int64, count=ele_count)
+        entry_count = int(self.element_lengths.sum())
+        nodes = np.fromiter(chain.from_iterable(ele_nodes), dtype=np.int64, count=entry_count)
+        ele_starts = np.cumsum(self.element_lengths) - self.element_lengths
+        ele_rows = np.repeat(np.arange(ele_count, dtype=np.int64), self.element_lengths)
+        positions = np.arange(entry_count, dtype=np.int64) - np.repeat(ele_starts, self.element_lengths)
+        # stable sort, the elements of a node stay in femelement_table order
+        order = np.argsort(nodes, kind='mergesort')
+        sorted_nodes = nodes[order]
+        if femnodes_mesh:
+            mesh_nodes = np.fromiter(femnodes_mesh.keys(), dtype=np.int64, count=len(femnodes_mesh))
+            self.node_ids = np.union1d(mesh_nodes, sorted_nodes)
+        else:
+            self.node_ids = np.unique(sorted_nodes)
+        self.offsets = np.append(np.searchsorted(sorted_nodes, self.node_ids), entry_count)
+        self.element_rows = ele_rows[order]
+        self.positions = positions[order]
+        FreeCAD.Console.PrintLog('len femnodes_ele_index: ' + str(len(self.node_ids)) + '\n')
+
+    def __getitem__(self, node):
+        row = self.get_node_rows([node])
+        if not len(row):
+            raise KeyError(node)
+        entries = slice(self.offsets[row[0]], self.offsets[row[0] + 1])
+        return [
+            [int(ele), 1 << int(pos)]
+            for ele, pos in zip(self.element_ids[self.element_rows[entries]], self.positions[entries])
+        ]
+
+    def __iter__(self):
+        return iter(self.node_ids.tolist())
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def get_node_rows(self, node_set):
+        '''rows in node_ids of the nodes of node_set, nodes which are not in the index are skipped
+        '''
+        nodes = np.asarray(list(node_set), dtype=np.int64)
+        rows = np.searchsorted(self.node_ids, nodes)
+        rows[rows == len(self.node_ids)] = 0
+        if len(self.node_ids):
+            return rows[self.node_ids[rows] == nodes]
+        return rows[:0]
+
+    def get_entries(self, node_set):
+        '''indices of all entries of the nodes of node_set
+        '''
+        rows = self.get_node_rows(node_set)
+        starts = self.offsets[rows]
+        counts = self.offsets[rows + 1] - starts
+        jumps = starts - (np.cumsum(counts) - counts)
+        return np.repeat(jumps, counts) + np.arange(int(counts.sum()), dtype=np.int64)
+
+    def get_bit_patterns(self, node_set):
+        '''bit pattern for each element row, see get_bit_pattern_dict
+        '''
+        entries = self.get_entries(node_set)
+        bits = np.left_shift(np.int64(1), self.positions[entries])
+        patterns = np.zeros(len(self.element_ids), dtype=np.int64)
+        np.add.at(patterns, self.element_rows[entries], bits)
+        return patterns
+
+    def get_femelements_by_femnodes(self, node_set):
+        '''elements which have all their nodes in node_set
+        '''
+        patterns = self.get_bit_patterns(node_set)
+        full_masks = np.left_shift(np.int64(1), self.element_lengths) - 1
+        return self.element_ids[patterns == full_masks].tolist()
+
+    def get_ccxelement_faces(self, node_set):
+        '''CalculiX element faces [[eleID, face number], ...] which have all their nodes in node_set
+        '''
+        patterns = self.get_bit_patterns(node_set)
+        face_rows = []
+        face_numbers = []
+        for ele_len, mask_dict in get_ccxelement_face_masks().items():
+            rows = np.flatnonzero((self.element_lengths == ele_len) & (patterns != 0))
+            for mask, face_number in mask_dict.items():
+                found = rows[(patterns[rows] & mask) == mask]
+                face_rows.append(found)
+                face_numbers.append(np.full(len(found), face_number, dtype=np.int64))
+        if not face_rows:
+            return []
+        face_rows = np.concatenate(face_rows)
+        face_numbers = np.concatenate(face_numbers)
+        order = np.lexsort((face_numbers, face_rows))
+        faces = np.column_stack((self.element_ids[face_rows[order]], face_numbers[order]))
+        FreeCAD.Console.PrintLog('found Faces: {}\n'.format(len(faces)))
+        return faces.tolist()
+
+
+def get_femnodes_ele_index(femelement_table, femnodes_mesh=None):
+    '''get the FemNodesElementsIndex of the femelement_table
+    The index is not cached, the writer keeps it for its run like the femnodes_ele_table.
+    '''
+    return FemNodesElementsIndex(femelement_table, femnodes_mesh)
+
+
+# ************************************************************************************************
+# ***** concurrent search on the femnodes_ele_index ***********************************************
+# The geometry lookups (getNodesByFace, ...) need the document and the C++ mesh, they can only be
+# done in the main process. The searches on the FemNodesElementsIndex are pure array operations,
+# they are done in a process pool. The index is sent once to every worker by the pool initializer.
+_pool_femnodes_ele_index = None
+
+
+def _init_pool_femnodes_ele_index(femnodes_ele_index):
+    global _pool_femnodes_ele_index
+    _pool_femnodes_ele_index = femnodes_ele_index
+
+
+def _pool_search(method_name, node_set):
+    return getattr(_pool_femnodes_ele_index, method_name)(node_set)
+
+
+def get_search_process_pool(femnodes_ele_index, max_workers=None):
+    '''returns a process pool with the femnodes_ele_index in every worker or None
+    if concurrent search is not possible (Python 2, no fork start method on the platform, not the main thread)
+    '''
+    # forking from another thread only copies this thread, locks held by the others stay locked in the workers
+    if not isinstance(threading.current_thread(), threading._MainThread):
+        FreeCAD.Console.PrintLog('Concurrent mesh search not possible: not in the main thread\n')
+        return None
+    try:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawned workers would start a new FreeCAD, thus only fork is used
+        mp_context = multiprocessing.get_context('fork')
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_pool_femnodes_ele_index,
+            initargs=(femnodes_ele_index,)
+        )
+    except (ImportError, AttributeError, TypeError, ValueError, OSError) as e:
+        FreeCAD.Console.PrintLog('Concurrent mesh search not possible: {}\n'.format(e))
+        return None
+
+
+def map_femnodes_ele_index(femnodes_ele_index, method_name, node_sets, max_workers=None):
+    '''calls the search method method_name of the femnodes_ele_index for every node set in node_sets
+    the results are returned in the order of node_sets, thus they are the same as in the serial search
+    the search is done in a process pool if more than one node set is given and it is possible
+    '''
+    pool = None
+    if len(node_sets) > 1:
+        pool = get_search_process_pool(femnodes_ele_index, max_workers)
+    if pool is None:
+        return [getattr(femnodes_ele_index, method_name)(node_set) for node_set in node_sets]
+    FreeCAD.Console.PrintMessage('Concurrent mesh search: {} node sets\n'.format(len(node_sets)))
+    with pool:
+        return list(pool.map(partial(_pool_search, method_name), node_sets))
+
+
+def get_femelements_by_references_concurrent(femmesh, femnodes_ele_index, references_list):
+    '''get the femelements for a list of references lists, the same as
+    [get_femelements_by_references(femmesh, femelement_table, references, femnodes_ele_index) for references in references_list]
+    but the binary search is done concurrent
+    '''
+    node_sets = []
+    for references in references_list:
+        for ref in references:
+            node_sets.append(get_femnodes_by_refshape(femmesh, ref))
+    FreeCAD.Console.PrintMessage('binary search: get_femelements_by_femnodes_bin\n')
+    ref_femelements = iter(map_femnodes_ele_index(femnodes_ele_index, 'get_femelements_by_femnodes', node_sets))
+    references_femelements_list = []
+    for references in references_list:
+        references_femelements = []
+        for ref in references:
+            references_femelements += next(ref_femelements)
+        references_femelements_list.append(references_femelements)
+    return references_femelements_list
+
+
 def get_copy_of_empty_femelement_table(femelement_table):
     '''{eleID : 0, eleID : 0, ...}
     '''
@@ -196,6 +471,12 @@ def get_bit_pattern_dict(femelement_table, femnodes_ele_table, node_set):
     FreeCAD.Console.PrintLog('len femnodes_ele_table: ' + str(len(femnodes_ele_table)) + '\n')
     FreeCAD.Console.PrintLog('len node_set: ' + str(len(node_set)) + '\n')
     # FreeCAD.Console.PrintMessage('node_set: {}\n'.format(node_set))
+    if isinstance(femnodes_ele_table, FemNodesElementsIndex):
+        patterns = femnodes_ele_table.get_bit_patterns(node_set)
+        return dict(zip(
+            femnodes_ele_table.element_ids.tolist(),
+            [list(p) for p in zip(femnodes_ele_table.element_lengths.tolist(), patterns.tolist())]
+        ))
     bit_pattern_dict = get_copy_of_empty_femelement_table(femelement_table)
     # # initializing the bit_pattern_dict
     for ele in femelement_table:
@@ -212,6 +493,21 @@ def get_bit_pattern_dict(femelement_table, femnodes_ele_table, node_set):
 def get_ccxelement_faces_from_binary_search(bit_pattern_dict):
     '''get the CalculiX element face numbers
     '''
+    vol_dict = get_ccxelement_face_masks()
+    faces = []
+    for ele in bit_pattern_dict:
+        mask_dict = vol_dict[bit_pattern_dict[ele][0]]
+        for key in mask_dict:
+            if (key & bit_pattern_dict[ele][1]) == key:
+                faces.append([ele, mask_dict[key]])
+    FreeCAD.Console.PrintLog('found Faces: {}\n'.format(len(faces)))
+    # FreeCAD.Console.PrintMessage('faces: {}\n'.format(faces))
+    return faces
+
+
+def get_ccxelement_face_masks():
+    '''{number of element nodes : {bit mask of the face nodes : CalculiX face number}}
+    '''
     tet10_mask = {
         119: 1,
         411: 2,
@@ -248,22 +544,13 @@ def get_ccxelement_faces_from_binary_search(bit_pattern_dict):
         25782: 3,
         22829: 4,
         12891: 5}
-    vol_dict = {
+    return {
         4: tet4_mask,
         6: pent6_mask,
         8: hex8_mask,
         10: tet10_mask,
         15: pent15_mask,
         20: hex20_mask}
-    faces = []
-    for ele in bit_pattern_dict:
-        mask_dict = vol_dict[bit_pattern_dict[ele][0]]
-        for key in mask_dict:
-            if (key & bit_pattern_dict[ele][1]) == key:
-                faces.append([ele, mask_dict[key]])
-    FreeCAD.Console.PrintLog('found Faces: {}\n'.format(len(faces)))
-    # FreeCAD.Console.PrintMessage('faces: {}\n'.format(faces))
-    return faces
 
 
 def get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_table, node_list):
@@ -273,6 +560,10 @@ def get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_table, node_l
     blind fast binary search, but works for volumes only
     '''
     FreeCAD.Console.PrintMessage('binary search: get_femelements_by_femnodes_bin\n')
+    if isinstance(femnodes_ele_table, FemNodesElementsIndex):
+        ele_list = femnodes_ele_table.get_femelements_by_femnodes(node_list)
+        FreeCAD.Console.PrintMessage('found Volumes: {}\n'.format(len(ele_list)))
+        return ele_list
     vol_masks = {
         4: 15,
         6: 63,
@@ -368,18 +659,29 @@ def get_femvolumeelements_by_femfacenodes(femelement_table, node_list):
     return e
 
 
-def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_table=None):  # fem_objects = FreeCAD FEM document objects
+def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_table=None, concurrent=False):  # fem_objects = FreeCAD FEM document objects
     # get femelements for reference shapes of each obj.References
     count_femelements = 0
     referenced_femelements = []
     has_remaining_femelements = None
+    concurrent_femelements = None
+    if concurrent and isinstance(femnodes_ele_table, FemNodesElementsIndex):
+        # the binary search for all objects is done at once in a process pool
+        concurrent_femelements = iter(get_femelements_by_references_concurrent(
+            femmesh,
+            femnodes_ele_table,
+            [fem_object['Object'].References for fem_object in fem_objects if fem_object['Object'].References]
+        ))
     for fem_object_i, fem_object in enumerate(fem_objects):
         obj = fem_object['Object']
         FreeCAD.Console.PrintMessage("Constraint: " + obj.Name + " --> " + "We're going to search in the mesh for the element ID's.\n")
         fem_object['ShortName'] = get_elset_short_name(obj, fem_object_i)  # unique short identifier
         if obj.References:
             ref_shape_femelements = []
-            ref_shape_femelements = get_femelements_by_references(femmesh, femelement_table, obj.References, femnodes_ele_table)
+            if concurrent_femelements is not None:
+                ref_shape_femelements = next(concurrent_femelements)
+            else:
+                ref_shape_femelements = get_femelements_by_references(femmesh, femelement_table, obj.References, femnodes_ele_table)
             referenced_femelements += ref_shape_femelements
             count_femelements += len(ref_shape_femelements)
             fem_object['FEMElements'] = ref_shape_femelements
@@ -1191,30 +1493,54 @@ def get_ref_shape_node_sum_geom_table(node_geom_table):
 # ************************************************************************************************
 # ***** methods for retrieving faces for constraint pressure *************************************
 def get_pressure_obj_faces(femmesh, femelement_table, femnodes_ele_table, femobj):
+    return get_pressure_objs_faces(femmesh, femelement_table, femnodes_ele_table, [femobj])[0]
+
+
+def get_pressure_objs_faces(femmesh, femelement_table, femnodes_ele_table, femobjs, concurrent=False):
+    '''get the pressure faces for each femobj of femobjs, the same as
+    [get_pressure_obj_faces(femmesh, femelement_table, femnodes_ele_table, femobj) for femobj in femobjs]
+    but on a solid mesh the search of the faces is done concurrent if concurrent is True
+    '''
     if is_solid_femmesh(femmesh):
         # get the nodes
-        prs_face_node_set = get_femnodes_by_femobj_with_references(femmesh, femobj)  # sorted and duplicates removed
-        # FreeCAD.Console.PrintMessage('prs_face_node_set: {}\n'.format(prs_face_node_set))
-        # fill the bit_pattern_dict and search for the faces
-        bit_pattern_dict = get_bit_pattern_dict(femelement_table, femnodes_ele_table, prs_face_node_set)
-        pressure_faces = get_ccxelement_faces_from_binary_search(bit_pattern_dict)
+        prs_face_node_sets = []
+        for femobj in femobjs:
+            prs_face_node_set = get_femnodes_by_femobj_with_references(femmesh, femobj)  # sorted and duplicates removed
+            # FreeCAD.Console.PrintMessage('prs_face_node_set: {}\n'.format(prs_face_node_set))
+            prs_face_node_sets.append(prs_face_node_set)
+        if isinstance(femnodes_ele_table, FemNodesElementsIndex):
+            # vectorized search on the array based index
+            if concurrent:
+                return map_femnodes_ele_index(femnodes_ele_table, 'get_ccxelement_faces', prs_face_node_sets)
+            return [femnodes_ele_table.get_ccxelement_faces(node_set) for node_set in prs_face_node_sets]
+        pressure_faces_list = []
+        for prs_face_node_set in prs_face_node_sets:
+            # fill the bit_pattern_dict and search for the faces
+            bit_pattern_dict = get_bit_pattern_dict(femelement_table, femnodes_ele_table, prs_face_node_set)
+            pressure_faces_list.append(get_ccxelement_faces_from_binary_search(bit_pattern_dict))
+        return pressure_faces_list
     elif is_face_femmesh(femmesh):
-        pressure_faces = []
-        # normally we should call get_femelements_by_references and the group check should be integrated there
-        if femmesh.GroupCount:
-            meshfaces = get_femmesh_groupdata_sets_by_name(femmesh, femobj, 'Face')
-            # FreeCAD.Console.PrintMessage('{}\n'.format(meshfaces))
-            if not meshfaces:
-                FreeCAD.Console.PrintError("Error: Something went wrong in getting the group element faces.\n")
-            else:
-                for mf in meshfaces:
-                    # pressure_faces.append([mf, 0])
-                    pressure_faces.append([mf, -1])
-                    # 0 if femmeshface normal == reference face normal direction
-                    # -1 if femmeshface normal opposite reference face normal direction
-                    # easy on plane faces, but on a half sphere ... ?!?
+        return [get_pressure_obj_faces_shell(femmesh, femobj) for femobj in femobjs]
+    return [[] for femobj in femobjs]
+
+
+def get_pressure_obj_faces_shell(femmesh, femobj):
+    pressure_faces = []
+    # normally we should call get_femelements_by_references and the group check should be integrated there
+    if femmesh.GroupCount:
+        meshfaces = get_femmesh_groupdata_sets_by_name(femmesh, femobj, 'Face')
+        # FreeCAD.Console.PrintMessage('{}\n'.format(meshfaces))
+        if not meshfaces:
+            FreeCAD.Console.PrintError("Error: Something went wrong in getting the group element faces.\n")
         else:
-            FreeCAD.Console.PrintError("Pressure on shell mesh at the moment only supported for meshes with appropriate group data.\n")
+            for mf in meshfaces:
+                # pressure_faces.append([mf, 0])
+                pressure_faces.append([mf, -1])
+                # 0 if femmeshface normal == reference face normal direction
+                # -1 if femmeshface normal opposite reference face normal direction
+                # easy on plane faces, but on a half sphere ... ?!?
+    else:
+        FreeCAD.Console.PrintError("Pressure on shell mesh at the moment only supported for meshes with appropriate group data.\n")
     return pressure_faces
 
 
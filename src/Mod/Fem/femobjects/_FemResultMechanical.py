@@ -28,6 +28,8 @@ __url__ = "http://www.freecadweb.org"
 #  \ingroup FEM
 #  \brief FreeCAD DocumentObject class to hold mechanical results in FEM workbench
 
+from femresult import resultstorage
+
 
 class _FemResultMechanical():
     """The Fem::_FemResultMechanical's Proxy python type, add result specific properties
@@ -85,7 +87,17 @@ class _FemResultMechanical():
         return
 
     def onChanged(self, obj, prop):
-        return
+        # changed node data of the compact storage is packed again on save,
+        # without the link to the result holding the NodeNumbers they are packed with the node data
+        if prop in ["NodeNumbers", "NodeNumbersResult"] or prop in resultstorage.NODE_DATA_PROPERTIES:
+            self.packed = False
+
+    def onDocumentRestored(self, obj):
+        if resultstorage.is_compact(obj):
+            # the transient node data properties and NodeNumbers are restored empty
+            resultstorage.set_transient_node_numbers(obj)
+            resultstorage.unpack(obj)
+            resultstorage.attach_observer()
 
     def __getstate__(self):
         return self.Type
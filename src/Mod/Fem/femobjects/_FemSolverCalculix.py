@@ -149,6 +149,10 @@ class _FemSolverCalculix():
         dimout = ccx_prefs.GetBool("BeamShellOutput", False)
         obj.BeamShellResultOutput3D = dimout
 
+        obj.addProperty("App::PropertyBool", "BinaryResultOutput", "Fem", "Write the frd result file in binary format (smaller and faster to write and read)")
+        binout = ccx_prefs.GetBool("BinaryResultOutput", False)
+        obj.BinaryResultOutput = binout
+
     def execute(self, obj):
         return
 
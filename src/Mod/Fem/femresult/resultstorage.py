@@ -0,0 +1,217 @@
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+__title__ = "Fem compact storage of results"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+## \addtogroup FEM
+#  @{
+
+import FreeCAD
+import numpy as np
+import os
+import tempfile
+
+
+# The node data of a mechanical result object is saved as float list properties in the document,
+# the NodeNumbers as integer list in the Document.xml, one copy for every result object.
+# With the compact storage the node data properties are transient, they are saved packed into one
+# zlib compressed numpy .npz file, optionally in single precision, which is included in the document.
+# The NodeNumbers are transient as well, they are saved in the .npz file too. The NodeNumbers of
+# result objects with the same nodes are saved once, the other result objects link the result object
+# which holds them. The packing is done when the document is saved, the unpacking when it is restored,
+# in the meantime the result object is used as always.
+
+NODE_DATA_PROPERTIES = [
+    "DisplacementVectors", "Peeq", "DisplacementLengths", "StressValues",
+    "PrincipalMax", "PrincipalMed", "PrincipalMin", "MaxShear",
+    "MassFlowRate", "NetworkPressure", "UserDefined", "Temperature",
+    "NodeStressXX", "NodeStressYY", "NodeStressZZ", "NodeStressXY", "NodeStressXZ", "NodeStressYZ",
+    "NodeStrainXX", "NodeStrainYY", "NodeStrainZZ", "NodeStrainXY", "NodeStrainXZ", "NodeStrainYZ"
+]
+
+# property attributes of the node data properties in compact storage: read only and transient
+COMPACT_PROPERTY_ATTRIBUTES = 1 | 2
+
+
+def get_prefs():
+    ''' returns (compact storage, single precision) of the FEM general preferences
+    '''
+    prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General")
+    return (prefs.GetBool("CompactResultStorage", False), prefs.GetBool("CompactResultSinglePrecision", False))
+
+
+## Returns True if the result object uses the compact storage
+#  @param res_obj result object
+def is_compact(res_obj):
+    return hasattr(res_obj, "PackedNodeData")
+
+
+## Switches a result object to the compact storage, the node data of the result object is kept
+#  @param res_obj result object
+#  @param single_precision save the node data with float32 instead of float64
+#  @param node_numbers_result result object in compact storage to share the NodeNumbers with,
+#         they are only shared if they are the same
+def set_compact_storage(res_obj, single_precision=False, node_numbers_result=None):
+    if not is_compact(res_obj):
+        res_obj.addProperty("App::PropertyFileIncluded", "PackedNodeData", "Base", "Packed node data of the compact storage", 1)
+        res_obj.addProperty("App::PropertyBool", "SinglePrecision", "Base", "Save the node data in single precision", 1)
+        res_obj.addProperty("App::PropertyLink", "NodeNumbersResult", "Base", "Result the NodeNumbers are saved with", 1)
+        for prop in NODE_DATA_PROPERTIES:
+            if prop not in res_obj.PropertiesList:
+                continue
+            # dynamic properties keep their attributes, thus they are added again as transient ones
+            values = getattr(res_obj, prop)
+            prop_type = res_obj.getTypeIdOfProperty(prop)
+            group = res_obj.getGroupOfProperty(prop)
+            doc = res_obj.getDocumentationOfProperty(prop)
+            res_obj.removeProperty(prop)
+            res_obj.addProperty(prop_type, prop, group, doc, COMPACT_PROPERTY_ATTRIBUTES)
+            setattr(res_obj, prop, values)
+    set_transient_node_numbers(res_obj)
+    res_obj.SinglePrecision = single_precision
+    if node_numbers_result is not None and node_numbers_result != res_obj and is_compact(node_numbers_result):
+        # link the result object which saves the NodeNumbers
+        while node_numbers_result.NodeNumbersResult:
+            node_numbers_result = node_numbers_result.NodeNumbersResult
+        if node_numbers_result.NodeNumbers == res_obj.NodeNumbers:
+            res_obj.NodeNumbersResult = node_numbers_result
+    if hasattr(res_obj, "Proxy"):
+        res_obj.Proxy.packed = False
+    attach_observer()
+    return res_obj
+
+
+## Keeps the NodeNumbers of a result object in compact storage out of the Document.xml
+#  the NodeNumbers are a C++ property, the transient status is not saved, thus it is set again on restore
+#  @param res_obj result object in compact storage
+def set_transient_node_numbers(res_obj):
+    res_obj.setPropertyStatus("NodeNumbers", "Transient")
+
+
+## Packs the result objects in compact storage of a document when it is saved
+def attach_observer():
+    _StorageObserver.attach()
+
+
+## Returns the node data of a result object as dict of numpy arrays as it is packed
+#  @param res_obj result object
+def get_packed_arrays(res_obj):
+    dtype = np.float32 if res_obj.SinglePrecision else np.float64
+    arrays = {}
+    for prop in NODE_DATA_PROPERTIES:
+        values = getattr(res_obj, prop, None)
+        if not values:
+            continue
+        if prop == "DisplacementVectors":
+            arrays[prop] = np.array([(v.x, v.y, v.z) for v in values], dtype=dtype)
+        else:
+            arrays[prop] = np.array(values, dtype=dtype)
+    if not res_obj.NodeNumbersResult:
+        arrays["NodeNumbers"] = np.array(res_obj.NodeNumbers, dtype=np.int64)
+    return arrays
+
+
+## Packs the node data of a result object into its PackedNodeData file
+#  @param res_obj result object in compact storage
+def pack(res_obj):
+    arrays = get_packed_arrays(res_obj)
+    handle, packed_file = tempfile.mkstemp(suffix=".npz", prefix=res_obj.Name + "_")
+    os.close(handle)
+    try:
+        np.savez_compressed(packed_file, **arrays)
+        # the file is copied into the document
+        res_obj.PackedNodeData = packed_file
+    finally:
+        os.remove(packed_file)
+    if hasattr(res_obj, "Proxy"):
+        res_obj.Proxy.packed = True
+
+
+def _load(res_obj):
+    if not res_obj.PackedNodeData or not os.path.isfile(res_obj.PackedNodeData):
+        return None
+    return np.load(res_obj.PackedNodeData, allow_pickle=False)
+
+
+## Returns the NodeNumbers of a result object in compact storage as they are saved
+#  @param res_obj result object in compact storage
+def get_packed_node_numbers(res_obj):
+    if res_obj.NodeNumbersResult:
+        return get_packed_node_numbers(res_obj.NodeNumbersResult)
+    packed = _load(res_obj)
+    if packed is None or "NodeNumbers" not in packed.files:
+        return []
+    return packed["NodeNumbers"].tolist()
+
+
+def _has_packed_node_numbers(res_obj):
+    packed = _load(res_obj)
+    return packed is not None and "NodeNumbers" in packed.files
+
+
+## Fills the node data of a result object from its PackedNodeData file
+#  @param res_obj result object in compact storage
+def unpack(res_obj):
+    packed = _load(res_obj)
+    if packed is None:
+        return res_obj
+    for prop in packed.files:
+        if prop == "NodeNumbers":
+            continue
+        values = packed[prop].astype(np.float64)
+        if prop == "DisplacementVectors":
+            setattr(res_obj, prop, [FreeCAD.Vector(*v) for v in values.tolist()])
+        else:
+            setattr(res_obj, prop, values.tolist())
+    res_obj.NodeNumbers = get_packed_node_numbers(res_obj)
+    if hasattr(res_obj, "Proxy"):
+        res_obj.Proxy.packed = True
+    return res_obj
+
+
+class _StorageObserver(object):
+    ''' packs the changed result objects in compact storage on save
+    '''
+
+    _instance = None
+
+    @classmethod
+    def attach(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+            FreeCAD.addDocumentObserver(cls._instance)
+
+    def _compact_results(self, doc):
+        return [obj for obj in doc.Objects if obj.isDerivedFrom("Fem::FemResultObject") and is_compact(obj)]
+
+    def slotStartSaveDocument(self, doc, filename):
+        results = self._compact_results(doc)
+        for obj in results:
+            if obj.NodeNumbersResult is not None and obj.NodeNumbersResult not in results:
+                # the result holding the NodeNumbers was removed
+                obj.NodeNumbersResult = None
+            packed = getattr(getattr(obj, "Proxy", None), "packed", False)
+            # a removed link is not always notified, the NodeNumbers have to be in the packed data then
+            if not packed or (obj.NodeNumbersResult is None and not _has_packed_node_numbers(obj)):
+                pack(obj)
+
+##  @}
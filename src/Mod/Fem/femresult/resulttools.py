@@ -150,22 +150,9 @@ def get_stats(res_obj, result_type):
 #  - MFlow - MassFlowRate
 #  - NPress - NetworkPressure
 def get_all_stats(res_obj):
-    m = res_obj.Stats
-    stats_dict = {
-        "U1": (m[0], m[1], m[2]),
-        "U2": (m[3], m[4], m[5]),
-        "U3": (m[6], m[7], m[8]),
-        "Uabs": (m[9], m[10], m[11]),
-        "Sabs": (m[12], m[13], m[14]),
-        "MaxPrin": (m[15], m[16], m[17]),
-        "MidPrin": (m[18], m[19], m[20]),
-        "MinPrin": (m[21], m[22], m[23]),
-        "MaxShear": (m[24], m[25], m[26]),
-        "Peeq": (m[27], m[28], m[29]),
-        "Temp": (m[30], m[31], m[32]),
-        "MFlow": (m[33], m[34], m[35]),
-        "NPress": (m[36], m[37], m[38])
-    }
+    stat_types = ["U1", "U2", "U3", "Uabs", "Sabs", "MaxPrin", "MidPrin", "MinPrin", "MaxShear", "Peeq", "Temp", "MFlow", "NPress"]
+    m = np.asarray(res_obj.Stats, dtype=np.float64).reshape(-1, 3)
+    stats_dict = dict(zip(stat_types, [tuple(s) for s in m.tolist()]))
     return stats_dict
 
 
@@ -177,72 +164,38 @@ def fill_femresult_stats(res_obj):
     FreeCAD.Console.PrintLog('Calculate stats list for result obj: ' + res_obj.Name + '\n')
     no_of_values = 1  # to avoid division by zero
     # set stats values to 0, they may not exist in res_obj
-    x_min = y_min = z_min = x_max = y_max = z_max = x_avg = y_avg = z_avg = 0
-    a_max = a_min = a_avg = s_max = s_min = s_avg = 0
-    p1_min = p1_avg = p1_max = p2_min = p2_avg = p2_max = p3_min = p3_avg = p3_max = 0
-    ms_min = ms_avg = ms_max = peeq_min = peeq_avg = peeq_max = 0
-    temp_min = temp_avg = temp_max = mflow_min = mflow_avg = mflow_max = npress_min = npress_avg = npress_max = 0
+    x_stats = y_stats = z_stats = a_stats = s_stats = (0, 0, 0)
+    p1_stats = p2_stats = p3_stats = ms_stats = peeq_stats = (0, 0, 0)
+    temp_stats = mflow_stats = npress_stats = (0, 0, 0)
 
     if res_obj.DisplacementVectors:
-        no_of_values = len(res_obj.DisplacementVectors)
-        x_max, y_max, z_max = map(max, zip(*res_obj.DisplacementVectors))
-        x_min, y_min, z_min = map(min, zip(*res_obj.DisplacementVectors))
-        sum_list = map(sum, zip(*res_obj.DisplacementVectors))
-        x_avg, y_avg, z_avg = [i / no_of_values for i in sum_list]
-        a_min = min(res_obj.DisplacementLengths)
-        a_avg = sum(res_obj.DisplacementLengths) / no_of_values
-        a_max = max(res_obj.DisplacementLengths)
+        displacements = np.array(res_obj.DisplacementVectors, dtype=np.float64).reshape(-1, 3)
+        no_of_values = len(displacements)
+        x_stats, y_stats, z_stats = [calculate_stats(displacements[:, i], no_of_values) for i in range(3)]
+        a_stats = calculate_stats(res_obj.DisplacementLengths, no_of_values)
     if res_obj.StressValues:
-        s_min = min(res_obj.StressValues)
-        s_avg = sum(res_obj.StressValues) / no_of_values
-        s_max = max(res_obj.StressValues)
+        s_stats = calculate_stats(res_obj.StressValues, no_of_values)
     if res_obj.PrincipalMax:
-        p1_min = min(res_obj.PrincipalMax)
-        p1_avg = sum(res_obj.PrincipalMax) / no_of_values
-        p1_max = max(res_obj.PrincipalMax)
+        p1_stats = calculate_stats(res_obj.PrincipalMax, no_of_values)
     if res_obj.PrincipalMed:
-        p2_min = min(res_obj.PrincipalMed)
-        p2_avg = sum(res_obj.PrincipalMed) / no_of_values
-        p2_max = max(res_obj.PrincipalMed)
+        p2_stats = calculate_stats(res_obj.PrincipalMed, no_of_values)
     if res_obj.PrincipalMin:
-        p3_min = min(res_obj.PrincipalMin)
-        p3_avg = sum(res_obj.PrincipalMin) / no_of_values
-        p3_max = max(res_obj.PrincipalMin)
+        p3_stats = calculate_stats(res_obj.PrincipalMin, no_of_values)
     if res_obj.MaxShear:
-        ms_min = min(res_obj.MaxShear)
-        ms_avg = sum(res_obj.MaxShear) / no_of_values
-        ms_max = max(res_obj.MaxShear)
+        ms_stats = calculate_stats(res_obj.MaxShear, no_of_values)
     if res_obj.Peeq:
-        peeq_min = min(res_obj.Peeq)
-        peeq_avg = sum(res_obj.Peeq) / no_of_values
-        peeq_max = max(res_obj.Peeq)
+        peeq_stats = calculate_stats(res_obj.Peeq, no_of_values)
     if res_obj.Temperature:
-        temp_min = min(res_obj.Temperature)
-        temp_avg = sum(res_obj.Temperature) / no_of_values
-        temp_max = max(res_obj.Temperature)
+        temp_stats = calculate_stats(res_obj.Temperature, no_of_values)
     if res_obj.MassFlowRate:
         no_of_values = len(res_obj.MassFlowRate)  # DisplacementVectors is empty, no_of_values needs to be set
-        mflow_min = min(res_obj.MassFlowRate)
-        mflow_avg = sum(res_obj.MassFlowRate) / no_of_values
-        mflow_max = max(res_obj.MassFlowRate)
+        mflow_stats = calculate_stats(res_obj.MassFlowRate, no_of_values)
     if res_obj.NetworkPressure:
-        npress_min = min(res_obj.NetworkPressure)
-        npress_avg = sum(res_obj.NetworkPressure) / no_of_values
-        npress_max = max(res_obj.NetworkPressure)
-
-    res_obj.Stats = [x_min, x_avg, x_max,
-                     y_min, y_avg, y_max,
-                     z_min, z_avg, z_max,
-                     a_min, a_avg, a_max,
-                     s_min, s_avg, s_max,
-                     p1_min, p1_avg, p1_max,
-                     p2_min, p2_avg, p2_max,
-                     p3_min, p3_avg, p3_max,
-                     ms_min, ms_avg, ms_max,
-                     peeq_min, peeq_avg, peeq_max,
-                     temp_min, temp_avg, temp_max,
-                     mflow_min, mflow_avg, mflow_max,
-                     npress_min, npress_avg, npress_max]
+        npress_stats = calculate_stats(res_obj.NetworkPressure, no_of_values)
+
+    res_obj.Stats = list(x_stats + y_stats + z_stats + a_stats + s_stats
+                         + p1_stats + p2_stats + p3_stats + ms_stats + peeq_stats
+                         + temp_stats + mflow_stats + npress_stats)
     # stat_types = ["U1", "U2", "U3", "Uabs", "Sabs", "MaxPrin", "MidPrin", "MinPrin", "MaxShear", "Peeq", "Temp", "MFlow", "NPress"]
     # len(stat_types) == 13*3 == 39
     # do not forget to adapt initialization of all Stats items in modules:
@@ -256,56 +209,52 @@ def fill_femresult_stats(res_obj):
     return res_obj
 
 
+## Returns minimum, average and maximum of a list or array of values
+#  @param values list or numpy array
+#  @param no_of_values the sum is divided by this number to get the average
+def calculate_stats(values, no_of_values=None):
+    values = np.asarray(values, dtype=np.float64)
+    if no_of_values is None:
+        no_of_values = len(values)
+    return (float(values.min()), float(values.sum() / no_of_values), float(values.max()))
+
+
 def add_disp_apps(res_obj):
-    res_obj.DisplacementLengths = calculate_disp_abs(res_obj.DisplacementVectors)
+    res_obj.DisplacementLengths = calculate_disp_abs_batch(res_obj.DisplacementVectors).tolist()
     FreeCAD.Console.PrintMessage('Added DisplacementLengths.\n')
     return res_obj
 
 
 def add_von_mises(res_obj):
-    mstress = []
-    iterator = zip(
-        res_obj.NodeStressXX,
-        res_obj.NodeStressYY,
-        res_obj.NodeStressZZ,
-        res_obj.NodeStressXY,
-        res_obj.NodeStressXZ,
-        res_obj.NodeStressYZ
-    )
-    for Sxx, Syy, Szz, Sxy, Sxz, Syz in iterator:
-        mstress.append(calculate_von_mises((Sxx, Syy, Szz, Sxy, Sxz, Syz)))
-    res_obj.StressValues = mstress
+    res_obj.StressValues = calculate_von_mises_batch(get_stress_tensors(res_obj)).tolist()
     FreeCAD.Console.PrintMessage('Added StressValues (von Mises).\n')
     return res_obj
 
 
 def add_principal_stress(res_obj):
-    prinstress1 = []
-    prinstress2 = []
-    prinstress3 = []
-    shearstress = []
-    iterator = zip(
-        res_obj.NodeStressXX,
-        res_obj.NodeStressYY,
-        res_obj.NodeStressZZ,
-        res_obj.NodeStressXY,
-        res_obj.NodeStressXZ,
-        res_obj.NodeStressYZ
-    )
-    for Sxx, Syy, Szz, Sxy, Sxz, Syz in iterator:
-        prin1, prin2, prin3, shear = calculate_principal_stress((Sxx, Syy, Szz, Sxy, Sxz, Syz))
-        prinstress1.append(prin1)
-        prinstress2.append(prin2)
-        prinstress3.append(prin3)
-        shearstress.append(shear)
-    res_obj.PrincipalMax = prinstress1
-    res_obj.PrincipalMed = prinstress2
-    res_obj.PrincipalMin = prinstress3
-    res_obj.MaxShear = shearstress
+    principal = calculate_principal_stress_batch(get_stress_tensors(res_obj))
+    res_obj.PrincipalMax = principal[:, 0].tolist()
+    res_obj.PrincipalMed = principal[:, 1].tolist()
+    res_obj.PrincipalMin = principal[:, 2].tolist()
+    res_obj.MaxShear = principal[:, 3].tolist()
     FreeCAD.Console.PrintMessage('Added principal stress and max shear values.\n')
     return res_obj
 
 
+## Returns the stress tensors of all nodes of a result object
+#  @param result object
+#  @return numpy array (N, 6), columns (Sxx, Syy, Szz, Sxy, Sxz, Syz)
+def get_stress_tensors(res_obj):
+    return np.column_stack((
+        np.asarray(res_obj.NodeStressXX, dtype=np.float64),
+        np.asarray(res_obj.NodeStressYY, dtype=np.float64),
+        np.asarray(res_obj.NodeStressZZ, dtype=np.float64),
+        np.asarray(res_obj.NodeStressXY, dtype=np.float64),
+        np.asarray(res_obj.NodeStressXZ, dtype=np.float64),
+        np.asarray(res_obj.NodeStressYZ, dtype=np.float64)
+    ))
+
+
 def compact_result(res_obj):
     '''
     compacts result.Mesh and appropriate result.NodeNumbers
@@ -370,4 +319,42 @@ def calculate_disp_abs(displacements):
     # see https://forum.freecadweb.org/viewtopic.php?f=18&t=33106&start=100#p296657
     return [np.linalg.norm(nd) for nd in displacements]
 
+
+# the batch versions of the calculate methods take the values of all nodes at once
+# stress_tensors ... numpy array (N, 6) with rows (Sxx, Syy, Szz, Sxy, Sxz, Syz)
+# displacements ... numpy array (N, 3) or list of FreeCAD.Vector
+
+def calculate_von_mises_batch(stress_tensors):
+    stress_tensors = np.asarray(stress_tensors, dtype=np.float64).reshape(-1, 6)
+    normal = stress_tensors[:, :3]
+    shear = stress_tensors[:, 3:]
+    pressure = normal.mean(axis=1)[:, None]
+    return np.sqrt(1.5 * ((normal - pressure)**2).sum(axis=1) + 3.0 * (shear**2).sum(axis=1))
+
+
+def calculate_principal_stress_batch(stress_tensors):
+    # returns numpy array (N, 4) with rows (PrincipalMax, PrincipalMed, PrincipalMin, MaxShear)
+    stress_tensors = np.asarray(stress_tensors, dtype=np.float64).reshape(-1, 6)
+    s11, s22, s33, s12, s31, s23 = stress_tensors.T
+    sigma = np.empty((len(stress_tensors), 3, 3))
+    sigma[:, 0, 0] = s11
+    sigma[:, 1, 1] = s22
+    sigma[:, 2, 2] = s33
+    sigma[:, 0, 1] = sigma[:, 1, 0] = s12
+    sigma[:, 0, 2] = sigma[:, 2, 0] = s31
+    sigma[:, 1, 2] = sigma[:, 2, 1] = s23
+    principal = np.full((len(stress_tensors), 4), float('NaN'))
+    # NaN can happen on Calculix frd result files, these nodes get NaN as in calculate_principal_stress
+    finite = np.isfinite(stress_tensors).all(axis=1)
+    if finite.any():
+        eigvals = np.linalg.eigvalsh(sigma[finite])[:, ::-1]  # eigvalsh sorts ascending
+        principal[finite, :3] = eigvals
+        principal[finite, 3] = (eigvals[:, 0] - eigvals[:, 2]) / 2.0
+    return principal
+
+
+def calculate_disp_abs_batch(displacements):
+    displacements = np.asarray(displacements, dtype=np.float64).reshape(-1, 3)
+    return np.sqrt((displacements**2).sum(axis=1))
+
 ##  @}
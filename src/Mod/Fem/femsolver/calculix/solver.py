@@ -163,6 +163,10 @@ class Proxy(solverbase.Proxy):
         dimout = ccx_prefs.GetBool("BeamShellOutput", False)
         obj.BeamShellResultOutput3D = dimout
 
+        obj.addProperty("App::PropertyBool", "BinaryResultOutput", "Fem", "Write the frd result file in binary format (smaller and faster to write and read)")
+        binout = ccx_prefs.GetBool("BinaryResultOutput", False)
+        obj.BinaryResultOutput = binout
+
     def createMachine(self, obj, directory, testmode=False):
         return run.Machine(
             solver=obj, directory=directory,
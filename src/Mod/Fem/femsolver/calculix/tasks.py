@@ -101,7 +101,7 @@ class Solve(run.Solve):
         self.pushStatus("Executing solver...\n")
         binary = settings.get_binary("Calculix")
         self._process = subprocess.Popen(
-            [binary, "-i", _inputFileName],
+            [binary, "-i", _inputFileName] + writer.get_ccx_output_arguments(self.solver),
             cwd=self.directory,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE)
@@ -32,11 +32,19 @@ import os
 import sys
 import time
 import codecs
+import hashlib
+import json
+import numpy as np
+from itertools import chain
 import femmesh.meshtools as FemMeshTools
 from .. import writerbase as FemInputWriter
 import six
 
 
+# buffer size in bytes of the input files, the data blocks are written in large chunks
+WRITE_BUFFER_SIZE = 1 << 20
+
+
 class FemInputWriterCcx(FemInputWriter.FemInputWriter):
     def __init__(
         self,
@@ -102,6 +110,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         else:
             self.write_calculix_one_input_file()
         writing_time_string = "Writing time input file: " + str(round((time.clock() - timestart), 2)) + " seconds"
+        self.femmesh.print_lookup_statistics()
         if self.femelement_count_test is True:
             FreeCAD.Console.PrintMessage(writing_time_string + ' \n\n')
             return self.file_name
@@ -114,14 +123,14 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         self.femmesh.writeABAQUS(self.file_name, 1, False)
 
         # reopen file with "append" and add the analysis definition
-        inpfile = codecs.open(self.file_name, 'a', encoding="utf-8")
+        inpfile = codecs.open(self.file_name, 'a', encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
         inpfile.write('\n\n')
 
         # Check to see if fluid sections are in analysis and use D network element type
         if self.fluidsection_objects:
             inpfile.close()
             FemMeshTools.write_D_network_element_to_inputfile(self.file_name)
-            inpfile = open(self.file_name, 'a')
+            inpfile = open(self.file_name, 'a', WRITE_BUFFER_SIZE)
         # node and element sets
         self.write_element_sets_material_and_femelement_type(inpfile)
         if self.fixed_objects:
@@ -147,7 +156,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             if is_fluid_section_inlet_outlet(self.ccx_elsets) is True:
                 inpfile.close()
                 FemMeshTools.use_correct_fluidinout_ele_def(self.FluidInletoutlet_ele, self.file_name, self.fluid_inout_nodes_file)
-                inpfile = open(self.file_name, 'a')
+                inpfile = open(self.file_name, 'a', WRITE_BUFFER_SIZE)
 
         # constraints independent from steps
         if self.planerotation_objects:
@@ -202,19 +211,24 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         # reopen file with "append" and add the analysis definition
         # first open file with "write" to ensure that each new iteration of writing of inputfile starts in new file
         # first open file with "write" to ensure that the .writeABAQUS also writes in inputfile
-        inpfileMain = open(self.file_name, 'w')
+        inpfileMain = open(self.file_name, 'w', WRITE_BUFFER_SIZE)
         inpfileMain.close()
-        inpfileMain = open(self.file_name, 'a')
+        inpfileMain = open(self.file_name, 'a', WRITE_BUFFER_SIZE)
         inpfileMain.write('\n\n')
 
         # write nodes and elements
         name = self.file_name[:-4]
         include_name = self.main_file_name[:-4]
 
-        self.femmesh.writeABAQUS(name + "_Node_Elem_sets.inp", 1, False)
-        inpfileNodesElem = open(name + "_Node_Elem_sets.inp", 'a')
-        inpfileNodesElem.write('\n***********************************************************\n')
-        inpfileNodesElem.close()
+        # split files of the last run with unchanged content are reused
+        reused_files = self.get_reused_split_files(name)
+        if "_Node_Elem_sets.inp" in reused_files:
+            FreeCAD.Console.PrintMessage('  Mesh is unchanged, ' + name + '_Node_Elem_sets.inp is reused.\n')
+        else:
+            self.femmesh.writeABAQUS(name + "_Node_Elem_sets.inp", 1, False)
+            inpfileNodesElem = open(name + "_Node_Elem_sets.inp", 'a', WRITE_BUFFER_SIZE)
+            inpfileNodesElem.write('\n***********************************************************\n')
+            inpfileNodesElem.close()
 
         # Check to see if fluid sections are in analysis and use D network element type
         if self.fluidsection_objects:
@@ -226,32 +240,38 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         inpfileMain.write('*INCLUDE,INPUT=' + include_name + "_Node_Elem_sets.inp \n")
 
         # create separate inputfiles for each node set or constraint
-        if self.fixed_objects or self.displacement_objects or self.planerotation_objects:
-            inpfileNodes = open(name + "_Node_sets.inp", 'w')
+        write_node_sets = "_Node_sets.inp" not in reused_files
+        write_force = "_Node_Force.inp" not in reused_files
+        write_pressure = "_Pressure.inp" not in reused_files
+        write_heatflux = "_Node_Heatlfux.inp" not in reused_files
+        write_contact = "_Surface_Contact.inp" not in reused_files
+        write_transform = "_Node_Transform.inp" not in reused_files
+        if (self.fixed_objects or self.displacement_objects or self.planerotation_objects) and write_node_sets:
+            inpfileNodes = open(name + "_Node_sets.inp", 'w', WRITE_BUFFER_SIZE)
         if self.analysis_type == "thermomech" and self.temperature_objects:
-            inpfileNodeTemp = open(name + "_Node_Temp.inp", 'w')
-        if self.force_objects:
-            inpfileForce = open(name + "_Node_Force.inp", 'w')
-        if self.pressure_objects:
-            inpfilePressure = open(name + "_Pressure.inp", 'w')
-        if self.analysis_type == "thermomech" and self.heatflux_objects:
-            inpfileHeatflux = open(name + "_Node_Heatlfux.inp", 'w')
-        if self.contact_objects:
-            inpfileContact = open(name + "_Surface_Contact.inp", 'w')
-        if self.transform_objects:
-            inpfileTransform = open(name + "_Node_Transform.inp", 'w')
+            inpfileNodeTemp = open(name + "_Node_Temp.inp", 'w', WRITE_BUFFER_SIZE)
+        if self.force_objects and write_force:
+            inpfileForce = open(name + "_Node_Force.inp", 'w', WRITE_BUFFER_SIZE)
+        if self.pressure_objects and write_pressure:
+            inpfilePressure = open(name + "_Pressure.inp", 'w', WRITE_BUFFER_SIZE)
+        if self.analysis_type == "thermomech" and self.heatflux_objects and write_heatflux:
+            inpfileHeatflux = open(name + "_Node_Heatlfux.inp", 'w', WRITE_BUFFER_SIZE)
+        if self.contact_objects and write_contact:
+            inpfileContact = open(name + "_Surface_Contact.inp", 'w', WRITE_BUFFER_SIZE)
+        if self.transform_objects and write_transform:
+            inpfileTransform = open(name + "_Node_Transform.inp", 'w', WRITE_BUFFER_SIZE)
 
         # node and element sets
         self.write_element_sets_material_and_femelement_type(inpfileMain)
-        if self.fixed_objects:
+        if self.fixed_objects and write_node_sets:
             self.write_node_sets_constraints_fixed(inpfileNodes)
-        if self.displacement_objects:
+        if self.displacement_objects and write_node_sets:
             self.write_node_sets_constraints_displacement(inpfileNodes)
-        if self.planerotation_objects:
+        if self.planerotation_objects and write_node_sets:
             self.write_node_sets_constraints_planerotation(inpfileNodes)
-        if self.contact_objects:
+        if self.contact_objects and write_contact:
             self.write_surfaces_contraints_contact(inpfileContact)
-        if self.transform_objects:
+        if self.transform_objects and write_transform:
             self.write_node_sets_constraints_transform(inpfileTransform)
 
         # write commentary and include statement for static case node sets
@@ -319,20 +339,20 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         elif self.analysis_type == "static":
             if self.selfweight_objects:
                 self.write_constraints_selfweight(inpfileMain)
-            if self.force_objects:
+            if self.force_objects and write_force:
                 self.write_constraints_force(inpfileForce)
-            if self.pressure_objects:
+            if self.pressure_objects and write_pressure:
                 self.write_constraints_pressure(inpfilePressure)
         elif self.analysis_type == "thermomech":
             if self.selfweight_objects:
                 self.write_constraints_selfweight(inpfileMain)
-            if self.force_objects:
+            if self.force_objects and write_force:
                 self.write_constraints_force(inpfileForce)
-            if self.pressure_objects:
+            if self.pressure_objects and write_pressure:
                 self.write_constraints_pressure(inpfilePressure)
             if self.temperature_objects:
                 self.write_constraints_temperature(inpfileMain)
-            if self.heatflux_objects:
+            if self.heatflux_objects and write_heatflux:
                 self.write_constraints_heatflux(inpfileHeatflux)
             if self.fluidsection_objects:
                 self.write_constraints_fluidsection(inpfileMain)
@@ -364,6 +384,59 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         # footer
         self.write_footer(inpfileMain)
         inpfileMain.close()
+        # the content hashes are written after all split files are written
+        with open(name + "_hashes.json", 'w') as hash_file:
+            json.dump(self.split_file_hashes, hash_file, indent=0, sort_keys=True)
+
+    def get_split_file_hashes(self):
+        '''content hashes of the split files which can be reused in the next run
+        the hash of a file is calculated from the content of the mesh and the objects written into it
+        '''
+        hashes = {}
+        if self.fluidsection_objects:
+            # the element definitions of the mesh file are changed for fluid sections
+            return hashes
+        mesh_hash = get_femmesh_hash(self.femmesh, self.get_femmesh_connectivity())
+        hashes["_Node_Elem_sets.inp"] = mesh_hash
+        if not (self.femmesh.Volumes and (self.shellthickness_objects or self.beamsection_objects)):
+            # on mixed meshes the nodes of the fixed constraints are needed for the main file
+            hashes["_Node_sets.inp"] = get_content_hash(
+                mesh_hash,
+                self.fixed_objects,
+                self.displacement_objects,
+                self.planerotation_objects
+            )
+        # the load files stay empty for the other analysis types, they get no hash to be written again in the next run
+        if self.analysis_type == "static" or self.analysis_type == "thermomech":
+            hashes["_Node_Force.inp"] = get_content_hash(mesh_hash, self.force_objects)
+            hashes["_Pressure.inp"] = get_content_hash(mesh_hash, self.pressure_objects)
+        if self.analysis_type == "thermomech":
+            hashes["_Node_Heatlfux.inp"] = get_content_hash(mesh_hash, self.heatflux_objects)
+        hashes["_Surface_Contact.inp"] = get_content_hash(mesh_hash, self.contact_objects)
+        hashes["_Node_Transform.inp"] = get_content_hash(mesh_hash, self.transform_objects)
+        return hashes
+
+    def get_reused_split_files(self, name):
+        '''split files of the last run in the working directory, which have the same content hash as in this run
+        '''
+        hash_file_name = name + "_hashes.json"
+        old_hashes = {}
+        if os.path.isfile(hash_file_name):
+            with open(hash_file_name, 'r') as hash_file:
+                try:
+                    old_hashes = json.load(hash_file)
+                except ValueError:
+                    pass
+            # if this run is interrupted the split files are not valid anymore
+            os.remove(hash_file_name)
+        self.split_file_hashes = self.get_split_file_hashes()
+        reused_files = set()
+        for suffix, content_hash in self.split_file_hashes.items():
+            if old_hashes.get(suffix) == content_hash and os.path.isfile(name + suffix):
+                reused_files.add(suffix)
+        if reused_files:
+            FreeCAD.Console.PrintMessage('  Unchanged split input files are reused: {}\n'.format(sorted(reused_files)))
+        return reused_files
 
     def write_element_sets_material_and_femelement_type(self, f):
         f.write('\n***********************************************************\n')
@@ -453,8 +526,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             if isinstance(ccx_elset['ccx_elset'], six.string_types):  # use six to be sure to be Python 2.7 and 3.x compatible
                 f.write(ccx_elset['ccx_elset'] + '\n')
             else:
-                for elid in ccx_elset['ccx_elset']:
-                    f.write(str(elid) + ',\n')
+                f.write(format_set_ids(ccx_elset['ccx_elset']))
 
     def write_node_sets_constraints_fixed(self, f):
         # get nodes
@@ -469,16 +541,13 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             if self.femmesh.Volumes and (len(self.shellthickness_objects) > 0 or len(self.beamsection_objects) > 0):
                 if len(femobj['NodesSolid']) > 0:
                     f.write('*NSET,NSET=' + fix_obj.Name + 'Solid\n')
-                    for n in femobj['NodesSolid']:
-                        f.write(str(n) + ',\n')
+                    f.write(format_set_ids(femobj['NodesSolid']))
                 if len(femobj['NodesFaceEdge']) > 0:
                     f.write('*NSET,NSET=' + fix_obj.Name + 'FaceEdge\n')
-                    for n in femobj['NodesFaceEdge']:
-                        f.write(str(n) + ',\n')
+                    f.write(format_set_ids(femobj['NodesFaceEdge']))
             else:
                 f.write('*NSET,NSET=' + fix_obj.Name + '\n')
-                for n in femobj['Nodes']:
-                    f.write(str(n) + ',\n')
+                f.write(format_set_ids(femobj['Nodes']))
 
     def write_node_sets_constraints_displacement(self, f):
         # get nodes
@@ -491,8 +560,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             disp_obj = femobj['Object']
             f.write('** ' + disp_obj.Label + '\n')
             f.write('*NSET,NSET=' + disp_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            f.write(format_set_ids(femobj['Nodes']))
 
     def write_node_sets_constraints_planerotation(self, f):
         # get nodes
@@ -529,8 +597,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 if cnt == 0:
                     MPC = node_planerotation[i]
                     MPC_nodes.append(MPC)
-            for i in range(len(MPC_nodes)):
-                f.write(str(MPC_nodes[i]) + ',\n')
+            f.write(format_set_ids(MPC_nodes))
 
     def write_surfaces_contraints_contact(self, f):
         # get surface nodes and write them to file
@@ -553,9 +620,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                         else:
                             name = "IND" + str(obj)
                         f.write('*SURFACE, NAME =' + name + '\n')
-                        v = self.mesh_object.FemMesh.getccxVolumesByFace(ref_shape)
-                        for i in v:
-                            f.write("{},S{}\n".format(i[0], i[1]))
+                        v = self.femmesh.getccxVolumesByFace(ref_shape)
+                        f.write(''.join(["{},S{}\n".format(i[0], i[1]) for i in v]))
 
     def write_node_sets_constraints_transform(self, f):
         # get nodes
@@ -571,8 +637,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 f.write('*NSET,NSET=Rect' + trans_obj.Name + '\n')
             elif trans_obj.TransformType == "Cylindrical":
                 f.write('*NSET,NSET=Cylin' + trans_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            f.write(format_set_ids(femobj['Nodes']))
 
     def write_node_sets_constraints_temperature(self, f):
         # get nodes
@@ -585,8 +650,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             temp_obj = femobj['Object']
             f.write('** ' + temp_obj.Label + '\n')
             f.write('*NSET,NSET=' + temp_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            f.write(format_set_ids(femobj['Nodes']))
 
     def write_materials(self, f):
         f.write('\n***********************************************************\n')
@@ -955,17 +1019,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             direction_vec = femobj['Object'].DirectionVector
             for ref_shape in femobj['NodeLoadTable']:
                 f.write('** ' + ref_shape[0] + '\n')
-                for n in sorted(ref_shape[1]):
-                    node_load = ref_shape[1][n]
-                    if (direction_vec.x != 0.0):
-                        v1 = "{:.13E}".format(direction_vec.x * node_load)
-                        f.write(str(n) + ',1,' + v1 + '\n')
-                    if (direction_vec.y != 0.0):
-                        v2 = "{:.13E}".format(direction_vec.y * node_load)
-                        f.write(str(n) + ',2,' + v2 + '\n')
-                    if (direction_vec.z != 0.0):
-                        v3 = "{:.13E}".format(direction_vec.z * node_load)
-                        f.write(str(n) + ',3,' + v3 + '\n')
+                f.write(format_node_loads(ref_shape[1], direction_vec))
                 f.write('\n')
             f.write('\n')
 
@@ -983,13 +1037,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             f.write('*DLOAD\n')
             for ref_shape in femobj['PressureFaces']:
                 f.write('** ' + ref_shape[0] + '\n')
-                for face, fno in ref_shape[1]:
-                    if fno > 0:  # solid mesh face
-                        f.write("{},P{},{}\n".format(face, fno, rev * prs_obj.Pressure))
-                    elif fno == 0:  # on shell mesh face: fno == 0 --> normal of element face == face normal
-                        f.write("{},P,{}\n".format(face, rev * prs_obj.Pressure))
-                    elif fno == -1:  # on shell mesh face: fno == -1 --> normal of element face opposite direction face normal
-                        f.write("{},P,{}\n".format(face, -1 * rev * prs_obj.Pressure))
+                f.write(format_face_loads(ref_shape[1], rev * prs_obj.Pressure))
 
     def write_constraints_temperature(self, f):
         f.write('\n***********************************************************\n')
@@ -1021,21 +1069,21 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                     for elem in elem_tup:
                         ho = o.Shape.getElement(elem)
                         if ho.ShapeType == 'Face':
-                            v = self.mesh_object.FemMesh.getccxVolumesByFace(ho)
+                            v = self.femmesh.getccxVolumesByFace(ho)
                             f.write("** Heat flux on face {}\n".format(elem))
-                            for i in v:
-                                # SvdW: add factor to force heatflux to units system of t/mm/s/K # OvG: Only write out the VolumeIDs linked to a particular face
-                                f.write("{},F{},{},{}\n".format(i[0], i[1], heatflux_obj.AmbientTemp, heatflux_obj.FilmCoef * 0.001))
+                            # SvdW: add factor to force heatflux to units system of t/mm/s/K # OvG: Only write out the VolumeIDs linked to a particular face
+                            film = ",{},{}\n".format(heatflux_obj.AmbientTemp, heatflux_obj.FilmCoef * 0.001)
+                            f.write(''.join(["{},F{}".format(i[0], i[1]) + film for i in v]))
             elif heatflux_obj.ConstraintType == "DFlux":
                 f.write('*DFLUX\n')
                 for o, elem_tup in heatflux_obj.References:
                     for elem in elem_tup:
                         ho = o.Shape.getElement(elem)
                         if ho.ShapeType == 'Face':
-                            v = self.mesh_object.FemMesh.getccxVolumesByFace(ho)
+                            v = self.femmesh.getccxVolumesByFace(ho)
                             f.write("** Heat flux on face {}\n".format(elem))
-                            for i in v:
-                                f.write("{},S{},{}\n".format(i[0], i[1], heatflux_obj.DFlux * 0.001))
+                            dflux = ",{}\n".format(heatflux_obj.DFlux * 0.001)
+                            f.write(''.join(["{},S{}".format(i[0], i[1]) + dflux for i in v]))
 
     def write_constraints_fluidsection(self, f):
         f.write('\n***********************************************************\n')
@@ -1106,6 +1154,9 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 f.write('MF, PS\n')
         else:
             f.write('U\n')
+        if is_binary_result_output(self.solver_obj):
+            # the frd format is not set in the input file, but on the ccx command line
+            f.write('** frd result file format --> binary, ccx is started with: {}\n'.format(' '.join(get_ccx_output_arguments(self.solver_obj))))
         if not self.fluidsection_objects:
             f.write('*EL FILE\n')
             if self.solver_obj.MaterialNonlinearity == 'nonlinear':
@@ -1382,6 +1433,114 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
 
 
 # Helpers
+# the formatting helpers return whole data blocks, they are written with one write call
+def format_set_ids(ids):
+    # *NSET and *ELSET data lines, one id per line
+    if not ids:
+        return ''
+    return ',\n'.join(map(str, ids)) + ',\n'
+
+
+def format_node_loads(node_load_table, direction_vec):
+    # *CLOAD data lines of a node load table {node : load}, nodes sorted, only nonzero directions
+    x, y, z = direction_vec.x, direction_vec.y, direction_vec.z
+    line_format = ''
+    if x != 0.0:
+        line_format += '{0},1,{1:.13E}\n'
+    if y != 0.0:
+        line_format += '{0},2,{2:.13E}\n'
+    if z != 0.0:
+        line_format += '{0},3,{3:.13E}\n'
+    if not line_format:
+        return ''
+    return ''.join([
+        line_format.format(n, x * node_load, y * node_load, z * node_load)
+        for n, node_load in sorted(node_load_table.items())
+    ])
+
+
+def format_face_loads(pressure_faces, pressure):
+    # *DLOAD data lines of pressure faces [(element, face number), ...]
+    # fno > 0 --> solid mesh face
+    # fno == 0 --> on shell mesh face, normal of element face == face normal
+    # fno == -1 --> on shell mesh face, normal of element face opposite direction face normal
+    shell_loads = {0: ',P,{}\n'.format(pressure), -1: ',P,{}\n'.format(-1 * pressure)}
+    solid_load = ',{}\n'.format(pressure)
+    lines = []
+    for face, fno in pressure_faces:
+        if fno > 0:
+            lines.append('{},P{}'.format(face, fno) + solid_load)
+        elif fno in shell_loads:
+            lines.append(str(face) + shell_loads[fno])
+    return ''.join(lines)
+
+
+def is_binary_result_output(solver_obj):
+    # documents created before the property was added do not have it
+    return getattr(solver_obj, 'BinaryResultOutput', False) is True
+
+
+def get_ccx_output_arguments(solver_obj):
+    # ccx writes the frd file in binary format if started with -o bin, ascii is the default
+    if is_binary_result_output(solver_obj):
+        return ['-o', 'bin']
+    return []
+
+
+# the content hashes decide if split input files of the last run can be reused
+def get_femmesh_hash(femmesh, femmesh_connectivity=None):
+    # the node and connectivity arrays are hashed, the counts separate the blocks
+    # femmesh_connectivity ... [(element ids, connectivity)] of the volumes, faces and edges,
+    # see FemInputWriter.get_femmesh_connectivity(), pulled from the femmesh if not given
+    if femmesh_connectivity is None:
+        femmesh_connectivity = [
+            (element_ids, FemMeshTools.get_femelement_connectivity(femmesh, element_ids))
+            for element_ids in (femmesh.Volumes, femmesh.Faces, femmesh.Edges)
+        ]
+    content_hash = hashlib.sha1()
+    nodes = femmesh.Nodes
+    node_ids = np.fromiter(nodes.keys(), dtype=np.int64, count=len(nodes))
+    coords = np.fromiter(chain.from_iterable(nodes.values()), dtype=np.float64, count=3 * len(nodes)).reshape(-1, 3)
+    order = np.argsort(node_ids, kind='mergesort')
+    content_hash.update(np.int64(len(node_ids)).tobytes())
+    content_hash.update(node_ids[order].tobytes())
+    content_hash.update(coords[order].tobytes())
+    for element_ids, connectivity in femmesh_connectivity:
+        content_hash.update(np.int64(len(element_ids)).tobytes())
+        for node_count in sorted(connectivity):
+            ele_ids, ele_nodes = connectivity[node_count]
+            content_hash.update(np.array([node_count, len(ele_ids)], dtype=np.int64).tobytes())
+            content_hash.update(ele_ids.tobytes())
+            content_hash.update(np.ascontiguousarray(ele_nodes).tobytes())
+    return content_hash.hexdigest()
+
+
+def get_content_hash(mesh_hash, *femobj_lists):
+    # femobj_lists ... lists of femobj dicts, the FreeCAD document object is femobj['Object']
+    content_hash = hashlib.sha1(mesh_hash.encode('utf-8'))
+    for femobjs in femobj_lists:
+        for femobj in femobjs:
+            content_hash.update(get_object_content(femobj['Object']).encode('utf-8'))
+    return content_hash.hexdigest()
+
+
+def get_object_content(obj):
+    # property values and the geometry of the reference shapes of a constraint object
+    content = [obj.Name]
+    for prop in sorted(obj.PropertiesList):
+        if prop in ('References', 'ExpressionEngine', 'Proxy', 'Label2', 'Visibility'):
+            continue
+        content.append(prop + '=' + repr(getattr(obj, prop)))
+    if hasattr(obj, 'References'):
+        for o, elem_tup in obj.References:
+            for elem in elem_tup:
+                content.append(o.Name + ':' + elem)
+                ref_shape = FemMeshTools.get_element(o, elem)
+                if ref_shape is not None:
+                    content.append(ref_shape.exportBrepToString())
+    return '\n'.join(content)
+
+
 # ccx elset names: M .. Material, B .. Beam, R .. BeamRotation, D ..Direction, F .. Fluid, S .. Shell, TODO write comment into input file to elset ids and elset attributes
 def get_ccx_elset_name_standard(names):
     # standard max length = 80
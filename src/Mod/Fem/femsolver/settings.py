@@ -159,4 +159,11 @@ def get_dir_setting():
         return CUSTOM
 
 
+# ******** concurrent mesh search parameter ******************************************************
+def get_concurrent_mesh_search():
+    # the mesh searches of the solver input writer are done in a process pool, no Gui setting ATM
+    param_group = FreeCAD.ParamGet(_GENERAL_PARAM)
+    return param_group.GetBool("ConcurrentMeshSearch", False)
+
+
 ##  @}
@@ -0,0 +1,283 @@
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+__title__ = "FreeCAD FEM solver parametric study"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+## \addtogroup FEM
+#  @{
+
+'''
+Runs one analysis for every row of a parameter table.
+
+The parameter table is a list of dicts, one dict for each case:
+    {"ObjectName.Property": value, "ObjectName.DictProperty.Key": value, ...}
+
+from femsolver import study
+s = study.Study(
+    App.ActiveDocument.CalculiX,
+    [
+        {"ConstraintForce.Force": 1000.0, "SolidMaterial.Material.YoungsModulus": "200000 MPa"},
+        {"ConstraintForce.Force": 2000.0, "SolidMaterial.Material.YoungsModulus": "210000 MPa"},
+        {"ConstraintForce.Force": 2000.0, "FEMMeshGmsh.CharacteristicLengthMax": 5.0},
+    ],
+    maxProcesses=2
+)
+s.run()
+
+Every case gets its own working directory. The document is changed, the
+input files are written and the results are loaded in the main thread
+one case after the other. The solver processes run concurrently, at most
+maxProcesses at the same time. The number of threads of each solver
+process is set by OMP_NUM_THREADS, the default uses all cores.
+A summary of the result stats of all cases is written into study.csv
+in the study directory.
+'''
+
+import csv
+import multiprocessing
+import os
+import os.path
+import tempfile
+import time
+
+import FreeCAD as App
+import femtools.femutils as femutils
+from . import report
+from . import run
+
+
+_GENERAL_PARAM = "User parameter:BaseApp/Preferences/Mod/Fem/General"
+
+
+class Study(object):
+
+    def __init__(
+            self, solver, parameters, directory=None,
+            maxProcesses=None, threadsPerProcess=None, keepResults=True):
+        self.solver = solver
+        self.analysis = femutils.findAnalysisOfMember(solver)
+        self.parameters = parameters
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="femstudy")
+        self.directory = directory
+        cores = multiprocessing.cpu_count()
+        if maxProcesses is None:
+            maxProcesses = cores
+        self.maxProcesses = max(1, maxProcesses)
+        if threadsPerProcess is None:
+            threadsPerProcess = max(1, cores // self.maxProcesses)
+        self.threadsPerProcess = threadsPerProcess
+        self.keepResults = keepResults
+        self.cases = []
+        self._originalValues = {}
+
+    def run(self):
+        self._originalValues = self._getValues()
+        prefs = App.ParamGet(_GENERAL_PARAM)
+        keepResultsOnReRun = prefs.GetBool("KeepResultsOnReRun", False)
+        ompThreads = os.environ.get("OMP_NUM_THREADS")
+        # the results of one case must not be purged by the next case
+        prefs.SetBool("KeepResultsOnReRun", True)
+        os.environ["OMP_NUM_THREADS"] = str(self.threadsPerProcess)
+        try:
+            self._runCases()
+        finally:
+            prefs.SetBool("KeepResultsOnReRun", keepResultsOnReRun)
+            if ompThreads is None:
+                del os.environ["OMP_NUM_THREADS"]
+            else:
+                os.environ["OMP_NUM_THREADS"] = ompThreads
+            # meshes regenerated for a case are regenerated with the original values
+            self._remesh(self._setValues(self._originalValues))
+        self.writeTable(os.path.join(self.directory, "study.csv"))
+        return self.cases
+
+    def _runCases(self):
+        pending = list(enumerate(self.parameters))
+        running = []
+        while pending or running:
+            while pending and len(running) < self.maxProcesses:
+                index, values = pending.pop(0)
+                case = self._prepareCase(index, values)
+                self.cases.append(case)
+                if case.machine.failed:
+                    self._finishCase(case)
+                else:
+                    # the solver process runs in the machine thread
+                    case.machine.target = run.SOLVE
+                    case.machine.start()
+                    running.append(case)
+            finished = [c for c in running if not c.machine.running]
+            if not finished:
+                time.sleep(0.1)
+                continue
+            for case in finished:
+                case.machine.join()
+                case.report.extend(case.machine.report)
+                running.remove(case)
+                self._finishCase(case)
+
+    def _prepareCase(self, index, values):
+        App.Console.PrintMessage(
+            "Study case {} of {}: {}\n".format(
+                index + 1, len(self.parameters), values))
+        # every case starts from the original values, the values of the former case do not leak
+        self._remesh(self._setValues(self._getCaseValues(values)))
+        self.analysis.Document.recompute()
+        path = run._getUniquePath(
+            os.path.join(self.directory, self.solver.Label))
+        run._dirTypes[path] = None
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        case = _Case(index, values, path)
+        case.machine = self.solver.Proxy.createMachine(
+            self.solver, path, testmode=False)
+        # check and prepare use the document, they run before the next case changes it
+        self._runStage(case, run.PREPARE)
+        return case
+
+    def _remesh(self, changed):
+        for obj in changed:
+            if femutils.is_of_type(obj, "Fem::FemMeshGmsh"):
+                from femmesh import gmshtools
+                gmshtools.GmshTools(obj, self.analysis).create_mesh()
+
+    def _runStage(self, case, target):
+        case.machine.target = target
+        case.machine.start()
+        case.machine.join()
+        # every start of the machine begins with a new report
+        case.report.extend(case.machine.report)
+
+    def _finishCase(self, case):
+        if not case.machine.failed and not case.machine.aborted:
+            existing = set(femutils.get_member(
+                self.analysis, "Fem::FemResultObject"))
+            self._runStage(case, run.RESULTS)
+            results = [
+                r for r in femutils.get_member(
+                    self.analysis, "Fem::FemResultObject")
+                if r not in existing]
+            self._collectResults(case, results)
+        report.displayLog(case.report)
+        case.failed = case.machine.failed or case.machine.aborted
+        del run._dirTypes[case.directory]
+        case.machine = None
+        if case.failed:
+            App.Console.PrintError(
+                "Study case {} failed.\n".format(case.index + 1))
+
+    def _collectResults(self, case, results):
+        import femresult.resulttools as resulttools
+        for r in results:
+            r.Label = "Case{:03d}_{}".format(case.index + 1, r.Label)
+            case.results.append((r.Label, resulttools.get_all_stats(r)))
+            if not self.keepResults:
+                if femutils.is_of_type(r.Mesh, "Fem::FemMeshResult"):
+                    self.analysis.Document.removeObject(r.Mesh.Name)
+                self.analysis.Document.removeObject(r.Name)
+
+    def _getValues(self):
+        values = {}
+        for row in self.parameters:
+            for key in row:
+                objName, prop = key.split(".")[:2]
+                obj = self.analysis.Document.getObject(objName)
+                values[objName + "." + prop] = getattr(obj, prop)
+        return values
+
+    def _getCaseValues(self, values):
+        # the original values of all properties of the study with the values of the case
+        caseValues = dict(self._originalValues)
+        for key, value in values.items():
+            path = key.split(".")
+            if len(path) == 3:
+                # dict properties like the Material of material objects
+                d = dict(caseValues[path[0] + "." + path[1]])
+                d[path[2]] = value
+                caseValues[path[0] + "." + path[1]] = d
+            else:
+                caseValues[key] = value
+        return caseValues
+
+    def _setValues(self, values):
+        # returns the objects with a changed property value
+        changed = []
+        for key, value in values.items():
+            path = key.split(".")
+            obj = self.analysis.Document.getObject(path[0])
+            if obj is None:
+                raise ValueError("Study: no object {} found.".format(path[0]))
+            oldValue = getattr(obj, path[1])
+            if len(path) == 3:
+                # dict properties like the Material of material objects
+                d = dict(oldValue)
+                d[path[2]] = value
+                setattr(obj, path[1], d)
+            else:
+                setattr(obj, path[1], value)
+            if getattr(obj, path[1]) != oldValue and obj not in changed:
+                changed.append(obj)
+        return changed
+
+    def writeTable(self, path):
+        names = []
+        statTypes = []
+        for case in self.cases:
+            for name in case.values:
+                if name not in names:
+                    names.append(name)
+            for label, stats in case.results:
+                for s in sorted(stats):
+                    if s not in statTypes:
+                        statTypes.append(s)
+        header = ["Case", "Directory", "Failed"] + names + ["Result"]
+        for s in statTypes:
+            header += [s + "_min", s + "_avg", s + "_max"]
+        with open(path, "w") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for case in self.cases:
+                row = [case.index + 1, case.directory, case.failed]
+                row += [case.values.get(n, "") for n in names]
+                if not case.results:
+                    writer.writerow(row)
+                for label, stats in case.results:
+                    statValues = []
+                    for s in statTypes:
+                        statValues += list(stats.get(s, ("", "", "")))
+                    writer.writerow(row + [label] + statValues)
+        return path
+
+
+class _Case(object):
+
+    def __init__(self, index, values, directory):
+        self.index = index
+        self.values = values
+        self.directory = directory
+        self.machine = None
+        self.report = report.Report()
+        self.failed = False
+        self.results = []
+
+##  @}
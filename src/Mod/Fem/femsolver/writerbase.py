@@ -29,6 +29,7 @@ __url__ = "http://www.freecadweb.org"
 import FreeCAD
 import femmesh.meshtools as FemMeshTools
 import os
+from . import settings
 
 
 class FemInputWriter():
@@ -100,11 +101,13 @@ class FemInputWriter():
                 self.theshape = self.mesh_object.Shape
             elif hasattr(self.mesh_object, "Part"):
                 self.theshape = self.mesh_object.Part
-            self.femmesh = self.mesh_object.FemMesh
+            # geometry to mesh lookups of all constraints are cached for this writer run
+            self.femmesh = FemMeshTools.FemMeshLookupCache(self.mesh_object.FemMesh)
         else:
             FreeCAD.Console.PrintError('No finite elemente mesh object was given to the writer class. In rare cases this might not be an error.\n')
         self.femnodes_mesh = {}
         self.femelement_table = {}
+        self.femelement_connectivity = {}
         self.constraint_conflict_nodes = []
         self.femnodes_ele_table = {}
         self.femelements_edges_only = []
@@ -113,6 +116,36 @@ class FemInputWriter():
         self.femelement_faces_table = {}
         self.femelement_edges_table = {}
         self.femelement_count_test = True
+        # the independent mesh searches of the constraints are done in a process pool
+        # the results are merged in the order of the constraints, the input file is the same as in serial mode
+        self.concurrent_mesh_search = settings.get_concurrent_mesh_search()
+
+    def get_femelement_connectivity(self, element_type):
+        # the nodes of the 'Volumes', 'Faces' or 'Edges' are pulled from the femmesh only once per writer run
+        if element_type not in self.femelement_connectivity:
+            element_ids = getattr(self.femmesh, element_type)
+            self.femelement_connectivity[element_type] = (
+                element_ids,
+                FemMeshTools.get_femelement_connectivity(self.femmesh, element_ids)
+            )
+        return self.femelement_connectivity[element_type]
+
+    def get_femmesh_connectivity(self):
+        return [self.get_femelement_connectivity(t) for t in ('Volumes', 'Faces', 'Edges')]
+
+    def get_femelement_table(self):
+        # same as FemMeshTools.get_femelement_table(), but made from the cached connectivity
+        if FemMeshTools.is_solid_femmesh(self.femmesh):
+            element_type = 'Volumes'
+        elif FemMeshTools.is_face_femmesh(self.femmesh):
+            element_type = 'Faces'
+        elif FemMeshTools.is_edge_femmesh(self.femmesh):
+            element_type = 'Edges'
+        else:
+            FreeCAD.Console.PrintError('Neither solid nor face nor edge femmesh!\n')
+            return {}
+        element_ids, connectivity = self.get_femelement_connectivity(element_type)
+        return FemMeshTools.get_femelement_table_by_connectivity(element_ids, connectivity)
 
     def get_constraints_fixed_nodes(self):
         # get nodes
@@ -192,7 +225,7 @@ class FemInputWriter():
                 if not self.femnodes_mesh:
                     self.femnodes_mesh = self.femmesh.Nodes
                 if not self.femelement_table:
-                    self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
+                    self.femelement_table = self.get_femelement_table()
         # get node loads
         FreeCAD.Console.PrintMessage("  Finite element mesh nodes will be retrieved by searching the appropriate nodes in the finite element mesh.\n")
         FreeCAD.Console.PrintMessage("  The appropriate finite element mesh node load values will be calculated according to the finite element definition.\n")
@@ -221,13 +254,20 @@ class FemInputWriter():
         if not self.femnodes_mesh:
             self.femnodes_mesh = self.femmesh.Nodes
         if not self.femelement_table:
-            self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
+            self.femelement_table = self.get_femelement_table()
         if not self.femnodes_ele_table:
-            self.femnodes_ele_table = FemMeshTools.get_femnodes_ele_table(self.femnodes_mesh, self.femelement_table)
+            self.femnodes_ele_table = FemMeshTools.get_femnodes_ele_index(self.femelement_table, self.femnodes_mesh)
 
-        for femobj in self.pressure_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
+        # the faces of all pressure objects are searched at once, concurrent if set in the preferences
+        pressure_faces_list = FemMeshTools.get_pressure_objs_faces(
+            self.femmesh,
+            self.femelement_table,
+            self.femnodes_ele_table,
+            self.pressure_objects,
+            self.concurrent_mesh_search
+        )
+        for femobj, pressure_faces in zip(self.pressure_objects, pressure_faces_list):  # femobj --> dict, FreeCAD document object is femobj['Object']
             FreeCAD.Console.PrintMessage("Constraint pressure: " + femobj['Object'].Name + '\n')
-            pressure_faces = FemMeshTools.get_pressure_obj_faces(self.femmesh, self.femelement_table, self.femnodes_ele_table, femobj)
             femobj['PressureFaces'] = [(femobj['Object'].Name + ': face load', pressure_faces)]
             FreeCAD.Console.PrintLog('{}\n'.format(femobj['PressureFaces']))
 
@@ -275,14 +315,20 @@ class FemInputWriter():
                 FreeCAD.Console.PrintMessage('\n')
             if all_found is False:
                 if not self.femelement_table:
-                    self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
+                    self.femelement_table = self.get_femelement_table()
                 # we're going to use the binary search for get_femelements_by_femnodes()
                 # thus we need the parameter values self.femnodes_ele_table
                 if not self.femnodes_mesh:
                     self.femnodes_mesh = self.femmesh.Nodes
                 if not self.femnodes_ele_table:
-                    self.femnodes_ele_table = FemMeshTools.get_femnodes_ele_table(self.femnodes_mesh, self.femelement_table)
-                control = FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, self.femnodes_ele_table)
+                    self.femnodes_ele_table = FemMeshTools.get_femnodes_ele_index(self.femelement_table, self.femnodes_mesh)
+                control = FemMeshTools.get_femelement_sets(
+                    self.femmesh,
+                    self.femelement_table,
+                    self.material_objects,
+                    self.femnodes_ele_table,
+                    self.concurrent_mesh_search
+                )
                 if (self.femelement_count_test is True) and (control is False):  # we only need to set it, if it is still True
                     self.femelement_count_test = False
         if self.shellthickness_objects:
@@ -104,6 +104,7 @@ class FemInputWriterZ88(FemInputWriter.FemInputWriter):
         self.write_z88_memory_parameter()
         self.write_z88_solver_parameter()
         writing_time_string = "Writing time input file: " + str(round((time.clock() - timestart), 2)) + " seconds"
+        self.femmesh.print_lookup_statistics()
         FreeCAD.Console.PrintMessage(writing_time_string + ' \n\n')
         return self.dir_name
 
@@ -772,6 +772,118 @@ class TestCcxTools(unittest.TestCase):
 
         fcc_print('--------------- End of FEM tests FLow 1D thermomech analysis ---------------')
 
+    def test_6_input_data_lines(self):
+        # the data line blocks have to be the same as the ones written line by line by the former writer
+        from femsolver.calculix import writer
+
+        ids = [5, 1, 1000000, 17]
+        expected = ''
+        for n in ids:
+            expected += str(n) + ',\n'
+        self.assertEqual(writer.format_set_ids(ids), expected, "Set data lines are unexpected")
+        self.assertEqual(writer.format_set_ids([]), '', "Data lines of an empty set are unexpected")
+
+        node_load_table = {12: 0.25, 3: -1.5e-7, 7: 0.0, 100: 123456.789}
+        for direction_vec in (FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0.6, -0.8, 0), FreeCAD.Vector(1, 2, 3), FreeCAD.Vector(0, 0, 0)):
+            expected = ''
+            for n in sorted(node_load_table):
+                node_load = node_load_table[n]
+                if (direction_vec.x != 0.0):
+                    expected += str(n) + ',1,' + "{:.13E}".format(direction_vec.x * node_load) + '\n'
+                if (direction_vec.y != 0.0):
+                    expected += str(n) + ',2,' + "{:.13E}".format(direction_vec.y * node_load) + '\n'
+                if (direction_vec.z != 0.0):
+                    expected += str(n) + ',3,' + "{:.13E}".format(direction_vec.z * node_load) + '\n'
+            self.assertEqual(writer.format_node_loads(node_load_table, direction_vec), expected, "Node load data lines are unexpected: {}".format(direction_vec))
+
+        pressure_faces = [(1, 3), (2, 0), (3, -1), (4, 1), (5, -2)]
+        for pressure in (0.1, -2.5, 1e-12):
+            expected = ''
+            for face, fno in pressure_faces:
+                if fno > 0:
+                    expected += "{},P{},{}\n".format(face, fno, pressure)
+                elif fno == 0:
+                    expected += "{},P,{}\n".format(face, pressure)
+                elif fno == -1:
+                    expected += "{},P,{}\n".format(face, -1 * pressure)
+            self.assertEqual(writer.format_face_loads(pressure_faces, pressure), expected, "Face load data lines are unexpected: {}".format(pressure))
+
+    def test_7_split_input_file_reuse(self):
+        # split input files with unchanged content are reused in the next run, changed ones are written again
+        import os
+        import shutil
+        from femsolver.calculix import writer
+
+        split_dir = join(self.temp_dir, 'FEM_ccx_split_reuse')
+        if os.path.isdir(split_dir):
+            shutil.rmtree(split_dir)
+        os.makedirs(split_dir)
+        marker = '** marker of the last run\n'
+
+        def mark(file_name):
+            with open(file_name, 'a') as f:
+                f.write(marker)
+
+        def is_marked(file_name):
+            with open(file_name, 'r') as f:
+                return f.read().endswith(marker)
+
+        doc = FreeCAD.open(join(self.test_file_dir, 'cube_static.FCStd'))
+        try:
+            doc.CalculiX.SplitInputWriter = True
+            fea = ccxtools.FemToolsCcx(doc.Analysis, test_mode=True)
+            fea.update_objects()
+            fea.setup_working_dir(split_dir)
+            fea.write_inp_file()
+            name = os.path.splitext(fea.inp_file_name)[0]
+            mesh_file = name + '_Node_Elem_sets.inp'
+            pressure_file = name + '_Pressure.inp'
+            hash_file = name + '_hashes.json'
+            self.assertTrue(os.path.isfile(hash_file), "Hash file of the split input files was not written")
+
+            # unchanged --> reused
+            mark(mesh_file)
+            mark(pressure_file)
+            fea.write_inp_file()
+            self.assertTrue(is_marked(mesh_file), "Unchanged mesh file was written again")
+            self.assertTrue(is_marked(pressure_file), "Unchanged pressure file was written again")
+
+            # changed pressure --> only the pressure file is written
+            doc.FemConstraintPressure.Pressure = 2 * doc.FemConstraintPressure.Pressure
+            fea.update_objects()
+            fea.write_inp_file()
+            self.assertTrue(is_marked(mesh_file), "Mesh file was written again on a changed pressure")
+            self.assertFalse(is_marked(pressure_file), "Pressure file of the changed pressure was reused")
+
+            # missing hash file --> everything is written
+            mark(pressure_file)
+            os.remove(hash_file)
+            fea.write_inp_file()
+            self.assertFalse(is_marked(mesh_file), "Mesh file was reused without hash file")
+            self.assertFalse(is_marked(pressure_file), "Pressure file was reused without hash file")
+
+            # the empty pressure file of a frequency analysis is not reused in the next static analysis
+            doc.CalculiX.AnalysisType = 'frequency'
+            fea.update_objects()
+            fea.write_inp_file()
+            with open(pressure_file, 'r') as f:
+                self.assertNotIn('*DLOAD', f.read(), "Pressure is written in frequency analysis")
+            doc.CalculiX.AnalysisType = 'static'
+            fea.update_objects()
+            fea.write_inp_file()
+            with open(pressure_file, 'r') as f:
+                self.assertIn('*DLOAD', f.read(), "Empty pressure file of the frequency analysis was reused")
+
+            # the mesh hash depends on the mesh content only
+            femmesh = doc.Mesh.FemMesh
+            mesh_hash = writer.get_femmesh_hash(femmesh)
+            self.assertEqual(writer.get_femmesh_hash(femmesh.copy()), mesh_hash, "Hash of the copied mesh differs")
+            changed_mesh = femmesh.copy()
+            changed_mesh.addNode(100.0, 100.0, 100.0)
+            self.assertNotEqual(writer.get_femmesh_hash(changed_mesh), mesh_hash, "Hash of the changed mesh is unchanged")
+        finally:
+            FreeCAD.closeDocument(doc.Name)
+
     def tearDown(self):
         # clearance, is executed after every test
         FreeCAD.closeDocument(self.doc_name)
@@ -916,3 +1028,38 @@ if FEM unit test is fine --> commit new FEM unit test results
 TODO compare the inp file of the helper with the inp file of FEM unit tests
 TODO the better way: move the result creation inside the TestFem and add some preference to deactivate this because it needs ccx
 '''
+
+
+def benchmark_ccx_input_writer(repeat=5):
+    '''writes the CalculiX input files of the ccx test files repeat times
+    and prints the writing time and the throughput of the input file writer
+
+    from femtest.testccxtools import benchmark_ccx_input_writer
+    benchmark_ccx_input_writer()
+    '''
+
+    import os
+    import time
+
+    test_file_dir = join(testtools.get_fem_test_home_dir(), 'ccx')
+    benchmark_dir = join(testtools.get_fem_test_tmp_dir(), 'FEM_ccx_writer_benchmark')
+    if not os.path.isdir(benchmark_dir):
+        os.makedirs(benchmark_dir)
+
+    for base_name in ['cube_static', 'cube_frequency', 'spine_thermomech', 'Flow1D_thermomech']:
+        doc = FreeCAD.open(join(test_file_dir, base_name + '.FCStd'))
+        fea = ccxtools.FemToolsCcx(doc.Analysis, test_mode=True)
+        fea.update_objects()
+        fea.setup_working_dir(benchmark_dir)
+        times = []
+        for i in range(repeat):
+            timestart = time.time()
+            fea.write_inp_file()
+            times.append(time.time() - timestart)
+        inp_size = os.path.getsize(fea.inp_file_name)
+        best_time = max(min(times), 1e-9)
+        fcc_print(
+            '{}: {} bytes, best of {}: {:.4f} s, {:.2f} MB/s'
+            .format(base_name, inp_size, repeat, best_time, inp_size / best_time / 1e6)
+        )
+        FreeCAD.closeDocument(doc.Name)
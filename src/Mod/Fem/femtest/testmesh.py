@@ -29,6 +29,7 @@ import unittest
 from . import utilstest as testtools
 from .utilstest import fcc_print
 
+import os
 from os.path import join
 
 
@@ -136,6 +137,118 @@ class TestMeshCommon(unittest.TestCase):
         self.assertTrue(True if read_node_line in expected else False,
                         "Problem in test_writeAbaqus_precision, \n{0}\n{1}".format(read_node_line, expected))
 
+    def test_mesh_lookup_cache(self):
+        # the lookups of a shape are done once, other shapes and changed shapes are looked up again
+        import femmesh.meshtools as meshtools
+
+        class LookupCounterMesh(object):
+            NodeCount = 8
+
+            def __init__(self):
+                self.lookups = []
+
+            def getNodesByFace(self, face):
+                self.lookups.append(face)
+                return [len(self.lookups)]
+
+        box = self.active_doc.addObject('Part::Box', 'Box')
+        self.active_doc.recompute()
+        femmesh = LookupCounterMesh()
+        cache = meshtools.FemMeshLookupCache(femmesh)
+        nodes = cache.getNodesByFace(box.Shape.Faces[0])
+        self.assertEqual(nodes, [1], "Nodes of the first lookup are unexpected")
+        nodes.append(100)
+        self.assertEqual(cache.getNodesByFace(box.Shape.Faces[0]), [1], "Nodes of a cached lookup are unexpected")
+        self.assertEqual((cache.hits, cache.misses, len(femmesh.lookups)), (1, 1, 1), "Same face was looked up again")
+        self.assertEqual(cache.getNodesByFace(box.Shape.Faces[1]), [2], "Nodes of another face are unexpected")
+        self.assertEqual((cache.hits, cache.misses), (1, 2), "Another face was not looked up")
+        self.assertEqual(cache.NodeCount, 8, "Mesh attribute is not taken from the mesh")
+        box.Length = 20
+        self.active_doc.recompute()
+        self.assertEqual(cache.getNodesByFace(box.Shape.Faces[0]), [3], "Nodes of the changed face are unexpected")
+        self.assertEqual((cache.hits, cache.misses), (1, 3), "Changed face was not looked up")
+
+    def test_mesh_concurrent_element_search(self):
+        # the concurrent search has to find the same elements in the same order as the serial one
+        import femmesh.meshtools as meshtools
+        doc = FreeCAD.open(join(testtools.get_fem_test_home_dir(), 'ccx', 'cube_static.FCStd'))
+        try:
+            box = doc.getObject('Box')
+            femmesh = doc.getObject('Mesh').FemMesh
+            femelement_table = meshtools.get_femelement_table(femmesh)
+            femnodes_ele_index = meshtools.get_femnodes_ele_index(femelement_table, femmesh.Nodes)
+            references_list = [
+                [(box, ('Solid1', ))],
+                [(box, ('Face1', 'Face2'))],
+                [(box, ('Face6', )), (box, ('Solid1', ))]
+            ]
+            expected = [
+                meshtools.get_femelements_by_references(femmesh, femelement_table, references, femnodes_ele_index)
+                for references in references_list
+            ]
+            self.assertEqual(sorted(expected[0]), sorted(femelement_table), "Elements of the solid are unexpected")
+            concurrent = meshtools.get_femelements_by_references_concurrent(femmesh, femnodes_ele_index, references_list)
+            self.assertEqual(concurrent, expected, "Elements of the concurrent search differ from the serial search")
+
+            # no process is forked outside of the main thread, the search is done serial
+            import threading
+            results = {}
+
+            def search():
+                results['pool'] = meshtools.get_search_process_pool(femnodes_ele_index)
+                results['elements'] = meshtools.get_femelements_by_references_concurrent(
+                    femmesh, femnodes_ele_index, references_list
+                )
+            thread = threading.Thread(target=search)
+            thread.start()
+            thread.join()
+            self.assertIsNone(results['pool'], "Process pool created outside of the main thread")
+            self.assertEqual(results['elements'], expected, "Elements of the search in a thread differ from the serial search")
+        finally:
+            FreeCAD.closeDocument(doc.Name)
+
+    def test_mesh_xdmf_write_read(self):
+        # the Fenics XDMF files written in ASCII and in raw binary encoding have to read back the same mesh
+        # HDF5 encoding needs h5py, it is not tested
+        import feminout.importToolsFem as importToolsFem
+        import feminout.readFenicsXDMF as readFenicsXDMF
+        import feminout.writeFenicsXDMF as writeFenicsXDMF
+        tetra4 = Fem.FemMesh()
+        tetra4.addNode(0, 0, 0, 1)
+        tetra4.addNode(10.5, 0, 0, 2)
+        tetra4.addNode(0, 8.25, 0, 3)
+        tetra4.addNode(0, 0, 6.125, 4)
+        tetra4.addNode(-4.75, -2.5, -1.5, 5)
+        tetra4.addVolume([1, 2, 3, 4])
+        tetra4.addVolume([1, 3, 2, 5])
+        # the element order is determined by the edges
+        for edge in [(1, 2), (2, 3), (3, 1), (1, 4), (2, 4), (3, 4), (1, 5), (2, 5), (3, 5)]:
+            tetra4.addEdge(list(edge))
+        mesh_object = self.active_doc.addObject('Fem::FemMeshObject', 'Mesh')
+        mesh_object.FemMesh = tetra4
+
+        for encoding in [writeFenicsXDMF.ENCODING_ASCII, writeFenicsXDMF.ENCODING_BINARY]:
+            outfile = join(testtools.get_fem_test_tmp_dir(), 'tetra4_mesh_' + encoding.lower() + '.xdmf')
+            writeFenicsXDMF.write_fenics_mesh_xdmf(mesh_object, outfile, encoding=encoding)
+            femmesh = importToolsFem.make_femmesh(readFenicsXDMF.read_fenics_mesh_xdmf(outfile))
+            self.assertEqual(
+                femmesh.NodeCount,
+                tetra4.NodeCount,
+                "Test writing and reading " + encoding + " XDMF file failed. Node count is different.\n"
+            )
+            self.assertEqual(
+                femmesh.VolumeCount,
+                tetra4.VolumeCount,
+                "Test writing and reading " + encoding + " XDMF file failed. Volume count is different.\n"
+            )
+            # the nodes are renumbered, the volumes keep their order and the order of their nodes
+            for written, read in zip(tetra4.Volumes, femmesh.Volumes):
+                self.assertEqual(
+                    [femmesh.Nodes[n] for n in femmesh.getElementNodes(read)],
+                    [tetra4.Nodes[n] for n in tetra4.getElementNodes(written)],
+                    "Test writing and reading " + encoding + " XDMF file failed. Volumes are different.\n"
+                )
+
     def tearDown(self):
         FreeCAD.closeDocument(self.doc_name)
         pass
@@ -218,6 +331,70 @@ class TestMeshEleTetra10(unittest.TestCase):
         obj.ViewObject.DisplayMode = "Faces, Wireframe & Nodes"
         '''
 
+    def test_tetra10_femnodes_ele_index(self):
+        # tetra10 element: the array based index has to find the same elements and faces as the femnodes_ele_table
+        import femmesh.meshtools as meshtools
+        femelement_table = meshtools.get_femelement_table(self.femmesh)
+        femnodes_ele_table = meshtools.get_femnodes_ele_table(self.femmesh.Nodes, femelement_table)
+        femnodes_ele_index = meshtools.get_femnodes_ele_index(femelement_table, self.femmesh.Nodes)
+        self.assertEqual(dict(femnodes_ele_index), femnodes_ele_table, "The femnodes_ele_index differs from the femnodes_ele_table")
+        # the index of another element table of the same mesh has to be built from that table and the given nodes
+        first_element = self.femmesh.Volumes[0]
+        first_element_table = {first_element: femelement_table[first_element]}
+        first_element_index = meshtools.get_femnodes_ele_index(first_element_table)
+        self.assertEqual(sorted(first_element_index), sorted(femelement_table[first_element]), "Nodes of the femnodes_ele_index of one element are unexpected")
+        first_element_index = meshtools.get_femnodes_ele_index(first_element_table, self.femmesh.Nodes)
+        self.assertEqual(
+            dict(first_element_index),
+            meshtools.get_femnodes_ele_table(self.femmesh.Nodes, first_element_table),
+            "The femnodes_ele_index of one element with the mesh nodes differs from the femnodes_ele_table"
+        )
+        for node_set in ([1, 2, 3, 5, 6, 7], [2, 3, 4, 6, 9, 10], [1, 2, 3], list(range(1, 11))):
+            bit_pattern_dict = meshtools.get_bit_pattern_dict(femelement_table, femnodes_ele_table, node_set)
+            expected_faces = meshtools.get_ccxelement_faces_from_binary_search(bit_pattern_dict)
+            self.assertEqual(femnodes_ele_index.get_ccxelement_faces(node_set), expected_faces, "Faces found with the femnodes_ele_index are unexpected")
+            expected_volumes = meshtools.get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_table, node_set)
+            volumes = meshtools.get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_index, node_set)
+            self.assertEqual(volumes, expected_volumes, "Volumes found with the femnodes_ele_index are unexpected")
+
+    def test_tetra10_bulk_create(self):
+        # tetra10 element: creating in one call from arrays and from mesh data dicts
+        import feminout.importToolsFem as importToolsFem
+        nodes = self.expected_nodes['nodes']
+        node_ids = sorted(nodes)
+        node_coords = [tuple(nodes[n]) for n in node_ids]
+        femmesh = importToolsFem.make_femmesh_from_arrays(
+            (node_ids, node_coords),
+            {'Tetra10Elem': ([1], [self.expected_elem['volumes'][1]])}
+        )
+        dict_femmesh = importToolsFem.make_femmesh({
+            'Nodes': nodes,
+            'Tetra10Elem': {1: self.expected_elem['volumes'][1]}
+        })
+        for mesh in (femmesh, dict_femmesh):
+            node_data = {
+                'count': mesh.NodeCount,
+                'nodes': mesh.Nodes
+            }
+            elem_data = {
+                'volcount': mesh.VolumeCount,
+                'tetcount': mesh.TetraCount,
+                'volumes': [mesh.Volumes[0], mesh.getElementNodes(mesh.Volumes[0])]
+            }
+            self.assertEqual(node_data, self.expected_nodes, "Nodes of bulk created " + self.elem + "mesh element are unexpected")
+            self.assertEqual(elem_data, self.expected_elem, "Elements of bulk created " + self.elem + "mesh element are unexpected")
+
+    def test_tetra10_femmesh2mesh(self):
+        # tetra10 element: the surface of a single element are its four corner node faces
+        import femmesh.femmesh2mesh as femmesh2mesh
+        out_mesh = femmesh2mesh.femmesh_2_mesh(self.femmesh)
+        nodes = self.expected_nodes['nodes']
+        expected = []
+        for face in ([1, 2, 3], [1, 4, 2], [2, 4, 3], [3, 4, 1]):
+            expected.append([list(nodes[n]) for n in face])
+        triangles = [out_mesh[i:i + 3] for i in range(0, len(out_mesh), 3)]
+        self.assertEqual(sorted(triangles), sorted(expected), "Surface of the " + self.elem + " mesh element is unexpected")
+
     def test_tetra10_inp(self):
         # tetra10 element: reading from and writing to inp mesh file format
         filetyp = 'inp'
@@ -263,6 +440,66 @@ class TestMeshEleTetra10(unittest.TestCase):
             "Test writing " + self.elem + " mesh to " + filetyp + " file failed. Volumes are different.\n"
         )
 
+    def test_tetra10_inp_python(self):
+        # tetra10 element: reading an inp file with include file and sets by the python inp reader
+        import feminout.importInpMesh as importInpMesh
+        infile = self.base_outfile + 'include.inp'
+        with open(infile, 'w') as f:
+            f.write('*INCLUDE, INPUT=' + self.base_testfile + 'inp\n')
+            f.write('*NSET, NSET=Ncorners, GENERATE\n1, 4, 1\n')
+        femmesh = importInpMesh.read(infile)
+        self.assertEqual(
+            femmesh.Nodes,
+            self.expected_nodes['nodes'],
+            "Test reading " + self.elem + " mesh by the python inp reader failed. Nodes are different.\n"
+        )
+        self.assertEqual(
+            [femmesh.Volumes[0], femmesh.getElementNodes(femmesh.Volumes[0])],
+            self.expected_elem['volumes'],
+            "Test reading " + self.elem + " mesh by the python inp reader failed. Volumes are different.\n"
+        )
+        groups = sorted(
+            (femmesh.getGroupName(g), femmesh.getGroupElementType(g), sorted(femmesh.getGroupElements(g)))
+            for g in femmesh.Groups
+        )
+        expected_groups = [
+            ('Eall', 'Volume', [1]),
+            ('Evolumes', 'Volume', [1]),
+            ('Nall', 'Node', list(range(1, 11))),
+            ('Ncorners', 'Node', [1, 2, 3, 4]),
+        ]
+        self.assertEqual(
+            groups,
+            expected_groups,
+            "Test reading " + self.elem + " mesh by the python inp reader failed. Groups are different.\n"
+        )
+
+    def test_tetra10_inp_python_include_data(self):
+        # an include file with data lines only continues the block of the keyword before the *INCLUDE
+        import feminout.importInpMesh as importInpMesh
+        infile = self.base_outfile + 'include_data.inp'
+        with open(self.base_outfile + 'nodes.inc', 'w') as f:
+            f.write('1, 0.0, 0.0, 0.0\n2, 1.0, 0.0, 0.0\n3, 0.0, 1.0, 0.0\n4, 0.0, 0.0, 1.0\n')
+        with open(infile, 'w') as f:
+            f.write('*NODE, NSET=Nall\n')
+            f.write('*INCLUDE, INPUT=' + os.path.basename(self.base_outfile) + 'nodes.inc\n')
+            f.write('*ELEMENT, TYPE=C3D4, ELSET=Eall\n1, 1, 2, 3, 4\n')
+        femmesh = importInpMesh.read(infile)
+        self.assertEqual(
+            femmesh.NodeCount,
+            4,
+            "Test reading node lines of an include file by the python inp reader failed. Nodes are missing.\n"
+        )
+        groups = dict(
+            (femmesh.getGroupName(g), sorted(femmesh.getGroupElements(g)))
+            for g in femmesh.Groups
+        )
+        self.assertEqual(
+            groups.get('Nall'),
+            [1, 2, 3, 4],
+            "Test reading node lines of an include file by the python inp reader failed. Node set is different.\n"
+        )
+
     def test_tetra10_unv(self):
         # tetra10 element: reading from and writing to unv mesh file format
         filetyp = 'unv'
@@ -225,6 +225,83 @@ class TestResult(unittest.TestCase):
         self.assertEqual(read_mflow, expected_mflow, "Values of read mflow result data are unexpected")
         self.assertEqual(read_npressure, expected_npressure, "Values of read npressure result data are unexpected")
 
+    def test_read_frd_numpy_reader(self):
+        # the numpy based frd reader has to return the same data as the line by line reader
+        from feminout.importCcxFrdResults import read_frd_result as read_frd_lines
+        from feminout.readCcxFrd import read_frd_result as read_frd_arrays
+        for frd_name in ['cube_static.frd', 'cube_frequency.frd', 'spine_thermomech.frd', 'Flow1D_thermomech.frd']:
+            frd_file = join(testtools.get_fem_test_home_dir(), 'ccx', frd_name)
+            expected_frd_content = read_frd_lines(frd_file)
+            frd_content = read_frd_arrays(frd_file)
+            self.assertEqual(sorted(frd_content.keys()), sorted(expected_frd_content.keys()), "Keys of read frd data are unexpected: " + frd_name)
+            for key in expected_frd_content.keys():
+                if key == 'Results':
+                    continue
+                self.assertEqual(dict(frd_content[key]), expected_frd_content[key], "Values of read {} data are unexpected: {}".format(key, frd_name))
+            self.assertEqual(len(frd_content['Results']), len(expected_frd_content['Results']), "Number of read result sets is unexpected: " + frd_name)
+            for result_set, expected_result_set in zip(frd_content['Results'], expected_frd_content['Results']):
+                self.assertEqual(sorted(result_set.keys()), sorted(expected_result_set.keys()), "Keys of read result set are unexpected: " + frd_name)
+                for key in expected_result_set.keys():
+                    if key in ('number', 'time'):
+                        continue
+                    self.assertEqual(dict(result_set[key]), expected_result_set[key], "Values of read {} result data are unexpected: {}".format(key, frd_name))
+
+    def test_read_frd_binary(self):
+        # a binary frd file (ccx -o bin) has to give the values of the ascii one, the results are saved in single precision
+        import numpy as np
+        from feminout.readCcxFrd import read_frd_result as read_frd
+        expected_frd_content = read_frd(join(testtools.get_fem_test_home_dir(), 'ccx', 'cube_static.frd'))
+        frd_content = read_frd(join(testtools.get_fem_test_home_dir(), 'ccx', 'cube_static_binary.frd'))
+        self.assertEqual(sorted(frd_content.keys()), sorted(expected_frd_content.keys()), "Keys of read binary frd data are unexpected")
+        for key in expected_frd_content.keys():
+            if key == 'Results':
+                continue
+            self.assertEqual(dict(frd_content[key]), dict(expected_frd_content[key]), "Values of read binary {} data are unexpected".format(key))
+        self.assertEqual(len(frd_content['Results']), len(expected_frd_content['Results']), "Number of read binary result sets is unexpected")
+        for result_set, expected_result_set in zip(frd_content['Results'], expected_frd_content['Results']):
+            self.assertEqual(sorted(result_set.keys()), sorted(expected_result_set.keys()), "Keys of read binary result set are unexpected")
+            self.assertEqual(result_set['time'], expected_result_set['time'], "Time of read binary result set is unexpected")
+            for key in expected_result_set.keys():
+                if key in ('number', 'time'):
+                    continue
+                self.assertEqual(result_set[key].ids.tolist(), expected_result_set[key].ids.tolist(), "Nodes of read binary {} result data are unexpected".format(key))
+                self.assertTrue(np.allclose(result_set[key].data, expected_result_set[key].data, rtol=1e-6, atol=1e-12), "Values of read binary {} result data are unexpected".format(key))
+
+        # node coordinates in single precision, format flag 2 instead of 3
+        with open(join(testtools.get_fem_test_home_dir(), 'ccx', 'cube_static_binary.frd'), 'rb') as f:
+            data = f.read()
+        header = b'    2C                           280                                     3\n'
+        start = data.index(header) + len(header)
+        end = start + 280 * np.dtype([('id', '<i4'), ('coords', '<f8', (3, ))]).itemsize
+        nodes = np.frombuffer(data, [('id', '<i4'), ('coords', '<f8', (3, ))], 280, start)
+        float_nodes = np.zeros(280, [('id', '<i4'), ('coords', '<f4', (3, ))])
+        float_nodes['id'] = nodes['id']
+        float_nodes['coords'] = nodes['coords']
+        float_frd = join(testtools.get_fem_test_tmp_dir(), 'cube_static_binary_float.frd')
+        with open(float_frd, 'wb') as f:
+            f.write(data[:start - 2] + b'2\n' + float_nodes.tobytes() + data[end:])
+        frd_content = read_frd(float_frd)
+        self.assertEqual(sorted(frd_content['Nodes'].keys()), sorted(expected_frd_content['Nodes'].keys()), "Nodes of read binary float frd data are unexpected")
+        self.assertTrue(
+            np.allclose(frd_content['Nodes'].data, expected_frd_content['Nodes'].data, rtol=1e-6),
+            "Coordinates of read binary float frd data are unexpected"
+        )
+        self.assertEqual(dict(frd_content['Tetra10Elem']), dict(expected_frd_content['Tetra10Elem']), "Elements of read binary float frd data are unexpected")
+
+    def test_read_frd_step_index(self):
+        # single steps read by the streaming index have to be the same as the ones of the full read
+        frd_file = join(testtools.get_fem_test_home_dir(), 'ccx', 'Flow1D_thermomech.frd')
+        from feminout.readCcxFrd import read_frd_result as read_frd
+        from feminout.readCcxFrd import FrdStepIndex
+        expected_results = read_frd(frd_file)['Results']
+        frd_index = FrdStepIndex(frd_file)
+        self.assertEqual(len(frd_index), len(expected_results), "Number of indexed result sets is unexpected")
+        for step in (12, 0, 5):
+            result_set = frd_index.get_result_set(step)
+            self.assertEqual(frd_index.get_step_info(step)['time'], expected_results[step]['time'], "Time of indexed step is unexpected")
+            for key in ('mflow', 'npressure'):
+                self.assertEqual(dict(result_set[key]), dict(expected_results[step][key]), "Values of indexed {} result data are unexpected".format(key))
+
     def get_stress_values(self):
         # node 5 von calculix cantilver 3D example
         # doc = FreeCAD.open(FreeCAD.ConfigGet("AppHomePath") + 'data/examples/FemCalculixCantilever3D.FCStd')
@@ -265,6 +342,74 @@ class TestResult(unittest.TestCase):
         # fcc_print(disp_abs)
         self.assertEqual(disp_abs, expected_dispabs, "Calculated displacement abs are not the expected values.")
 
+    def test_batch_calculations(self):
+        # the batch calculations have to return the same values as the calculations for one node
+        from femresult.resulttools import calculate_von_mises_batch
+        from femresult.resulttools import calculate_principal_stress_batch
+        from femresult.resulttools import calculate_disp_abs_batch
+        stress = self.get_stress_values()
+        stress_nan = (float('NaN'),) * 6
+        stresses = [stress, stress_nan, stress]
+        mises = calculate_von_mises_batch(stresses)
+        self.assertEqual(round(mises[0], 4), 283.2082, "Calculated batch von Mises stress is not the expected value.")
+        self.assertEqual(round(mises[2], 4), 283.2082, "Calculated batch von Mises stress is not the expected value.")
+        prin = calculate_principal_stress_batch(stresses)
+        rounded_prin = tuple([round(p, 4) for p in prin[2]])
+        self.assertEqual(rounded_prin, (-178.0076, -194.0749, -468.9075, 145.4499), "Calculated batch principal stresses are not the expected values.")
+        self.assertTrue(all([p != p for p in prin[1]]), "Batch principal stresses of a NaN stress are not NaN.")
+        disp_xyz = [FreeCAD.Vector(8.12900E+00, 3.38889E-02, -8.69237E+01)] * 2
+        disp_abs = calculate_disp_abs_batch(disp_xyz)
+        self.assertEqual(round(disp_abs[1], 6), 87.302986, "Calculated batch displacement abs are not the expected values.")
+
+    def test_compact_result_storage(self):
+        # node data of results in compact storage has to be the same after save and reopen
+        import ObjectsFem
+        from femresult import resultstorage
+        doc = FreeCAD.newDocument('compact_results')
+        results = []
+        for step in range(3):
+            res_obj = ObjectsFem.makeResultMechanical(doc, 'compact_results')
+            res_obj.NodeNumbers = [1, 2, 3]
+            res_obj.DisplacementVectors = [FreeCAD.Vector(step, 0.5, 1.0)] * 3
+            res_obj.NodeStressXX = [0.5, 1.5, step]
+            resultstorage.set_compact_storage(res_obj, False, results[0] if results else None)
+            results.append(res_obj)
+        self.assertEqual(results[1].NodeNumbersResult, results[0], "NodeNumbers of result steps are not shared")
+        self.assertEqual(results[2].NodeNumbersResult, results[0], "NodeNumbers of result steps are not shared")
+        fc_file = join(testtools.get_fem_test_tmp_dir(), 'compact_results.FCStd')
+        doc.saveAs(fc_file)
+        for res_obj in results:
+            self.assertEqual(res_obj.NodeNumbers, [1, 2, 3], "NodeNumbers are changed by the save")
+        # the NodeNumbers are only saved in the packed node data
+        import zipfile
+        with zipfile.ZipFile(fc_file) as fc_zip:
+            document_xml = fc_zip.read('Document.xml').decode('utf-8')
+        self.assertNotIn('name="NodeNumbers"', document_xml, "NodeNumbers of compact results are saved in the Document.xml")
+        names = [res_obj.Name for res_obj in results]
+        FreeCAD.closeDocument(doc.Name)
+
+        doc = FreeCAD.open(fc_file)
+        for step, name in enumerate(names):
+            res_obj = doc.getObject(name)
+            self.assertEqual(res_obj.NodeNumbers, [1, 2, 3], "NodeNumbers of compact result are unexpected")
+            self.assertEqual(res_obj.getPropertyStatus('NodeNumbers'), ['Transient'], "NodeNumbers of compact result are not transient")
+            self.assertEqual(res_obj.DisplacementVectors, [FreeCAD.Vector(step, 0.5, 1.0)] * 3, "Displacements of compact result are unexpected")
+            self.assertEqual(res_obj.NodeStressXX, [0.5, 1.5, step], "Stresses of compact result are unexpected")
+
+        # the NodeNumbers of the result holding them for the other results are saved with these once it is removed
+        doc.removeObject(names[0])
+        doc.save()
+        FreeCAD.closeDocument(doc.Name)
+
+        doc = FreeCAD.open(fc_file)
+        self.assertIsNone(doc.getObject(names[0]), "Removed compact result is restored")
+        for step, name in list(enumerate(names))[1:]:
+            res_obj = doc.getObject(name)
+            self.assertEqual(res_obj.NodeNumbers, [1, 2, 3], "NodeNumbers of compact result are lost with the removed result")
+            self.assertEqual(res_obj.DisplacementVectors, [FreeCAD.Vector(step, 0.5, 1.0)] * 3, "Displacements of compact result are unexpected")
+            self.assertEqual(res_obj.NodeStressXX, [0.5, 1.5, step], "Stresses of compact result are unexpected")
+        FreeCAD.closeDocument(doc.Name)
+
     def tearDown(self):
         # clearance, is executed after every test
         FreeCAD.closeDocument(self.doc_name)
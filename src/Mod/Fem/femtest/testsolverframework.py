@@ -197,6 +197,74 @@ class TestSolverFrameWork(unittest.TestCase):
         self.active_doc.saveAs(save_fc_file)
         fcc_print('--------------- End of FEM tests solver frame work ---------------')
 
+    def test_solver_framework_study(self):
+        # every case of a study starts from the original values, they are set back after the study
+        import csv
+        from femsolver import study
+
+        box = self.active_doc.addObject("Part::Box", "Box")
+        analysis = ObjectsFem.makeAnalysis(self.active_doc, 'Analysis')
+        material_object = ObjectsFem.makeMaterialSolid(self.active_doc, 'MechanicalMaterial')
+        mat = material_object.Material
+        mat['Name'] = "Steel-Generic"
+        mat['YoungsModulus'] = "200000 MPa"
+        mat['PoissonRatio'] = "0.30"
+        mat['Density'] = "7900 kg/m^3"
+        material_object.Material = mat
+        analysis.addObject(material_object)
+        fixed_constraint = self.active_doc.addObject("Fem::ConstraintFixed", "FemConstraintFixed")
+        fixed_constraint.References = [(box, "Face1")]
+        analysis.addObject(fixed_constraint)
+        force_constraint = self.active_doc.addObject("Fem::ConstraintForce", "FemConstraintForce")
+        force_constraint.References = [(box, "Face6")]
+        force_constraint.Force = 40000.0
+        force_constraint.Direction = (box, ["Edge5"])
+        analysis.addObject(force_constraint)
+        from .testfiles.ccx.cube_mesh import create_nodes_cube
+        from .testfiles.ccx.cube_mesh import create_elements_cube
+        mesh = Fem.FemMesh()
+        create_nodes_cube(mesh)
+        create_elements_cube(mesh)
+        mesh_object = self.active_doc.addObject('Fem::FemMeshObject', self.mesh_name)
+        mesh_object.FemMesh = mesh
+        analysis.addObject(mesh_object)
+        solver_ccx_object = ObjectsFem.makeSolverCalculix(self.active_doc, 'SolverCalculiX')
+        solver_ccx_object.AnalysisType = 'static'
+        analysis.addObject(solver_ccx_object)
+        self.active_doc.recompute()
+
+        study_dir = testtools.get_unit_test_tmp_dir(testtools.get_fem_test_tmp_dir(), 'FEM_solverframework_study')
+        parameters = [
+            {"FemConstraintForce.Force": 1000.0, "MechanicalMaterial.Material.YoungsModulus": "100000 MPa"},
+            {"FemConstraintForce.Force": 2000.0},
+        ]
+        s = study.Study(solver_ccx_object, parameters, directory=study_dir, maxProcesses=1)
+        cases = s.run()
+
+        # the solver may be missing, the input files are written anyway
+        self.assertEqual([c.index for c in cases], [0, 1], "Study cases are unexpected")
+        expected_elastic = ['100000, 0.300', '200000, 0.300']
+        for case, elastic in zip(cases, expected_elastic):
+            with open(join(case.directory, self.mesh_name + '.inp'), 'r') as f:
+                self.assertTrue(elastic in f.read(), "Material of study case {} is unexpected".format(case.index + 1))
+
+        with open(join(study_dir, 'study.csv'), 'r') as f:
+            rows = list(csv.reader(f))
+        header = rows[0]
+        force_column = header.index("FemConstraintForce.Force")
+        young_column = header.index("MechanicalMaterial.Material.YoungsModulus")
+        case_rows = {}
+        for row in rows[1:]:
+            case_rows.setdefault(row[0], row)
+        self.assertEqual(sorted(case_rows), ['1', '2'], "Cases of the study table are unexpected")
+        self.assertEqual(float(case_rows['1'][force_column]), 1000.0, "Force of study case 1 is unexpected")
+        self.assertEqual(case_rows['1'][young_column], "100000 MPa", "Young's modulus of study case 1 is unexpected")
+        self.assertEqual(float(case_rows['2'][force_column]), 2000.0, "Force of study case 2 is unexpected")
+        self.assertEqual(case_rows['2'][young_column], "", "Young's modulus of study case 2 is unexpected")
+
+        self.assertEqual(force_constraint.Force, 40000.0, "Force was not set back after the study")
+        self.assertEqual(material_object.Material['YoungsModulus'], "200000 MPa", "Material was not set back after the study")
+
     def tearDown(self):
         # clearance, is executed after every test
         FreeCAD.closeDocument(self.doc_name)
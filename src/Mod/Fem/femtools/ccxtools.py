@@ -653,6 +653,7 @@ class FemToolsCcx(QtCore.QRunnable, QtCore.QObject):
 
     def start_ccx(self):
         import multiprocessing
+        from femsolver.calculix.writer import get_ccx_output_arguments
         self.ccx_stdout = ""
         self.ccx_stderr = ""
         ont_backup = os.environ.get('OMP_NUM_THREADS')
@@ -669,7 +670,7 @@ class FemToolsCcx(QtCore.QRunnable, QtCore.QObject):
         cwd = QtCore.QDir.currentPath()
         f = QtCore.QFileInfo(self.inp_file_name)
         QtCore.QDir.setCurrent(f.path())
-        p = subprocess.Popen([self.ccx_binary, "-i ", f.baseName()],
+        p = subprocess.Popen([self.ccx_binary, "-i ", f.baseName()] + get_ccx_output_arguments(self.solver),
                              stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                              shell=False, env=_env)
         self.ccx_stdout, self.ccx_stderr = p.communicate()
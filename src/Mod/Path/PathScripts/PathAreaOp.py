@@ -175,7 +175,7 @@ class ObjectOp(PathOp.ObjectOp):
         heights = [i for i in self.depthparams]
         PathLog.debug('depths: {}'.format(heights))
         area.setParams(**areaParams)
-        obj.AreaParams = str(area.getParams())
+        self.opProperties['AreaParams'] = str(area.getParams())
 
         PathLog.debug("Area with params: {}".format(area.getParams()))
 
@@ -203,8 +203,8 @@ class ObjectOp(PathOp.ObjectOp):
         elif PathOp.FeatureStartPoint & self.opFeatures(obj) and obj.UseStartPoint:
             pathParams['start'] = obj.StartPoint
 
-        obj.PathParams = str({key: value for key, value in pathParams.items() if key != 'shapes'})
-        PathLog.debug("Path with params: {}".format(obj.PathParams))
+        self.opProperties['PathParams'] = str({key: value for key, value in pathParams.items() if key != 'shapes'})
+        PathLog.debug("Path with params: {}".format(self.opProperties['PathParams']))
 
         (pp, end_vector) = Path.fromShapes(**pathParams)
         PathLog.debug('pp: {}, end vector: {}'.format(pp, end_vector))
@@ -228,7 +228,8 @@ class ObjectOp(PathOp.ObjectOp):
             areaOpPathParams(obj, isHole) ... op specific path param dictionary
             areaOpShapes(obj)             ... the shape for path area to process
             areaOpUseProjection(obj)      ... return true if operation can use projection
-        instead.'''
+        instead.
+        Returns the simulation objects if getsim is set, otherwise None.'''
         PathLog.track()
         self.endVector = None
 
@@ -272,7 +273,10 @@ class ObjectOp(PathOp.ObjectOp):
             if self.areaOpRetractTool(obj):
                 self.endVector = None
 
-        return sims
+        # only paths without a result are stored in the toolpath cache
+        if getsim:
+            return sims
+        return None
 
     def areaOpRetractTool(self, obj):
         '''areaOpRetractTool(obj) ... return False to keep the tool at current level between shapes. Default is True.'''
@@ -290,6 +294,8 @@ class ObjectOp(PathOp.ObjectOp):
         pass
     def areaOpShapes(self, obj):
         '''areaOpShapes(obj) ... return all shapes to be processed by Path.Area for this op.
+        Runs in a worker thread of the job if it recomputes in parallel, the shape to store
+        in the property removalshape goes into self.opProperties.
         Must be overwritten by subclasses.'''
         pass
     def areaOpUseProjection(self, obj):
@@ -26,8 +26,10 @@ import FreeCAD
 import FreeCADGui
 import Path
 import PathScripts
+import PathScripts.PathCommandTable as PathCommandTable
 from PySide import QtCore
 import math
+import numpy
 
 """Path Array object and FreeCAD command"""
 
@@ -103,6 +105,13 @@ class ObjectArray:
             Rotates Path around given centre vector
             Only X and Y is considered
         '''
+        return self.rotateTable(PathCommandTable.fromPath(path), angle, centre).toPath()
+
+    def rotateTable(self, table, angle, centre):
+        '''
+            Returns a rotated copy of the PathCommandTable of a path,
+            all commands are rotated at once
+        '''
         CmdMoveRapid    = ['G0', 'G00']
         CmdMoveStraight = ['G1', 'G01']
         CmdMoveCW       = ['G2', 'G02']
@@ -111,51 +120,28 @@ class ObjectArray:
         CmdMoveArc      = CmdMoveCW + CmdMoveCCW
         CmdMove         = CmdMoveStraight + CmdMoveArc
 
-        commands = []
+        table = table.copy()
         ang = angle / 180 * math.pi
-        currX = 0
-        currY = 0
-        for cmd in path.Commands:
-            if (cmd.Name in CmdMoveRapid) or (cmd.Name in CmdMove) or (cmd.Name in CmdDrill):
-                params = cmd.Parameters
-                x = params.get("X")
-                if x is None:
-                    x = currX
-                currX = x
-                y = params.get("Y")
-                if y is None:
-                    y = currY
-                currY = y
-
-                # "move" the centre to origin
-                x = x - centre.x
-                y = y - centre.y
-
-                # rotation around origin:
-                nx = x * math.cos(ang) - y * math.sin(ang)
-                ny = y * math.cos(ang) + x * math.sin(ang)
-
-                # "move" the centre back and update
-                params.update({'X': nx + centre.x, 'Y': ny + centre.y})
-
-                # Arcs need to have the I and J params rotated as well
-                if cmd.Name in CmdMoveArc:
-                    i = params.get("I")
-                    if i is None:
-                        i = 0
-                    j = params.get("J")
-                    if j is None:
-                        j = 0
-
-                    ni = i * math.cos(ang) - j * math.sin(ang)
-                    nj = j * math.cos(ang) + i * math.sin(ang)
-                    params.update({'I': ni, 'J': nj})
-
-                cmd.Parameters = params
-            commands.append(cmd)
-        newPath = Path.Path(commands)
-
-        return newPath
+        cos = math.cos(ang)
+        sin = math.sin(ang)
+
+        moves = table.mask(CmdMoveRapid + CmdMove + CmdDrill)
+        # "move" the centre to origin
+        x = table.modal('X', 0, moves)[moves] - centre.x
+        y = table.modal('Y', 0, moves)[moves] - centre.y
+
+        # rotation around origin, "move" the centre back and update
+        table.setColumn('X', x * cos - y * sin + centre.x, moves)
+        table.setColumn('Y', y * cos + x * sin + centre.y, moves)
+
+        # Arcs need to have the I and J params rotated as well
+        arcs = table.mask(CmdMoveArc)
+        i = numpy.nan_to_num(table.column('I')[arcs])
+        j = numpy.nan_to_num(table.column('J')[arcs])
+        table.setColumn('I', i * cos - j * sin, arcs)
+        table.setColumn('J', j * cos + i * sin, arcs)
+
+        return table
 
     def execute(self, obj):
         if obj.Base:
@@ -197,14 +183,15 @@ class ObjectArray:
                             output += np.toGCode()
 
             else:
+                # the commands are parsed once for all copies
+                table = PathCommandTable.fromPath(basepath)
                 for i in range(obj.Copies):
 
                     ang = 360
                     if obj.Copies > 0:
                         ang = obj.Angle / obj.Copies * (1 + i)
 
-                    np = self.rotatePath(basepath, ang, obj.Centre)
-                    output += np.toGCode()
+                    output += self.rotateTable(table, ang, obj.Centre).toGCode()
             # print output
             path = Path.Path(output)
             obj.Path = path
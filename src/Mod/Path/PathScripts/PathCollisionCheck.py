@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import numpy
+import time
+
+from PathScripts.PathVoxelSim import commandMoves
+
+__title__ = "PathCollisionCheck - rapid move collision and gouge detection"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Checks all moves of the operations of a job against the tessellation of the model and fixtures."
+
+# The tool is a vertical column of its radius standing on its tip - a flat bottom for all tools but
+# ball end mills, which get a half sphere. Every move is sampled with a fraction of the tool radius
+# and the samples are checked in chunks: an AABB tree over the triangles of the model finds the few
+# triangles close to a chunk, and only those are tested against the tool at each sample.
+# Material above the tool bottom within the tool radius, both reduced by the tolerance, is a collision.
+
+Rapid   = 'rapid'    # rapid move into the model or a fixture
+Gouge   = 'gouge'    # feed move into the model
+Fixture = 'fixture'  # feed move into a fixture
+
+LeafSize  = 8
+ChunkSize = 16
+
+
+class Collision:
+    '''A move of an operation hitting the model or a fixture:
+        op      ... the operation
+        index   ... index of the command in the operation's path
+        command ... the command
+        kind    ... Rapid, Gouge or Fixture
+        depth   ... how far the material reaches into the tool beyond the tolerance, vertically
+                    for the flat bottom, radially for the ball'''
+
+    def __init__(self, op, index, command, kind, depth):
+        self.op = op
+        self.index = index
+        self.command = command
+        self.kind = kind
+        self.depth = depth
+
+    def __repr__(self):
+        return "Collision(%s[%d] %s %s %.4f)" % (self.op.Label, self.index, self.command.Name, self.kind, self.depth)
+
+
+class TriangleTree:
+    '''AABB tree over triangles, a numpy array of shape (n, 3, 3).
+    A query returns the indices of all triangles reaching above a Z value within an XY rectangle.'''
+
+    def __init__(self, triangles):
+        self.triangles = numpy.asarray(triangles, dtype=float).reshape(-1, 3, 3)
+        self.lo = self.triangles.min(axis=1)
+        self.hi = self.triangles.max(axis=1)
+        count = len(self.triangles)
+
+        # the triangles are sorted along a Z-order curve of their centers, groups of LeafSize consecutive
+        # triangles are the leaves of a complete binary tree stored as heap - node i has the children 2i and 2i+1
+        leaves = 1
+        while leaves * LeafSize < count:
+            leaves *= 2
+        self.leaves = leaves
+        self.order = numpy.full(leaves * LeafSize, -1, dtype=int)
+        if count:
+            center = (self.lo + self.hi) / 2.0
+            cmin = center.min(axis=0)
+            extent = numpy.maximum(center.max(axis=0) - cmin, 1e-12)
+            cells = ((center - cmin) / extent * 1023).astype(numpy.int64)
+            self.order[:count] = numpy.argsort(_interleave(cells[:, 0]) | (_interleave(cells[:, 1]) << 1) | (_interleave(cells[:, 2]) << 2), kind='mergesort')
+        valid = self.order >= 0
+        bounds = numpy.empty((leaves * LeafSize, 5))
+        bounds[:, 0:2] = numpy.where(valid[:, numpy.newaxis], self.lo[self.order, :2], numpy.inf)
+        bounds[:, 2:5] = numpy.where(valid[:, numpy.newaxis], self.hi[self.order], -numpy.inf)
+        level = bounds.reshape(leaves, LeafSize, 5)
+        level = numpy.hstack((level[:, :, 0:2].min(axis=1), level[:, :, 2:5].max(axis=1)))
+        nodes = numpy.empty((2 * leaves, 5))
+        nodes[leaves:] = level
+        n = leaves
+        while n > 1:
+            level = level.reshape(n // 2, 2, 5)
+            level = numpy.hstack((level[:, :, 0:2].min(axis=1), level[:, :, 2:5].max(axis=1)))
+            n //= 2
+            nodes[n:2 * n] = level
+        # plain lists are much faster to traverse than numpy scalars
+        self.xmin, self.ymin, self.xmax, self.ymax, self.zmax = [list(col) for col in nodes.T]
+
+    def query(self, xmin, ymin, xmax, ymax, zmin):
+        '''query(xmin, ymin, xmax, ymax, zmin) ... indices of the triangles of all leaves whose bounding box
+        overlaps the rectangle and reaches above zmin, or None.'''
+        nxmin, nymin, nxmax, nymax, nzmax = self.xmin, self.ymin, self.xmax, self.ymax, self.zmax
+        leaves = self.leaves
+        found = []
+        stack = [1]
+        while stack:
+            i = stack.pop()
+            if nzmax[i] <= zmin or nxmin[i] > xmax or nxmax[i] < xmin or nymin[i] > ymax or nymax[i] < ymin:
+                continue
+            if i >= leaves:
+                found.append(i - leaves)
+            else:
+                stack.append(2 * i)
+                stack.append(2 * i + 1)
+        if not found:
+            return None
+        found = numpy.array(found)
+        indices = self.order[(found[:, numpy.newaxis] * LeafSize + numpy.arange(LeafSize)).ravel()]
+        return indices[indices >= 0]
+
+
+def _interleave(v):
+    # spreads the lower 10 bits of v to every third bit
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+
+def maxHeightInDisks(triangles, centers, radius):
+    '''maxHeightInDisks(triangles, centers, radius) ... highest Z of each triangle within the vertical cylinder
+    around the center of the same index, -inf where they don't overlap.
+    The maximum of the plane over the intersection of triangle and disk is at a triangle corner inside the disk,
+    where an edge crosses the circle, or at the point of the circle in the direction of the plane's gradient.'''
+    r2 = radius * radius
+    result = numpy.full(len(triangles), -numpy.inf)
+
+    for i in range(3):
+        p0 = triangles[:, i]
+        p1 = triangles[:, (i + 1) % 3]
+        # corner inside the disk
+        f = p0[:, :2] - centers
+        ff = numpy.einsum('kj,kj->k', f, f)
+        numpy.maximum(result, numpy.where(ff <= r2, p0[:, 2], -numpy.inf), out=result)
+        # edge crossing the circle
+        e = (p1 - p0)[:, :2]
+        a = numpy.einsum('kj,kj->k', e, e)
+        b = 2.0 * numpy.einsum('kj,kj->k', f, e)
+        disc = b * b - 4.0 * a * (ff - r2)
+        ok = (disc >= 0) & (a > 1e-24)
+        root = numpy.sqrt(numpy.where(ok, disc, 0.0))
+        div = numpy.where(ok, 2.0 * a, 1.0)
+        for sign in (-1.0, 1.0):
+            t = (-b + sign * root) / div
+            valid = ok & (t >= 0) & (t <= 1)
+            z = p0[:, 2] + t * (p1[:, 2] - p0[:, 2])
+            numpy.maximum(result, numpy.where(valid, z, -numpy.inf), out=result)
+
+    # highest point of the circle on the triangle's plane, if it lies inside the triangle
+    a = triangles[:, 0]
+    u = triangles[:, 1] - a
+    v = triangles[:, 2] - a
+    n = numpy.cross(u, v)
+    flat = numpy.abs(n[:, 2]) > 1e-12 * numpy.sqrt(numpy.einsum('kj,kj->k', n, n))
+    nz = numpy.where(flat, n[:, 2], 1.0)
+    g = -n[:, :2] / nz[:, numpy.newaxis]
+    gl = numpy.hypot(g[:, 0], g[:, 1])
+    d = g / numpy.where(gl > 1e-12, gl, numpy.inf)[:, numpy.newaxis]
+    w = centers + radius * d - a[:, :2]
+    # barycentric coordinates in the XY projection
+    det = numpy.where(flat, u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0], 1.0)
+    s = (w[:, 0] * v[:, 1] - w[:, 1] * v[:, 0]) / det
+    t = (u[:, 0] * w[:, 1] - u[:, 1] * w[:, 0]) / det
+    eps = 1e-9
+    inside = flat & (s >= -eps) & (t >= -eps) & (s + t <= 1 + eps)
+    z = a[:, 2] + g[:, 0] * w[:, 0] + g[:, 1] * w[:, 1]
+    numpy.maximum(result, numpy.where(inside, z, -numpy.inf), out=result)
+    return result
+
+
+def distanceToTriangles(triangles, points):
+    '''distanceToTriangles(triangles, points) ... distance of each point to the triangle of the same index.'''
+    a = triangles[:, 0]
+    n = numpy.cross(triangles[:, 1] - a, triangles[:, 2] - a)
+    length = numpy.sqrt(numpy.einsum('kj,kj->k', n, n))
+    inside = length > 1e-12
+    n = n / numpy.where(inside, length, 1.0)[:, numpy.newaxis]
+    plane = numpy.einsum('kj,kj->k', points - a, n)
+    result = numpy.full(len(points), numpy.inf)
+    for i in range(3):
+        p0 = triangles[:, i]
+        e = triangles[:, (i + 1) % 3] - p0
+        f = points - p0
+        # the projection is inside if it is left of all edges
+        inside &= numpy.einsum('kj,kj->k', numpy.cross(e, f), n) >= 0
+        ee = numpy.maximum(numpy.einsum('kj,kj->k', e, e), 1e-300)
+        t = numpy.clip(numpy.einsum('kj,kj->k', f, e) / ee, 0.0, 1.0)
+        r = f - t[:, numpy.newaxis] * e
+        numpy.minimum(result, numpy.sqrt(numpy.einsum('kj,kj->k', r, r)), out=result)
+    return numpy.where(inside, numpy.abs(plane), result)
+
+
+class Checker:
+    '''Checks moves of tools against the triangles of the model and of the fixtures.'''
+
+    def __init__(self, model, fixtures=None, tolerance=0.01):
+        '''model and fixtures are numpy arrays of triangles of shape (n, 3, 3).'''
+        model = numpy.asarray(model, dtype=float).reshape(-1, 3, 3)
+        if fixtures is None:
+            fixtures = numpy.zeros((0, 3, 3))
+        fixtures = numpy.asarray(fixtures, dtype=float).reshape(-1, 3, 3)
+        self.modelCount = len(model)
+        self.tree = TriangleTree(numpy.concatenate((model, fixtures)))
+        self.tolerance = tolerance
+
+    def penetration(self, samples, radius, ball):
+        '''penetration(samples, radius, ball) ... how far the material reaches into the tool at each of the samples
+        beyond the tolerance, and whether any of it belongs to a fixture. Samples without collision are <= 0.'''
+        depth = numpy.full(len(samples), -numpy.inf)
+        fixture = numpy.zeros(len(samples), dtype=bool)
+        tol = self.tolerance
+        r = radius - tol
+        if r <= 0 or len(samples) == 0:
+            return (depth, fixture)
+        tree = self.tree
+        for start in range(0, len(samples), ChunkSize):
+            chunk = samples[start:start + ChunkSize]
+            lo = chunk.min(axis=0)
+            hi = chunk.max(axis=0)
+            candidates = tree.query(lo[0] - r, lo[1] - r, hi[0] + r, hi[1] + r, lo[2] + tol)
+            if candidates is None:
+                continue
+            # pairs of sample and triangle with overlapping bounding boxes, reaching into the tool
+            tlo = tree.lo[candidates]
+            thi = tree.hi[candidates]
+            x = chunk[:, 0, numpy.newaxis]
+            y = chunk[:, 1, numpy.newaxis]
+            mask = (thi[:, 2] > chunk[:, 2, numpy.newaxis] + tol) & (tlo[:, 0] < x + r) & (thi[:, 0] > x - r) & (tlo[:, 1] < y + r) & (thi[:, 1] > y - r)
+            s, k = numpy.nonzero(mask)
+            if len(s) == 0:
+                continue
+            triangles = tree.triangles[candidates[k]]
+            points = chunk[s]
+            d = maxHeightInDisks(triangles, points[:, :2], r) - points[:, 2] - (radius if ball else tol)
+            if ball:
+                points[:, 2] += radius
+                d = numpy.maximum(d, r - distanceToTriangles(triangles, points))
+            d = numpy.nan_to_num(d)
+            numpy.maximum.at(depth, start + s, d)
+            hit = (d > 0) & (candidates[k] >= self.modelCount)
+            fixture[start + s[hit]] = True
+        return (depth, fixture)
+
+    def checkCommands(self, op, commands, radius, ball, position=None):
+        '''checkCommands(op, commands, radius, ball, position=None) ... returns the list of Collisions of the commands
+        and the position after the last one.'''
+        collisions = []
+        step = max(radius / 4.0, self.tolerance)
+        for index, cmd, samples, position in commandMoves(commands, step, position):
+            depth, fixture = self.penetration(samples, radius, ball)
+            hit = depth > 0
+            if not hit.any():
+                continue
+            if cmd.Name in ['G0', 'G00']:
+                kind = Rapid
+            elif fixture.any():
+                kind = Fixture
+            else:
+                kind = Gouge
+            collisions.append(Collision(op, index, cmd, kind, float(depth[hit].max())))
+        return (collisions, position)
+
+
+def tessellate(shapes, tolerance):
+    triangles = []
+    for shape in shapes:
+        points, facets = shape.tessellate(tolerance)
+        if facets:
+            pts = numpy.array([(p.x, p.y, p.z) for p in points])
+            triangles.append(pts[numpy.array(facets)])
+    if triangles:
+        return numpy.concatenate(triangles)
+    return numpy.zeros((0, 3, 3))
+
+def checkJob(job, tolerance=None, fixtures=None, operations=None):
+    '''checkJob(job, tolerance=None, fixtures=None, operations=None) ... checks all moves of the active operations
+    of job, or the given operations, against the job's model and the shapes of the fixtures objects.
+    Returns the list of Collisions. tolerance defaults to the job's GeometryTolerance, it is also used for
+    the tessellation.'''
+    import PathScripts.PathDressup as PathDressup
+    import PathScripts.PathLog as PathLog
+
+    begin = time.time()
+    if tolerance is None:
+        tolerance = job.GeometryTolerance.Value
+    model = tessellate([base.Shape for base in job.Model.Group], tolerance)
+    obstacles = tessellate([f.Shape for f in (fixtures or [])], tolerance)
+    checker = Checker(model, obstacles, tolerance)
+
+    if operations is None:
+        operations = [op for op in job.Operations.Group if getattr(op, 'Active', True)]
+    collisions = []
+    position = None
+    for op in operations:
+        try:
+            tool = PathDressup.toolController(op).Tool
+        except Exception:
+            PathLog.warning("%s: no tool, not checked" % op.Label)
+            continue
+        found, position = checker.checkCommands(op, op.Path.Commands, tool.Diameter / 2.0, tool.ToolType == 'BallEndMill', position)
+        for c in found:
+            PathLog.warning("%s: command %d %s %s, %.3f deep" % (op.Label, c.index, c.command.toGCode(), c.kind, c.depth))
+        collisions.extend(found)
+    PathLog.info("%s: %d collisions, %d triangles, %.2fs" % (job.Label, len(collisions), len(model) + len(obstacles), time.time() - begin))
+    return collisions
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import Path
+import PathScripts.PathLog as PathLog
+import io
+import numpy
+import re
+
+__title__ = "PathCommandTable - columnar representation of path commands"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Command codes and parallel parameter arrays of a path, for processing all commands at once."
+
+if False:
+    PathLog.setLevel(PathLog.Level.DEBUG, PathLog.thisModule())
+    PathLog.trackModule(PathLog.thisModule())
+else:
+    PathLog.setLevel(PathLog.Level.INFO, PathLog.thisModule())
+
+# A table is converted from and to a Path.Path through its gcode, which is parsed and generated by
+# the C++ code in one call, so no Path.Command object is created for the commands of the path.
+# The gcode of Path.Path has one command per line: the name followed by the sorted parameters.
+
+# the name at the start of every line, comments may contain anything
+_Name = re.compile(r'^(?:\([^\n]*\)|\S*)', re.MULTILINE)
+
+
+class CommandTable(object):
+    '''The commands of a path as columns. names is the list of the distinct command names, codes holds
+    the index into names of each command. columns maps each parameter letter to a float array with
+    the value of every command, NaN where the command does not have the parameter.'''
+
+    def __init__(self, names=None, codes=None, columns=None):
+        self.names = list(names) if names is not None else []
+        self.codes = numpy.asarray(codes if codes is not None else [], dtype=numpy.int32)
+        self.columns = dict(columns) if columns is not None else {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def commandNames(self):
+        '''commandNames() ... returns an array of the name of every command.'''
+        return numpy.array(self.names, dtype=object)[self.codes]
+
+    def mask(self, names):
+        '''mask(names) ... returns a boolean array marking the commands with one of the given names.'''
+        wanted = [i for i, name in enumerate(self.names) if name in names]
+        return numpy.isin(self.codes, wanted)
+
+    def column(self, letter):
+        '''column(letter) ... returns the values of parameter letter, all NaN if no command has it.'''
+        values = self.columns.get(letter)
+        if values is None:
+            values = numpy.full(len(self), numpy.nan)
+        return values
+
+    def setColumn(self, letter, values, mask=None):
+        '''setColumn(letter, values, mask=None) ... sets parameter letter of all commands, or of the commands
+        marked by mask, to values. NaN values remove the parameter.'''
+        if mask is None:
+            column = numpy.array(numpy.broadcast_to(values, (len(self),)), dtype=float)
+        else:
+            column = self.column(letter).copy()
+            column[mask] = values
+        if numpy.all(numpy.isnan(column)):
+            self.columns.pop(letter, None)
+        else:
+            self.columns[letter] = column
+
+    def modal(self, letter, initial=0.0, mask=None):
+        '''modal(letter, initial=0.0, mask=None) ... returns the value of parameter letter in effect at every
+        command, the last value given by a previous command or initial. If mask is given only the marked
+        commands are considered, the result is only meaningful for those.'''
+        values = self.column(letter)
+        if mask is not None:
+            values = numpy.where(mask, values, numpy.nan)
+        values = numpy.concatenate(([initial], values))
+        index = numpy.where(numpy.isnan(values), 0, numpy.arange(len(values)))
+        return values[numpy.maximum.accumulate(index)][1:]
+
+    def copy(self):
+        return CommandTable(self.names, self.codes.copy(), dict((k, v.copy()) for k, v in self.columns.items()))
+
+    def toGCode(self, precision=6):
+        '''toGCode(precision=6) ... returns the gcode of the commands in the format of Path.Path.toGCode().'''
+        if not len(self):
+            return ''
+        lines = self.commandNames()
+        for letter in sorted(self.columns):
+            values = self.columns[letter]
+            present = ~numpy.isnan(values)
+            if numpy.any(present):
+                lines[present] += numpy.char.mod(' %s%%.%df' % (letter, precision), values[present]).astype(object)
+        return '\n'.join(lines) + '\n'
+
+    def toPath(self):
+        '''toPath() ... returns a new Path.Path of the commands.'''
+        return Path.Path(self.toGCode())
+
+    def toBytes(self):
+        '''toBytes() ... returns the table as compressed binary data, see fromBytes.'''
+        arrays = dict(('_' + letter, values) for letter, values in self.columns.items())
+        buf = io.BytesIO()
+        numpy.savez_compressed(buf, names=numpy.array(self.names, dtype=str), codes=self.codes, **arrays)
+        return buf.getvalue()
+
+
+def fromGCode(gcode):
+    '''fromGCode(gcode) ... returns the CommandTable of gcode in the format of Path.Path.toGCode().
+    Any other gcode has to be passed through Path.Path first, see fromPath.'''
+    if gcode.endswith('\n'):
+        gcode = gcode[:-1]
+    if not gcode:
+        return CommandTable()
+    names, codes = numpy.unique(_Name.findall(gcode), return_inverse=True)
+    # what remains are the parameters, a letter followed by a number, and the line ends
+    params = _Name.sub('', gcode)
+    chars = numpy.frombuffer(params.encode('ascii'), dtype=numpy.uint8)
+    isLetter = (chars >= ord('A')) & (chars <= ord('Z'))
+    isEnd = chars == ord('\n')
+    line = numpy.cumsum(isEnd)[isLetter]
+    letters = chars[isLetter]
+    numbers = numpy.where(isLetter | isEnd, ord(' '), chars).astype(numpy.uint8)
+    values = numpy.fromstring(numbers.tobytes(), sep=' ')
+    if len(values) != len(letters):
+        raise ValueError("Badly formatted GCode")
+    columns = {}
+    for letter in numpy.unique(letters):
+        select = letters == letter
+        column = numpy.full(len(codes), numpy.nan)
+        column[line[select]] = values[select]
+        columns[chr(letter)] = column
+    return CommandTable([str(n) for n in names], codes, columns)
+
+def fromPath(path):
+    '''fromPath(path) ... returns the CommandTable of the commands of path.'''
+    return fromGCode(path.toGCode())
+
+def fromCommands(commands):
+    '''fromCommands(commands) ... returns the CommandTable of a list of Path.Command.'''
+    return fromPath(Path.Path(commands))
+
+def fromBytes(data):
+    '''fromBytes(data) ... returns the CommandTable of data returned by CommandTable.toBytes().'''
+    arrays = numpy.load(io.BytesIO(data), allow_pickle=False)
+    columns = dict((str(key[1:]), arrays[key]) for key in arrays.files if key.startswith('_'))
+    return CommandTable([str(n) for n in arrays['names']], arrays['codes'], columns)
+
+def concatenate(tables):
+    '''concatenate(tables) ... returns a CommandTable of the commands of all tables, one after the other.'''
+    names = []
+    for table in tables:
+        names.extend(n for n in table.names if n not in names)
+    codes = []
+    for table in tables:
+        remap = numpy.array([names.index(n) for n in table.names] or [0], dtype=numpy.int32)
+        codes.append(remap[table.codes])
+    letters = set()
+    for table in tables:
+        letters.update(table.columns)
+    columns = dict((letter, numpy.concatenate([t.column(letter) for t in tables])) for letter in letters)
+    return CommandTable(names, numpy.concatenate(codes) if codes else None, columns)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2018 sliptonic <shopinthewoods@gmail.com>               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+import FreeCAD
+import FreeCADGui
+import Path
+import PathScripts.PathLog as PathLog
+import PathScripts.PathSimplify as PathSimplify
+import PathScripts.PathUtils as PathUtils
+
+from PySide import QtCore
+
+"""Simplify Dressup object and FreeCAD command. This dressup replaces chains of short moves
+of its base path by fewer moves and arcs, see PathSimplify."""
+
+# Qt tanslation handling
+def translate(context, text, disambig=None):
+    return QtCore.QCoreApplication.translate(context, text, disambig)
+
+
+class ObjectDressup:
+
+    def __init__(self, obj):
+        obj.addProperty("App::PropertyLink",     "Base",      "Path", QtCore.QT_TRANSLATE_NOOP("Path_DressupSimplify", "The base path to modify"))
+        obj.addProperty("App::PropertyDistance", "Tolerance", "Path", QtCore.QT_TRANSLATE_NOOP("Path_DressupSimplify", "The maximum deviation of the simplified path from the base path"))
+        obj.addProperty("App::PropertyBool",     "Arcs",      "Path", QtCore.QT_TRANSLATE_NOOP("Path_DressupSimplify", "Make True, to also replace chains of short moves by arcs"))
+        obj.Tolerance = 0.01
+        obj.Arcs = True
+        obj.Proxy = self
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        return None
+
+    def execute(self, obj):
+        if obj.Base and obj.Base.isDerivedFrom("Path::Feature") and obj.Base.Path:
+            if obj.Tolerance.Value > 0:
+                obj.Path = PathSimplify.simplifyPath(obj.Base.Path, obj.Tolerance.Value, obj.Arcs, obj.Label)
+            else:
+                obj.Path = Path.Path(obj.Base.Path.Commands)
+        else:
+            PathLog.warning(translate("Path_DressupSimplify", "%s: no base path to simplify") % obj.Label)
+
+
+class ViewProviderDressup:
+
+    def __init__(self, vobj):
+        vobj.Proxy = self
+
+    def attach(self, vobj):
+        self.obj = vobj.Object
+        if self.obj and self.obj.Base:
+            for i in self.obj.Base.InList:
+                if hasattr(i, "Group"):
+                    group = i.Group
+                    for g in group:
+                        if g.Name == self.obj.Base.Name:
+                            group.remove(g)
+                    i.Group = group
+        return
+
+    def claimChildren(self):
+        return [self.obj.Base]
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        return None
+
+    def onDelete(self, arg1=None, arg2=None):
+        '''this makes sure that the base operation is added back to the project and visible'''
+        FreeCADGui.ActiveDocument.getObject(arg1.Object.Base.Name).Visibility = True
+        job = PathUtils.findParentJob(arg1.Object)
+        job.Proxy.addOperation(arg1.Object.Base, arg1.Object)
+        arg1.Object.Base = None
+        return True
+
+
+class CommandPathDressup:
+
+    def GetResources(self):
+        return {'Pixmap': 'Path-Dressup',
+                'MenuText': QtCore.QT_TRANSLATE_NOOP("Path_DressupSimplify", "Simplify Dress-up"),
+                'Accel': "",
+                'ToolTip': QtCore.QT_TRANSLATE_NOOP("Path_DressupSimplify", "Replace chains of short moves by fewer moves and arcs.")}
+
+    def IsActive(self):
+        if FreeCAD.ActiveDocument is not None:
+            for o in FreeCAD.ActiveDocument.Objects:
+                if o.Name[:3] == "Job":
+                        return True
+        return False
+
+    def Activated(self):
+
+        # check that the selection contains exactly what we want
+        selection = FreeCADGui.Selection.getSelection()
+        if len(selection) != 1:
+            FreeCAD.Console.PrintError(translate("Path_Dressup", "Please select one path object\n"))
+            return
+        if not selection[0].isDerivedFrom("Path::Feature"):
+            FreeCAD.Console.PrintError(translate("Path_Dressup", "The selected object is not a path\n"))
+            return
+        if selection[0].isDerivedFrom("Path::FeatureCompoundPython"):
+            FreeCAD.Console.PrintError(translate("Path_Dressup", "Please select a Path object"))
+            return
+
+        # everything ok!
+        FreeCAD.ActiveDocument.openTransaction(translate("Path_DressupSimplify", "Create Dress-up"))
+        FreeCADGui.addModule("PathScripts.PathDressupSimplify")
+        FreeCADGui.addModule("PathScripts.PathUtils")
+        FreeCADGui.doCommand('obj = FreeCAD.ActiveDocument.addObject("Path::FeaturePython", "SimplifyDressup")')
+        FreeCADGui.doCommand('PathScripts.PathDressupSimplify.ObjectDressup(obj)')
+        FreeCADGui.doCommand('base = FreeCAD.ActiveDocument.' + selection[0].Name)
+        FreeCADGui.doCommand('job = PathScripts.PathUtils.findParentJob(base)')
+        FreeCADGui.doCommand('obj.Base = base')
+        FreeCADGui.doCommand('job.Proxy.addOperation(obj, base)')
+        FreeCADGui.doCommand('PathScripts.PathDressupSimplify.ViewProviderDressup(obj.ViewObject)')
+        FreeCADGui.doCommand('Gui.ActiveDocument.getObject(base.Name).Visibility = False')
+        FreeCAD.ActiveDocument.commitTransaction()
+        FreeCAD.ActiveDocument.recompute()
+
+
+if FreeCAD.GuiUp:
+    # register the FreeCAD command
+    FreeCADGui.addCommand('Path_DressupSimplify', CommandPathDressup())
+
+FreeCAD.Console.PrintLog("Loading PathDressupSimplify... done\n")
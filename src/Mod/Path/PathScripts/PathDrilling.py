@@ -30,6 +30,7 @@ import Path
 import PathScripts.PathCircularHoleBase as PathCircularHoleBase
 import PathScripts.PathLog as PathLog
 import PathScripts.PathOp as PathOp
+import PathScripts.PathPreferences as PathPreferences
 import PathScripts.PathUtils as PathUtils
 
 from PathScripts.PathUtils import fmt, waiting_effects
@@ -84,7 +85,7 @@ class ObjectDrilling(PathCircularHoleBase.ObjectOp):
         if obj.AddTipLength:
             tiplength = PathUtils.drillTipLength(self.tool)
 
-        holes = PathUtils.sort_jobs(holes, ['x', 'y'])
+        holes = PathUtils.sort_jobs(holes, ['x', 'y'], timeBudget=PathPreferences.sortTimeBudget())
         self.commandlist.append(Path.Command('G90'))
         self.commandlist.append(Path.Command(obj.ReturnLevel))
 
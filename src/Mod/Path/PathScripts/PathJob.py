@@ -243,6 +243,9 @@ class ObjectJob:
         self.setupBaseModel(obj)
         self.fixupOperations(obj)
         self.setupSetupSheet(obj)
+        if hasattr(obj, 'ParallelRecompute'):
+            # the paths of the operations are not generated in parallel anymore
+            obj.removeProperty('ParallelRecompute')
         obj.setEditorMode('Operations', 2) # hide
         obj.setEditorMode('Placement', 2)
 
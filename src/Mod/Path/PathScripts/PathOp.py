@@ -26,7 +26,9 @@ import FreeCAD
 import Path
 import PathScripts.PathGeom as PathGeom
 import PathScripts.PathLog as PathLog
+import PathScripts.PathOpCache as PathOpCache
 import PathScripts.PathSetupSheet as PathSetupSheet
+import PathScripts.PathSimplify as PathSimplify
 import PathScripts.PathUtil as PathUtil
 import PathScripts.PathUtils as PathUtils
 
@@ -61,6 +63,7 @@ FeatureBaseEdges    = 0x0200     # Base
 FeatureBaseFaces    = 0x0400     # Base
 FeatureBasePanels   = 0x0800     # Base
 FeatureLocations    = 0x1000     # Locations
+FeatureSimplify     = 0x2000     # SimplifyTolerance, SimplifyArcs
 
 FeatureBaseGeometry = FeatureBaseVertexes | FeatureBaseFaces | FeatureBaseEdges | FeatureBasePanels
 
@@ -114,6 +117,12 @@ class ObjectOp(object):
             obj.addProperty("App::PropertyDistance", "OpStockZMin", "Op Values", QtCore.QT_TRANSLATE_NOOP("PathOp", "Holds the min Z value of Stock"))
             obj.setEditorMode('OpStockZMin', 1)  # read-only
 
+    def addSimplifyProperties(self, obj):
+        obj.addProperty("App::PropertyDistance", "SimplifyTolerance", "Path", QtCore.QT_TRANSLATE_NOOP("PathOp", "Replace chains of short moves by fewer moves deviating less than this, 0 to disable"))
+        obj.addProperty("App::PropertyBool", "SimplifyArcs", "Path", QtCore.QT_TRANSLATE_NOOP("PathOp", "Make True, to also replace chains of short moves by arcs"))
+        obj.SimplifyTolerance = 0
+        obj.SimplifyArcs = True
+
     def __init__(self, obj, name):
         PathLog.track()
 
@@ -160,6 +169,9 @@ class ObjectOp(object):
             obj.addProperty("App::PropertyVectorDistance", "StartPoint", "Start Point", QtCore.QT_TRANSLATE_NOOP("PathOp", "The start point of this path"))
             obj.addProperty("App::PropertyBool", "UseStartPoint", "Start Point", QtCore.QT_TRANSLATE_NOOP("PathOp", "Make True, if specifying a Start Point"))
 
+        if FeatureSimplify & features:
+            self.addSimplifyProperties(obj)
+
         self.initOperation(obj)
 
         if not hasattr(obj, 'DoNotSetDefaultValues') or not obj.DoNotSetDefaultValues:
@@ -202,6 +214,9 @@ class ObjectOp(object):
         if not hasattr(obj, 'OpStockZMax'):
             self.addOpValues(obj, ['stockz'])
 
+        if FeatureSimplify & features and not hasattr(obj, 'SimplifyTolerance'):
+            self.addSimplifyProperties(obj)
+
         self.setEditorModes(obj, features)
         self.opOnDocumentRestored(obj)
 
@@ -428,31 +443,46 @@ class ObjectOp(object):
             self.tool         ... the actual tool being used
             self.radius       ... the main radius of the tool being used
             self.commandlist  ... a list for collecting all commands produced by the operation
+            self.opProperties ... a dictionary of property values to assign to the receiver
 
         Once everything is validated and above variables are set the implementation calls
         opExecute(obj) - which is expected to add the generated commands to self.commandlist
         Finally the base implementation adds a rapid move to clearance height and assigns
-        the receiver's Path property from the command list.
+        the receiver's Path property from the command list and the properties in self.opProperties.
+        The commands generated by opExecute(obj) are stored in the toolpath cache (see PathOpCache),
+        if the same operation with the same inputs was executed before opExecute(obj) is skipped.
+        Operations with FeatureSimplify replace chains of short moves by fewer moves and arcs afterwards
+        if SimplifyTolerance is set (see PathSimplify).
         '''
         PathLog.track()
 
+        if not self._setupExecute(obj):
+            return
+
+        if self._restoreFromCache(obj):
+            return self._finishExecute(obj, None)
+
+        result = self.opExecute(obj)
+        return self._finishExecute(obj, result)
+
+    def _setupExecute(self, obj):
         if obj.ViewObject:
             obj.ViewObject.Visibility = obj.Active
 
         if not obj.Active:
             path = Path.Path("(inactive operation)")
             obj.Path = path
-            return
+            return False
 
 
         if not self._setBaseAndStock(obj):
-            return
+            return False
 
         if FeatureTool & self.opFeatures(obj):
             tc = obj.ToolController
             if tc is None or tc.ToolNumber == 0:
                 FreeCAD.Console.PrintError("No Tool Controller is selected. We need a tool to build a Path.")
-                return
+                return False
             else:
                 self.vertFeed = tc.VertFeed.Value
                 self.horizFeed = tc.HorizFeed.Value
@@ -461,7 +491,7 @@ class ObjectOp(object):
                 tool = tc.Proxy.getTool(tc)
                 if not tool or tool.Diameter == 0:
                     FreeCAD.Console.PrintError("No Tool found or diameter is zero. We need a tool to build a Path.")
-                    return
+                    return False
                 self.radius = tool.Diameter/2
                 self.tool = tool
                 obj.OpToolDiameter = tool.Diameter
@@ -471,17 +501,55 @@ class ObjectOp(object):
         # in case they still have an expression referencing any op values
         obj.recompute()
 
+        self.opProperties = {}
         self.commandlist = []
         self.commandlist.append(Path.Command("(%s)" % obj.Label))
         if obj.Comment:
             self.commandlist.append(Path.Command("(%s)" % obj.Comment))
+        return True
 
-        result = self.opExecute(obj)
+    def _restoreFromCache(self, obj):
+        self.cacheKey = None
+        self.cacheStart = len(self.commandlist)
+        cache = PathOpCache.cache()
+        if cache is None:
+            return False
+        try:
+            key = PathOpCache.operationKey(obj, self)
+        except Exception as e:
+            PathLog.debug("%s: no cache key - %s" % (obj.Label, e))
+            return False
+        commands = cache.get(key)
+        if commands is None:
+            self.cacheKey = key
+            return False
+        PathLog.debug("%s: path restored from cache" % obj.Label)
+        self.commandlist.extend(commands)
+        return True
+
+    def _finishExecute(self, obj, result):
+        # opExecute results (simulation objects) are not part of the cache
+        cache = PathOpCache.cache() if getattr(self, 'cacheKey', None) and result is None else None
+        if cache is not None and len(self.commandlist) > self.cacheStart:
+            try:
+                cache.put(self.cacheKey, self.commandlist[self.cacheStart:])
+            except (IOError, OSError) as e:
+                PathLog.warning("%s: path not cached - %s" % (obj.Label, e))
+        self.cacheKey = None
+
+        if FeatureSimplify & self.opFeatures(obj) and obj.SimplifyTolerance.Value > 0:
+            count = len(self.commandlist)
+            self.commandlist = PathSimplify.simplifyCommands(self.commandlist, obj.SimplifyTolerance.Value, obj.SimplifyArcs)
+            PathLog.info("%s: %d commands simplified to %d" % (obj.Label, count, len(self.commandlist)))
 
         if FeatureHeights & self.opFeatures(obj):
             # Let's finish by rapid to clearance...just for safety
             self.commandlist.append(Path.Command("G0", {"Z": obj.ClearanceHeight.Value}))
 
+        for prop, value in self.opProperties.items():
+            setattr(obj, prop, value)
+        self.opProperties = {}
+
         path = Path.Path(self.commandlist)
         obj.Path = path
         return result
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import Path
+import PathScripts.PathLog as PathLog
+import PathScripts.PathPreferences as PathPreferences
+import hashlib
+import os
+import threading
+import zlib
+
+__title__ = "PathOpCache - persistent cache of operation paths"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Content addressed disk cache for the commands generated by an operation's opExecute."
+
+if False:
+    PathLog.setLevel(PathLog.Level.DEBUG, PathLog.thisModule())
+    PathLog.trackModule(PathLog.thisModule())
+else:
+    PathLog.setLevel(PathLog.Level.INFO, PathLog.thisModule())
+
+# increment if the key or the stored format changes
+Version = 2
+
+# properties which are not input of opExecute, or assigned by it
+IgnoredProperties = ['Path', 'Label', 'Label2', 'Comment', 'Active', 'ExpressionEngine', 'Proxy', 'Visibility',
+        'AreaParams', 'PathParams', 'removalshape']
+
+
+class ToolpathCache(object):
+    '''Stores the commands of generated paths as compressed gcode files named by their key.
+    The files of the least recently used paths are removed once the cache grows beyond maxSize bytes.'''
+
+    def __init__(self, directory, maxSize):
+        self.directory = directory
+        self.maxSize = maxSize
+        self.lock = threading.Lock()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.ngz')
+
+    def get(self, key):
+        '''get(key) ... returns the list of commands stored for key, or None.'''
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as fp:
+                gcode = zlib.decompress(fp.read()).decode('utf-8')
+            # the modification time tracks the last use
+            os.utime(path, None)
+        except (IOError, OSError, zlib.error):
+            return None
+        return Path.Path(gcode).Commands
+
+    def put(self, key, commands):
+        '''put(key, commands) ... stores the commands for key and evicts old entries.'''
+        data = zlib.compress(Path.Path(commands).toGCode().encode('utf-8'))
+        tmp = self.path(key) + '.%d.tmp' % threading.current_thread().ident
+        with open(tmp, 'wb') as fp:
+            fp.write(data)
+        # atomic, concurrent sessions never read a partial file
+        os.rename(tmp, self.path(key))
+        self.evict()
+
+    def evict(self):
+        with self.lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if name.endswith('.ngz'):
+                    path = os.path.join(self.directory, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+                    total += st.st_size
+            if total <= self.maxSize:
+                return
+            entries.sort()
+            for mtime, size, path in entries:
+                if total <= self.maxSize:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.ngz'):
+                os.remove(os.path.join(self.directory, name))
+
+
+_cache = None
+
+def cache():
+    '''cache() ... returns the ToolpathCache configured in the preferences, or None if it is disabled.'''
+    global _cache
+    size = PathPreferences.toolpathCacheSize() * 1024 * 1024
+    if size <= 0:
+        return None
+    directory = PathPreferences.toolpathCacheDir()
+    if _cache is None or _cache.directory != directory:
+        try:
+            _cache = ToolpathCache(directory, size)
+        except (IOError, OSError) as e:
+            PathLog.error("Toolpath cache disabled: %s" % e)
+            return None
+    _cache.maxSize = size
+    return _cache
+
+
+# digests of the last shapes, the same model is part of the key of every operation of a job
+_shapeDigests = {}
+
+def shapeDigest(shape):
+    code = shape.hashCode()
+    entry = _shapeDigests.get(code)
+    if entry is not None and entry[0].isSame(shape):
+        return entry[1]
+    digest = hashlib.sha1(shape.exportBrepToString().encode('utf-8')).hexdigest()
+    if len(_shapeDigests) > 64:
+        _shapeDigests.clear()
+    _shapeDigests[code] = (shape, digest)
+    return digest
+
+def _content(value):
+    if hasattr(value, 'TypeId') and hasattr(value, 'Name'):
+        # a linked document object, its shape is what matters
+        content = value.Name
+        if hasattr(value, 'Shape') and not value.Shape.isNull():
+            content += ':' + shapeDigest(value.Shape)
+        return content
+    if hasattr(value, 'exportBrepToString'):
+        return shapeDigest(value)
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(_content(v) for v in value) + ']'
+    if hasattr(value, 'Content'):
+        return value.Content
+    return str(value)
+
+def operationKey(obj, op):
+    '''operationKey(obj, op) ... returns the key of the path obj would generate,
+    op is the proxy after the setup of execute, with job, model, stock and tool being set.'''
+    content = ['%d' % Version, op.__class__.__module__, op.__class__.__name__]
+    for prop in sorted(obj.PropertiesList):
+        if prop in IgnoredProperties or obj.getTypeIdOfProperty(prop) == 'App::PropertyPythonObject':
+            continue
+        content.append(prop + '=' + _content(getattr(obj, prop)))
+    tc = getattr(obj, 'ToolController', None)
+    if tc is not None:
+        for prop in sorted(tc.PropertiesList):
+            if prop not in IgnoredProperties:
+                content.append('tc.' + prop + '=' + _content(getattr(tc, prop)))
+    if hasattr(op, 'tool'):
+        content.append('tool=' + _content(op.tool))
+    content.append('model=' + _content(op.model))
+    content.append('stock=' + _content(op.stock))
+    content.append('tolerance=' + str(op.job.GeometryTolerance))
+    content.append('accuracy=' + str(PathPreferences.defaultLibAreaCurveAccuracy()))
+    content.append('sort=' + str(PathPreferences.sortTimeBudget()))
+    return hashlib.sha1('\n'.join(content).encode('utf-8')).hexdigest()
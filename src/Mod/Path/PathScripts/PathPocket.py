@@ -76,16 +76,18 @@ class ObjectPocket(PathPocketBase.ObjectPocket):
                         shape = Part.makeFace(edges, 'Part::FaceMakerSimple')
 
                     env = PathUtils.getEnvelope(base[0].Shape, subshape=shape, depthparams=self.depthparams)
-                    obj.removalshape = env.cut(base[0].Shape)
-                    obj.removalshape.tessellate(0.1)
-                    removalshapes.append((obj.removalshape, False))
+                    removalshape = env.cut(base[0].Shape)
+                    removalshape.tessellate(0.1)
+                    removalshapes.append((removalshape, False))
+                    self.opProperties['removalshape'] = removalshape
         else:  # process the job base object as a whole
             PathLog.debug("processing the whole job base object")
             for base in self.model:
                 env = PathUtils.getEnvelope(base.Shape, subshape=None, depthparams=self.depthparams)
-                obj.removalshape = env.cut(base.Shape)
-                obj.removalshape.tessellate(0.1)
-                removalshapes.append((obj.removalshape, False))
+                removalshape = env.cut(base.Shape)
+                removalshape.tessellate(0.1)
+                removalshapes.append((removalshape, False))
+                self.opProperties['removalshape'] = removalshape
         return removalshapes
 
     def areaOpSetDefaultValues(self, obj, job):
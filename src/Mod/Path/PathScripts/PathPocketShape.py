@@ -291,7 +291,7 @@ class ObjectPocket(PathPocketBase.ObjectPocket):
             shape.tessellate(0.1)
 
         if self.removalshapes:
-            obj.removalshape = self.removalshapes[0][0]
+            self.opProperties['removalshape'] = self.removalshapes[0][0]
         return self.removalshapes
 
     def areaOpSetDefaultValues(self, obj, job):
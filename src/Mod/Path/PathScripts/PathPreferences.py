@@ -47,6 +47,13 @@ LibAreaCurveAccuracy    = "LibAreaCurveAccuarcy"
 
 EnableExperimentalFeatures = "EnableExperimentalFeatures"
 
+# Persistent cache of generated operation paths, size in MB - 0 disables the cache
+ToolpathCacheSize       = "ToolpathCacheSize"
+ToolpathCacheDir        = "ToolpathCacheDir"
+
+# Seconds spent on shortening the rapid moves between holes - 0 disables it
+SortTimeBudget          = "SortTimeBudget"
+
 
 def preferences():
     return FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Path")
@@ -166,3 +173,19 @@ def setDefaultTaskPanelLayout(style):
 def experimentalFeaturesEnabled():
     return preferences().GetBool(EnableExperimentalFeatures, False)
 
+def toolpathCacheSize():
+    return preferences().GetInt(ToolpathCacheSize, 256)
+
+def toolpathCacheDir():
+    path = preferences().GetString(ToolpathCacheDir)
+    if not path:
+        path = os.path.join(FreeCAD.getUserAppDataDir(), 'Path', 'ToolpathCache')
+    return path
+
+def setToolpathCacheDefaults(size, path):
+    pref = preferences()
+    pref.SetInt(ToolpathCacheSize, size)
+    pref.SetString(ToolpathCacheDir, path)
+
+def sortTimeBudget():
+    return preferences().GetFloat(SortTimeBudget, 0.0)
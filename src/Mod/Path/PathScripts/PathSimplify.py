@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import FreeCAD
+import Part
+import Path
+import PathScripts.PathGeom as PathGeom
+import PathScripts.PathLog as PathLog
+import math
+import numpy
+
+__title__ = "PathSimplify - line simplification and arc fitting of paths"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Replaces chains of short G1 moves by fewer G1 moves and G2/G3 arcs within a tolerance."
+
+if False:
+    PathLog.setLevel(PathLog.Level.DEBUG, PathLog.thisModule())
+    PathLog.trackModule(PathLog.thisModule())
+else:
+    PathLog.setLevel(PathLog.Level.INFO, PathLog.thisModule())
+
+# Only runs of G1 moves with nothing but X, Y, Z and an unchanged feed rate are simplified, all other
+# commands are passed on untouched. Within a run arcs are fitted first - they need the dense points -
+# and the points between the arcs are reduced with Douglas-Peucker. Arcs are only fitted in the XY plane
+# at a constant Z, like the arcs produced by the operations.
+
+LineParameters = ['X', 'Y', 'Z', 'F']
+
+# the least number of points replaced by an arc
+MinArcPoints = 5
+
+
+def simplifyPoints(points, tolerance):
+    '''simplifyPoints(points, tolerance) ... returns a boolean array marking the points of a polyline, a numpy array
+    of shape (n, 3), to keep so no point dropped is further than tolerance from the simplified polyline.
+    The first and the last point are always kept.'''
+    keep = numpy.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        p0 = points[i]
+        d = points[j] - p0
+        v = points[i + 1:j] - p0
+        dd = d.dot(d)
+        if dd > 0:
+            t = numpy.clip(v.dot(d) / dd, 0.0, 1.0)
+            v = v - t[:, numpy.newaxis] * d
+        dist = numpy.einsum('ij,ij->i', v, v)
+        k = int(numpy.argmax(dist))
+        if dist[k] > tolerance * tolerance:
+            k += i + 1
+            keep[k] = True
+            stack.append((i, k))
+            stack.append((k, j))
+    return keep
+
+def _circle(p0, p1, p2):
+    '''center and radius of the circle through three XY points, None if they are collinear'''
+    ax, ay = p1[0] - p0[0], p1[1] - p0[1]
+    bx, by = p2[0] - p0[0], p2[1] - p0[1]
+    det = 2.0 * (ax * by - ay * bx)
+    if abs(det) < 1e-12:
+        return None
+    a2 = ax * ax + ay * ay
+    b2 = bx * bx + by * by
+    cx = (by * a2 - ay * b2) / det
+    cy = (ax * b2 - bx * a2) / det
+    return (numpy.array([p0[0] + cx, p0[1] + cy]), math.hypot(cx, cy))
+
+def isArc(points, tolerance):
+    '''isArc(points, tolerance) ... returns the radius and the angle of the arc in the XY plane replacing the polyline
+    points within tolerance, or None. The arc must turn in one direction by less than a full circle.'''
+    if not all(PathGeom.isRoughly(z, points[0][2]) for z in (points[:, 2].min(), points[:, 2].max())):
+        return None
+    circle = _circle(points[0], points[len(points) // 2], points[-1])
+    if circle is None:
+        return None
+    center, radius = circle
+    v = points[:, :2] - center
+    if numpy.max(numpy.abs(numpy.hypot(v[:, 0], v[:, 1]) - radius)) > tolerance:
+        return None
+    cross = v[:-1, 0] * v[1:, 1] - v[:-1, 1] * v[1:, 0]
+    dot = numpy.einsum('ij,ij->i', v[:-1], v[1:])
+    steps = numpy.arctan2(cross, dot)
+    if not (numpy.all(steps > 0) or numpy.all(steps < 0)):
+        return None
+    if abs(numpy.sum(steps)) > 1.9 * math.pi:
+        return None
+    # each segment of the polyline is a chord of the arc
+    if radius * (1 - math.cos(numpy.max(numpy.abs(steps)) / 2)) > tolerance:
+        return None
+    return (radius, abs(numpy.sum(steps)))
+
+def fitArcs(points, tolerance):
+    '''fitArcs(points, tolerance) ... returns a list of (start, end) indices of the polyline points replaced by arcs.'''
+    arcs = []
+    i = 0
+    n = len(points)
+    while i + MinArcPoints <= n:
+        j = i + MinArcPoints - 1
+        if isArc(points[i:j + 1], tolerance) is None:
+            i += 1
+            continue
+        # grow the arc exponentially, then bisect its end
+        good = j
+        step = MinArcPoints
+        while good + 1 < n:
+            j = min(good + step, n - 1)
+            if isArc(points[i:j + 1], tolerance) is None:
+                break
+            good = j
+            step *= 2
+        bad = j if good < j else n
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            if isArc(points[i:mid + 1], tolerance) is None:
+                bad = mid
+            else:
+                good = mid
+        radius, angle = isArc(points[i:good + 1], tolerance)
+        # nearly straight polylines are better off as lines
+        if radius * (1 - math.cos(angle / 2)) > tolerance:
+            arcs.append((i, good))
+        i = good
+    return arcs
+
+def _arcCommands(points):
+    p0 = points[0]
+    p1 = points[len(points) // 2]
+    p2 = points[-1]
+    edge = Part.Edge(Part.Arc(FreeCAD.Vector(p0[0], p0[1], p0[2]), FreeCAD.Vector(p1[0], p1[1], p0[2]), FreeCAD.Vector(p2[0], p2[1], p0[2])))
+    return PathGeom.cmdsForEdge(edge)
+
+def _simplifyRun(points, feed, tolerance, arcs):
+    '''commands replacing the moves between the points of a run, the first point is the start position'''
+    spans = fitArcs(points, tolerance) if arcs else []
+    commands = []
+    i = 0
+    for start, end in spans + [(len(points) - 1, None)]:
+        if start > i:
+            keep = simplifyPoints(points[i:start + 1], tolerance)
+            for p in points[i + 1:start + 1][keep[1:]]:
+                commands.append(Path.Command('G1', {'X': p[0], 'Y': p[1], 'Z': p[2]}))
+        if end is not None:
+            commands.extend(_arcCommands(points[start:end + 1]))
+            i = end
+    if feed is not None:
+        commands = [Path.Command(cmd.Name, dict(cmd.Parameters, F=feed)) for cmd in commands]
+    return commands
+
+def simplifyCommands(commands, tolerance, arcs=True, position=None):
+    '''simplifyCommands(commands, tolerance, arcs=True, position=None) ... returns the commands with all runs of
+    G1 moves replaced by fewer G1 moves, and G2/G3 arcs if arcs is True, deviating no more than tolerance from the
+    original moves. position is the start position, the first run begins after the first move otherwise.'''
+    result = []
+    run = []
+    feed = None
+    pos = None if position is None else numpy.array([position.x, position.y, position.z])
+
+    def flush():
+        if len(run) > 2:
+            result.extend(_simplifyRun(numpy.array(run), feed, tolerance, arcs))
+        else:
+            result.extend(runCommands)
+        del run[:]
+        del runCommands[:]
+
+    runCommands = []
+    for cmd in commands:
+        params = cmd.Parameters
+        isLine = cmd.Name in PathGeom.CmdMoveStraight and pos is not None and all(p in LineParameters for p in params)
+        if isLine and run and params.get('F', feed) != feed:
+            flush()
+        if isLine:
+            if not run:
+                run.append(pos)
+                feed = params.get('F')
+            end = numpy.array([params.get('X', pos[0]), params.get('Y', pos[1]), params.get('Z', pos[2])])
+            run.append(end)
+            runCommands.append(cmd)
+            pos = end
+            continue
+        flush()
+        result.append(cmd)
+        if cmd.Name in PathGeom.CmdMoveRapid or cmd.Name in PathGeom.CmdMove:
+            if pos is None:
+                pos = numpy.zeros(3)
+            pos = numpy.array([params.get('X', pos[0]), params.get('Y', pos[1]), params.get('Z', pos[2])])
+        elif any(p in params for p in ['X', 'Y', 'Z']):
+            # drill cycles and the like, the position afterwards is not known
+            pos = None
+    flush()
+    return result
+
+def simplifyPath(path, tolerance, arcs=True, label=None):
+    '''simplifyPath(path, tolerance, arcs=True, label=None) ... returns a new Path.Path of the simplified commands of path
+    and logs the reduction of the number of commands.'''
+    commands = path.Commands
+    simplified = simplifyCommands(commands, tolerance, arcs)
+    if label is not None:
+        PathLog.info("%s: %d commands simplified to %d (%.1f%%)" % (label, len(commands), len(simplified), 100.0 * len(simplified) / max(len(commands), 1)))
+    return Path.Path(simplified)
@@ -30,11 +30,22 @@ import MeshPart
 import Path
 import PathScripts.PathLog as PathLog
 # import PathScripts.PathPocketBase as PathPocketBase
+import PathScripts.PathUtil as PathUtil
 import PathScripts.PathUtils as PathUtils
 import PathScripts.PathOp as PathOp
+import hashlib
+import multiprocessing
+import numpy
+import threading
 
 from PySide import QtCore
 
+# OpenCamLib is optional, the operation reports it missing on execution
+try:
+    import ocl
+except ImportError:
+    ocl = None
+
 __title__ = "Path Surface Operation"
 __author__ = "sliptonic (Brad Collette)"
 __url__ = "http://www.freecadweb.org"
@@ -53,6 +64,68 @@ def translate(context, text, disambig=None):
     return QtCore.QCoreApplication.translate(context, text, disambig)
 
 
+# The tessellated bases and the cutter locations computed from them are kept between executions,
+# a change of feeds, heights or the optimization doesn't run OpenCamLib again.
+_stlCache = {}
+_clCache = {}
+MaxCachedSTL = 4
+MaxCachedCL = 16
+
+def _cached(cache, maxSize, key, create):
+    value = cache.get(key)
+    if value is None:
+        value = create()
+        if len(cache) >= maxSize:
+            cache.clear()
+        cache[key] = value
+    return value
+
+def _meshDigest(mesh):
+    points, facets = mesh.Topology
+    digest = hashlib.sha1(numpy.array([(p.x, p.y, p.z) for p in points]).tobytes())
+    digest.update(numpy.array(facets, dtype=numpy.int64).tobytes())
+    return digest.hexdigest()
+
+# the STL surface of the running drop cutter, inherited by the forked worker processes,
+# the lock is held from setting it until the workers are done
+_dropCutterSTL = None
+_dropCutterLock = threading.Lock()
+DropCutterBandsPerProcess = 4
+
+def _dropCutterBand(args):
+    '''_dropCutterBand(args) ... runs the drop cutter along a list of lines (x1, y1, x2, y2) and returns the
+    cutter locations as numpy array of shape (n, 3), runs in the worker processes.'''
+    lines, ball, diameter, minZ, sampling = args
+    if ball:
+        cutter = ocl.BallCutter(diameter, 5)  # TODO: 5 represents cutting edge height. Should be replaced with the data from toolcontroller?
+    else:
+        cutter = ocl.CylCutter(diameter, 5)
+    pdc = ocl.PathDropCutter()   # create a pdc
+    pdc.setSTL(_dropCutterSTL)
+    pdc.setCutter(cutter)
+    pdc.setZ(minZ)  # set minimumZ
+    pdc.setSampling(sampling)
+    path = ocl.Path()                   # create an empty path object
+    for x1, y1, x2, y2 in lines:
+        path.append(ocl.Line(ocl.Point(x1, y1, 0), ocl.Point(x2, y2, 0)))
+    pdc.setPath(path)
+    pdc.run()
+    return numpy.array([(p.x, p.y, p.z) for p in pdc.getCLPoints()]).reshape(-1, 3)
+
+def pointsOnLine(points, tolerance=1e-6):
+    '''pointsOnLine(points, tolerance=1e-6) ... returns a boolean array, True for every point of the numpy array points
+    lying on the segment between its predecessor and successor. The first and the last point are never on a line.'''
+    onLine = numpy.zeros(len(points), dtype=bool)
+    if len(points) > 2:
+        a = points[:-2]
+        ab = points[2:] - a
+        ap = points[1:-1] - a
+        cross = numpy.cross(ab, ap)
+        dot = numpy.einsum('ij,ij->i', ab, ap)
+        onLine[1:-1] = (numpy.sqrt(numpy.einsum('ij,ij->i', cross, cross)) <= tolerance) & (dot >= 0) & (dot <= numpy.einsum('ij,ij->i', ab, ab))
+    return onLine
+
+
 class ObjectSurface(PathOp.ObjectOp):
     '''Proxy object for Surfacing operation.'''
     def baseObject(self):
@@ -65,7 +138,7 @@ class ObjectSurface(PathOp.ObjectOp):
     #     return 0
     def opFeatures(self, obj):
         '''opFeatures(obj) ... return all standard features and edges based geomtries'''
-        return PathOp.FeatureTool | PathOp.FeatureDepths | PathOp.FeatureHeights | PathOp.FeatureStepDown
+        return PathOp.FeatureTool | PathOp.FeatureDepths | PathOp.FeatureHeights | PathOp.FeatureStepDown | PathOp.FeatureSimplify
 
     def initOperation(self, obj):
         '''initPocketOp(obj) ... create facing specific properties'''
@@ -73,6 +146,7 @@ class ObjectSurface(PathOp.ObjectOp):
         obj.addProperty("App::PropertyEnumeration", "DropCutterDir", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "The direction along which dropcutter lines are created"))
         obj.addProperty("App::PropertyEnumeration", "BoundBox", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "Should the operation be limited by the stock object or by the bounding box of the base object"))
         obj.addProperty("App::PropertyVectorDistance", "DropCutterExtraOffset", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "Additional offset to the selected bounding box"))
+        self.setupDropCutterParallel(obj)
         obj.addProperty("App::PropertyPercent", "StepOver", "Surface", QtCore.QT_TRANSLATE_NOOP("App::Property", "Step over percentage of the drop cutter path"))
         obj.addProperty("App::PropertyDistance", "DepthOffset", "Surface", QtCore.QT_TRANSLATE_NOOP("App::Property", "Z-axis offset from the surface of the object"))
         obj.addProperty("App::PropertyFloatConstraint", "SampleInterval", "Surface", QtCore.QT_TRANSLATE_NOOP("App::Property", "The Sample Interval. Small values cause long wait times"))
@@ -85,19 +159,27 @@ class ObjectSurface(PathOp.ObjectOp):
         if not hasattr(obj, 'DoNotSetDefaultValues'):
             self.setEditorProperties(obj)
 
+    def setupDropCutterParallel(self, obj):
+        if not hasattr(obj, 'DropCutterParallel'):
+            obj.addProperty("App::PropertyBool", "DropCutterParallel", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "Split the dropcutter lines into bands computed concurrently, one process per core"))
+            obj.DropCutterParallel = False
+
     def setEditorProperties(self, obj):
         if obj.Algorithm == 'OCL Dropcutter':
             obj.setEditorMode('DropCutterDir', 0)
             obj.setEditorMode('DropCutterExtraOffset', 0)
+            obj.setEditorMode('DropCutterParallel', 0)
         else:
             obj.setEditorMode('DropCutterDir', 2)
             obj.setEditorMode('DropCutterExtraOffset', 2)
+            obj.setEditorMode('DropCutterParallel', 2)
 
     def onChanged(self, obj, prop):
         if prop == "Algorithm":
             self.setEditorProperties(obj)
 
     def opOnDocumentRestored(self, obj):
+        self.setupDropCutterParallel(obj)
         self.setEditorProperties(obj)
 
     def opExecute(self, obj):
@@ -105,9 +187,7 @@ class ObjectSurface(PathOp.ObjectOp):
         PathLog.track()
 
         # OCL must be installed
-        try:
-            import ocl
-        except:
+        if ocl is None:
             FreeCAD.Console.PrintError(
                 translate("Path_Surface", "This operation requires OpenCamLib to be installed.") + "\n")
             return
@@ -128,46 +208,60 @@ class ObjectSurface(PathOp.ObjectOp):
         if parentJob is None:
             return
 
+        # try/except is for Path Jobs created before GeometryTolerance
+        try:
+            deflection = parentJob.GeometryTolerance.Value
+        except AttributeError:
+            import PathScripts.PathPreferences as PathPreferences
+            deflection = PathPreferences.defaultGeometryTolerance()
+
         for base in self.model:
             print("base object: " + base.Name)
 
             if base.TypeId.startswith('Mesh'):
                 mesh = base.Mesh
+                stlKey = ('mesh', _meshDigest(mesh), obj.DepthOffset.Value)
             else:
-                # try/except is for Path Jobs created before GeometryTolerance
-                try:
-                    deflection = parentJob.GeometryTolerance
-                except AttributeError:
-                    import PathScripts.PathPreferences as PathPreferences
-                    deflection = PathPreferences.defaultGeometryTolerance()
-                base.Shape.tessellate(0.5)
-                mesh = MeshPart.meshFromShape(base.Shape, Deflection=deflection)
+                import PathScripts.PathOpCache as PathOpCache
+                mesh = None
+                stlKey = ('shape', PathOpCache.shapeDigest(base.Shape), deflection, obj.DepthOffset.Value)
+            s, meshBB = _cached(_stlCache, MaxCachedSTL, stlKey, lambda: self._stl(obj, base, mesh, deflection))
+
             if obj.BoundBox == "BaseBoundBox":
-                bb = mesh.BoundBox
+                bb = meshBB
             else:
                 bb = parentJob.Stock.Shape.BoundBox
 
-            s = ocl.STLSurf()
-            for f in mesh.Facets:
-                p = f.Points[0]
-                q = f.Points[1]
-                r = f.Points[2]
-                # offset the triangle in Z with DepthOffset
-                t = ocl.Triangle(ocl.Point(p[0], p[1], p[2] + obj.DepthOffset.Value),
-                                 ocl.Point(q[0], q[1], q[2] + obj.DepthOffset.Value),
-                                 ocl.Point(r[0], r[1], r[2] + obj.DepthOffset.Value))
-                s.addTriangle(t)
-
             if obj.Algorithm == 'OCL Dropcutter':
-                output = self._dropcutter(obj, s, bb)
+                output = self._dropcutter(obj, s, bb, stlKey)
             elif obj.Algorithm == 'OCL Waterline':
-                output = self._waterline(obj, s, bb)
+                output = self._waterline(obj, s, bb, stlKey)
 
             self.commandlist.extend(output)
 
-    def _waterline(self, obj, s, bb):
+    def _stl(self, obj, base, mesh, deflection):
+        '''_stl(obj, base, mesh, deflection) ... returns the ocl.STLSurf of base, offset in Z by DepthOffset, and the bound box of the mesh.'''
+        if mesh is None:
+            base.Shape.tessellate(0.5)
+            mesh = MeshPart.meshFromShape(base.Shape, Deflection=deflection)
+        points, facets = mesh.Topology
+        offset = obj.DepthOffset.Value
+        pts = [ocl.Point(p.x, p.y, p.z + offset) for p in points]
+        s = ocl.STLSurf()
+        for f in facets:
+            s.addTriangle(ocl.Triangle(pts[f[0]], pts[f[1]], pts[f[2]]))
+        return (s, mesh.BoundBox)
+
+    def _cutter(self, obj):
+        if obj.ToolController.Tool.ToolType == 'BallEndMill':
+            return ocl.BallCutter(obj.ToolController.Tool.Diameter, 5)  # TODO: 5 represents cutting edge height. Should be replaced with the data from toolcontroller?
+        return ocl.CylCutter(obj.ToolController.Tool.Diameter, 5)
+
+    def _cutterKey(self, obj):
+        return (obj.ToolController.Tool.ToolType, obj.ToolController.Tool.Diameter, obj.SampleInterval)
+
+    def _waterline(self, obj, s, bb, stlKey):
         import time
-        import ocl
 
         def drawLoops(loops):
             nloop = 0
@@ -178,27 +272,15 @@ class ObjectSurface(PathOp.ObjectOp):
                 p = loop[0]
                 pp.append(Path.Command("(loop begin)"))
                 pp.append(Path.Command('G0', {"Z": obj.SafeHeight.Value, 'F': self.vertRapid}))
-                pp.append(Path.Command('G0', {'X': p.x, "Y": p.y, 'F': self.horizRapid}))
-                pp.append(Path.Command('G1', {"Z": p.z, 'F': self.vertFeed}))
-                prev = ocl.Point(float("inf"), float("inf"), float("inf"))
-                next = ocl.Point(float("inf"), float("inf"), float("inf"))
-                optimize = obj.Optimize
-                for i in range(1, len(loop)):
-                    p = loop[i]
-                    if i < len(loop) - 1:
-                        next.x = loop[i + 1].x
-                        next.y = loop[i + 1].y
-                        next.z = loop[i + 1].z
-                    else:
-                        optimize = False
-                    if not optimize or not self.isPointOnLine(FreeCAD.Vector(prev.x, prev.y, prev.z), FreeCAD.Vector(next.x, next.y, next.z), FreeCAD.Vector(p.x, p.y, p.z)):
-                        pp.append(Path.Command('G1', {'X': p.x, "Y": p.y, "Z": p.z, 'F': self.horizFeed}))
-                    prev.x = p.x
-                    prev.y = p.y
-                    prev.z = p.z
-                    # zheight = p.z
+                pp.append(Path.Command('G0', {'X': p[0], "Y": p[1], 'F': self.horizRapid}))
+                pp.append(Path.Command('G1', {"Z": p[2], 'F': self.vertFeed}))
+                keep = numpy.ones(len(loop), dtype=bool)
+                if obj.Optimize:
+                    keep = ~pointsOnLine(loop)
+                for p in loop[1:][keep[1:]]:
+                    pp.append(Path.Command('G1', {'X': p[0], "Y": p[1], "Z": p[2], 'F': self.horizFeed}))
                 p = loop[0]
-                pp.append(Path.Command('G1', {'X': p.x, "Y": p.y, "Z": p.z, 'F': self.horizFeed}))
+                pp.append(Path.Command('G1', {'X': p[0], "Y": p[1], "Z": p[2], 'F': self.horizFeed}))
                 pp.append(Path.Command("(loop end)"))
 
                 print("    loop ", nloop, " with ", len(loop), " points")
@@ -213,27 +295,26 @@ class ObjectSurface(PathOp.ObjectOp):
         t_before = time.time()
         zheights = [i for i in depthparams]
 
-        wl = ocl.Waterline()
-        wl.setSTL(s)
-
-        if obj.ToolController.Tool.ToolType == 'BallEndMill':
-            cutter = ocl.BallCutter(obj.ToolController.Tool.Diameter, 5)  # TODO: 5 represents cutting edge height. Should be replaced with the data from toolcontroller?
-        else:
-            cutter = ocl.CylCutter(obj.ToolController.Tool.Diameter, 5)
-
-        wl.setCutter(cutter)
-        # this should be smaller than the smallest details in the STL file
-        wl.setSampling(obj.SampleInterval)
-        # AdaptiveWaterline() also has settings for minimum sampling interval
-        # (see c++ code)
-        all_loops = []
-        print ("zheights: {}".format(zheights))
-        for zh in zheights:
-            print("calculating Waterline at z= ", zh)
-            wl.reset()
-            wl.setZ(zh)  # height for this waterline
-            wl.run()
-            all_loops.append(wl.getLoops())
+        def computeLoops():
+            wl = ocl.Waterline()
+            wl.setSTL(s)
+            wl.setCutter(self._cutter(obj))
+            # this should be smaller than the smallest details in the STL file
+            wl.setSampling(obj.SampleInterval)
+            # AdaptiveWaterline() also has settings for minimum sampling interval
+            # (see c++ code)
+            all_loops = []
+            print ("zheights: {}".format(zheights))
+            for zh in zheights:
+                print("calculating Waterline at z= ", zh)
+                wl.reset()
+                wl.setZ(zh)  # height for this waterline
+                wl.run()
+                all_loops.append([numpy.array([(p.x, p.y, p.z) for p in loop]) for loop in wl.getLoops() if len(loop)])
+            return all_loops
+
+        key = ('waterline', stlKey, self._cutterKey(obj), tuple(zheights))
+        all_loops = _cached(_clCache, MaxCachedCL, key, computeLoops)
         t_after = time.time()
         calctime = t_after - t_before
         n = 0
@@ -263,93 +344,86 @@ class ObjectSurface(PathOp.ObjectOp):
 
         return True
 
-    def _dropcutter(self, obj, s, bb):
-        import ocl
+    def _dropcutter(self, obj, s, bb, stlKey):
         import time
-        if obj.ToolController.Tool.ToolType == 'BallEndMill':
-            cutter = ocl.BallCutter(obj.ToolController.Tool.Diameter, 5)  # TODO: 5 represents cutting edge height. Should be replaced with the data from toolcontroller?
-        else:
-            cutter = ocl.CylCutter(obj.ToolController.Tool.Diameter, 5)
-
-        pdc = ocl.PathDropCutter()   # create a pdc
-        pdc.setSTL(s)
-        pdc.setCutter(cutter)
-        pdc.setZ(obj.FinalDepth.Value + obj.DepthOffset.Value)  # set minimumZ
-        pdc.setSampling(obj.SampleInterval)
 
         # the max and min XY area of the operation
         xmin = bb.XMin - obj.DropCutterExtraOffset.x
         xmax = bb.XMax + obj.DropCutterExtraOffset.x
         ymin = bb.YMin - obj.DropCutterExtraOffset.y
         ymax = bb.YMax + obj.DropCutterExtraOffset.y
-
-        path = ocl.Path()                   # create an empty path object
-
-        if obj.DropCutterDir == 'Y':
-            Ny = int(bb.YLength / (cutter.getDiameter() * (obj.StepOver / 100.0)))
-            dy = float(ymax - ymin) / Ny  # the y step-over
-
-            # add Line objects to the path in this loop
-            for n in xrange(0, Ny):
-                y = ymin + n * dy
-                p1 = ocl.Point(xmin, y, 0)   # start-point of line
-                p2 = ocl.Point(xmax, y, 0)   # end-point of line
-                if (n % 2 == 0):  # even
-                    l = ocl.Line(p1, p2)     # line-object
-                else:  # odd
-                    l = ocl.Line(p2, p1)     # line-object
-
-                path.append(l)        # add the line to the path
-        else:
-            Nx = int(bb.XLength / (cutter.getDiameter() * (obj.StepOver / 100.0)))
-            dx = float(xmax - xmin) / Nx  # the y step-over
-
-            # add Line objects to the path in this loop
-            for n in xrange(0, Nx):
-                x = xmin + n * dx
-                p1 = ocl.Point(x, ymin, 0)   # start-point of line
-                p2 = ocl.Point(x, ymax, 0)   # end-point of line
-                if (n % 2 == 0):  # even
-                    l = ocl.Line(p1, p2)     # line-object
-                else:  # odd
-                    l = ocl.Line(p2, p1)     # line-object
-
-                path.append(l)        # add the line to the path
-
-        pdc.setPath(path)
-
-        # run drop-cutter on the path
-        t_before = time.time()
-        pdc.run()
-        t_after = time.time()
-        print("calculation took ", t_after - t_before, " s")
-
+        minZ = obj.FinalDepth.Value + obj.DepthOffset.Value
+
+        def computePoints():
+            global _dropCutterSTL
+            diameter = obj.ToolController.Tool.Diameter
+            lines = []
+            if obj.DropCutterDir == 'Y':
+                Ny = int(bb.YLength / (diameter * (obj.StepOver / 100.0)))
+                dy = float(ymax - ymin) / Ny  # the y step-over
+                for n in range(0, Ny):
+                    y = ymin + n * dy
+                    if (n % 2 == 0):  # even
+                        lines.append((xmin, y, xmax, y))
+                    else:  # odd
+                        lines.append((xmax, y, xmin, y))
+            else:
+                Nx = int(bb.XLength / (diameter * (obj.StepOver / 100.0)))
+                dx = float(xmax - xmin) / Nx  # the y step-over
+                for n in range(0, Nx):
+                    x = xmin + n * dx
+                    if (n % 2 == 0):  # even
+                        lines.append((x, ymin, x, ymax))
+                    else:  # odd
+                        lines.append((x, ymax, x, ymin))
+
+            # the lines alternate their direction, the concatenated bands are the zigzag of all lines
+            ball = obj.ToolController.Tool.ToolType == 'BallEndMill'
+            t_before = time.time()
+            with _dropCutterLock:
+                # set before the workers are forked
+                _dropCutterSTL = s
+                pool = None
+                try:
+                    if obj.DropCutterParallel and len(lines) > 1:
+                        processes = min(multiprocessing.cpu_count(), len(lines))
+                        bands = min(processes * DropCutterBandsPerProcess, len(lines))
+                        bounds = numpy.linspace(0, len(lines), bands + 1).astype(int)
+                        pool = PathUtil.processPool(processes)
+                        if pool is None:
+                            PathLog.warning(translate("Path_Surface", "No worker processes available, computing the dropcutter lines in one process."))
+                    if pool is None:
+                        points = _dropCutterBand((lines, ball, diameter, minZ, obj.SampleInterval))
+                    else:
+                        jobs = [(lines[b0:b1], ball, diameter, minZ, obj.SampleInterval) for b0, b1 in zip(bounds[:-1], bounds[1:])]
+                        points = numpy.concatenate(pool.map(_dropCutterBand, jobs))
+                        pool.close()
+                        pool.join()
+                finally:
+                    if pool is not None:
+                        pool.terminate()
+                    _dropCutterSTL = None
+            t_after = time.time()
+            print("calculation took ", t_after - t_before, " s")
+            return points
+
+        key = ('dropcutter', stlKey, self._cutterKey(obj), obj.DropCutterDir, obj.StepOver, xmin, xmax, ymin, ymax, bb.XLength, bb.YLength, minZ)
         # retrieve the points
-        clp = pdc.getCLPoints()
+        clp = _cached(_clCache, MaxCachedCL, key, computePoints)
         print("points received: " + str(len(clp)))
 
         # generate the path commands
         output = []
         output.append(Path.Command('G0', {'Z': obj.ClearanceHeight.Value, 'F': self.vertRapid}))
-        output.append(Path.Command('G0', {'X': clp[0].x, "Y": clp[0].y, 'F': self.horizRapid}))
-        output.append(Path.Command('G1', {'Z': clp[0].z, 'F': self.vertFeed}))
-        prev = ocl.Point(float("inf"), float("inf"), float("inf"))
-        next = ocl.Point(float("inf"), float("inf"), float("inf"))
-        optimize = obj.Optimize
-        for i in range(0, len(clp)):
-            c = clp[i]
-            if i < len(clp) - 1:
-                next.x = clp[i + 1].x
-                next.y = clp[i + 1].y
-                next.z = clp[i + 1].z
-            else:
-                optimize = False
-
-            if not optimize or not self.isPointOnLine(FreeCAD.Vector(prev.x, prev.y, prev.z), FreeCAD.Vector(next.x, next.y, next.z), FreeCAD.Vector(c.x, c.y, c.z)):
-                output.append(Path.Command('G1', {'X': c.x, "Y": c.y, "Z": c.z, 'F': self.horizFeed}))
-            prev.x = c.x
-            prev.y = c.y
-            prev.z = c.z
+        output.append(Path.Command('G0', {'X': clp[0][0], "Y": clp[0][1], 'F': self.horizRapid}))
+        output.append(Path.Command('G1', {'Z': clp[0][2], 'F': self.vertFeed}))
+        keep = numpy.ones(len(clp), dtype=bool)
+        if obj.Optimize:
+            keep = ~pointsOnLine(clp)
+            # the plunge already ends at the first point
+            keep[0] = len(clp) == 1
+        for c in clp[keep]:
+            output.append(Path.Command('G1', {'X': c[0], "Y": c[1], "Z": c[2], 'F': self.horizFeed}))
         print("points after optimization: " + str(len(output)))
         return output
 
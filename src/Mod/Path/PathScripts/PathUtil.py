@@ -35,7 +35,9 @@ other than PathLog, then it probably doesn't belong here.
 import six
 
 import PathScripts.PathLog as PathLog
+import multiprocessing
 import sys
+import threading
 
 if False:
     PathLog.setLevel(PathLog.Level.DEBUG, PathLog.thisModule())
@@ -118,3 +120,22 @@ def isString(string):
 def keyValueIter(dictionary):
     '''keyValueIter(dict) ... return iterable object over dictionary's (key,value) tuples.'''
     return six.iteritems(dictionary)
+
+def processPool(processes):
+    '''processPool(processes) ... returns a multiprocessing.Pool of forked worker processes, or None if the
+    platform can't fork or the caller is not the main thread - forking copies the locks held by other threads.
+    The workers inherit the state of the caller, like module variables.'''
+    if not isinstance(threading.current_thread(), threading._MainThread):
+        return None
+    try:
+        context = multiprocessing.get_context('fork')
+    except AttributeError:
+        if sys.platform.startswith('win'):
+            return None
+        context = multiprocessing
+    except ValueError:
+        return None
+    try:
+        return context.Pool(processes)
+    except (OSError, ValueError):
+        return None
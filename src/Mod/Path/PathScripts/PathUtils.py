@@ -710,19 +710,29 @@ def rampPlunge(edge, rampangle, destZ, startZ):
     return rampCmds
 
 
-def sort_jobs(locations, keys, attractors=[]):
+def rapid_distance(locations, keys):
+    """ total euclidean distance travelled between the locations in the given order """
+    d = 0.0
+    for a, b in zip(locations, locations[1:]):
+        d += math.sqrt(sum((a[k] - b[k]) ** 2 for k in keys))
+    return d
+
+def sort_jobs(locations, keys, attractors=[], timeBudget=0.0):
     """ sort holes by the nearest neighbor method
         keys: two-element list of keys for X and Y coordinates. for example ['x','y']
+        timeBudget: seconds spent on shortening the result by 2-opt moves, 0 disables them
         originally written by m0n5t3r for PathHelix
+        The locations are kept in a grid of buckets, so each pick only looks at the
+        buckets around the last location instead of all remaining locations.
     """
-    try:
-        from queue import PriorityQueue
-    except ImportError:
-        from Queue import PriorityQueue
+    import time
     from collections import defaultdict
 
     attractors = attractors or [keys[0]]
 
+    if not locations:
+        return []
+
     def sqdist(a, b):
         """ square Euclidean distance """
         d = 0
@@ -739,30 +749,135 @@ def sort_jobs(locations, keys, attractors=[]):
 
         return w
 
-    def find_closest(location_list, location, dist):
-        q = PriorityQueue()
-
-        for i,j in enumerate(location_list):
-            # prevent dictionary comparison by inserting the index
-            q.put((dist(j, location) + weight(j), i, j))
+    start = time.time()
+    before = rapid_distance(locations, keys)
 
-        prio, i, result = q.get()
+    # bucket size for about two locations per bucket
+    pts = [[loc[k] for k in keys] for loc in locations]
+    lo = [min(p[i] for p in pts) for i in range(len(keys))]
+    hi = [max(p[i] for p in pts) for i in range(len(keys))]
+    extent = max(max(h - l for l, h in zip(lo, hi)), 1e-9)
+    size = max(extent / math.sqrt(max(len(locations) / 2.0, 1.0)), 1e-9)
+    cells = [int(math.floor((h - l) / size)) + 1 for l, h in zip(lo, hi)]
 
-        return result
+    def cellOf(p):
+        return tuple(min(int((p[i] - lo[i]) / size), cells[i] - 1) for i in range(len(keys)))
 
-    out = []
-    zero = defaultdict(lambda: 0)
+    buckets = {}
+    for i, p in enumerate(pts):
+        buckets.setdefault(cellOf(p), []).append(i)
 
-    out.append(find_closest(locations, zero, sqdist))
-    locations.remove(out[-1])
-
-    while locations:
-        closest = find_closest(locations, out[-1], sqdist)
-        out.append(closest)
-        locations.remove(closest)
+    weights = [weight(loc) for loc in locations]
+    attracted = [k in attractors for k in keys]
 
+    def lowerBound(cell, location):
+        """ smallest cost any location in cell can have """
+        d = 0
+        w = 0
+        for i, k in enumerate(keys):
+            c0 = lo[i] + cell[i] * size
+            c1 = c0 + size
+            v = location[k]
+            if v < c0:
+                d += (c0 - v) ** 2
+            elif v > c1:
+                d += (v - c1) ** 2
+            if attracted[i] and (c0 > 0 or c1 < 0):
+                w += min(abs(c0), abs(c1))
+        return d + w
+
+    def neighbourCells(center, ring):
+        """ all cells on the border of the square with distance ring around center """
+        if len(keys) == 1:
+            for c in set([center[0] - ring, center[0] + ring]):
+                yield (c,)
+            return
+        x0, y0 = center[0], center[1]
+        rest = tuple(center[2:])
+        for x in range(x0 - ring, x0 + ring + 1):
+            if x == x0 - ring or x == x0 + ring:
+                for y in range(y0 - ring, y0 + ring + 1):
+                    yield (x, y) + rest
+            else:
+                yield (x, y0 - ring) + rest
+                if ring:
+                    yield (x, y0 + ring) + rest
+
+    maxRing = max(cells)
+
+    def find_closest(location):
+        """ the remaining location with the smallest distance plus weight, the first one of equals """
+        center = tuple(min(max(int(math.floor((location[k] - lo[i]) / size)), 0), cells[i] - 1) for i, k in enumerate(keys))
+        best = None
+        limit = None
+        for ring in range(maxRing + 1):
+            if limit is not None and ((ring - 1) * size) ** 2 > limit:
+                break
+            for cell in neighbourCells(center, ring):
+                bucket = buckets.get(cell)
+                if not bucket or (limit is not None and lowerBound(cell, location) > limit):
+                    continue
+                for i in bucket:
+                    prio = (sqdist(locations[i], location) + weights[i], i)
+                    if best is None or prio < best:
+                        best = prio
+                        # a little slack for the rounding of the bucket bounds, equal costs are resolved by index
+                        limit = best[0] + 1e-9 * (1.0 + abs(best[0]))
+        i = best[1]
+        bucket = buckets[cellOf(pts[i])]
+        bucket.remove(i)
+        return i
+
+    order = [find_closest(defaultdict(lambda: 0))]
+    while len(order) < len(locations):
+        order.append(find_closest(locations[order[-1]]))
+
+    out = [locations[i] for i in order]
+    if timeBudget > 0:
+        nearest = rapid_distance(out, keys)
+        out = two_opt(out, keys, start + timeBudget)
+        PathLog.info("sort_jobs: %d locations, rapid distance %.2f (unsorted), %.2f (nearest neighbour), %.2f (2-opt) in %.2fs" %
+                (len(out), before, nearest, rapid_distance(out, keys), time.time() - start))
+    else:
+        PathLog.debug("sort_jobs: %d locations, rapid distance %.2f (unsorted), %.2f (nearest neighbour) in %.2fs" %
+                (len(out), before, rapid_distance(out, keys), time.time() - start))
     return out
 
+def two_opt(locations, keys, deadline):
+    """ shortens the open tour through locations by reversing sections as long as that helps and the deadline is not reached
+        the first location stays the first one """
+    import time
+
+    n = len(locations)
+    if n < 4:
+        return locations
+    pts = numpy.array([[loc[k] for k in keys] for loc in locations], dtype=float)
+    order = numpy.arange(n)
+    improved = True
+    while improved and time.time() < deadline:
+        improved = False
+        for i in range(n - 2):
+            if time.time() >= deadline:
+                break
+            p = pts[order]
+            a = p[i]
+            b = p[i + 1]
+            ab = numpy.linalg.norm(a - b)
+            # replace edges (i, i+1) and (j, j+1) by (i, j) and (i+1, j+1), the last location has no outgoing edge
+            c = p[i + 2:]
+            d = numpy.vstack((p[i + 3:], c[-1:]))
+            cd = numpy.linalg.norm(c - d, axis=1)
+            ac = numpy.linalg.norm(c - a, axis=1)
+            bd = numpy.linalg.norm(d - b, axis=1)
+            bd[-1] = 0.0
+            gain = ab + cd - ac - bd
+            j = int(numpy.argmax(gain))
+            if gain[j] > 1e-9:
+                j += i + 2
+                order[i + 1:j + 1] = order[i + 1:j + 1][::-1].copy()
+                improved = True
+    return [locations[i] for i in order]
+
 def guessDepths(objshape, subs=None):
     """
     takes an object shape and optional list of subobjects and returns a depth_params
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import math
+import multiprocessing
+import numpy
+import time
+
+__title__ = "PathVoxelSim - headless material removal simulation"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Simulates the material removal of all operations of a job on a height map, without the GUI."
+
+# Like the voxel simulator of the simulator task panel the stock is a height map, each cell holds
+# the top of the material above it. A tool sweep lowers the cells to the tool surface, which makes
+# the result independent of the order of the sweeps - the grid is cut in tiles of columns and each
+# tile is simulated by its own process.
+# FreeCAD modules are only imported by the functions running in the main process, the tile
+# workers just need numpy.
+
+CmdMove  = ['G0', 'G00', 'G1', 'G01']
+CmdArc   = ['G2', 'G02', 'G3', 'G03']
+CmdDrill = ['G73', 'G81', 'G82', 'G83']
+
+
+class SimulationResult:
+    '''Result of simulateJob:
+        mesh          ... Mesh.Mesh of the simulated stock
+        heights       ... the height map, numpy array of shape (rows, columns) - rows along Y
+        resolution    ... edge length of a cell
+        stockVolume   ... volume of the stock before the simulation
+        removedVolume ... volume removed by all operations
+        gouges        ... number of cells cut deeper than the model surface
+        samples       ... number of tool positions simulated
+        time          ... seconds it took'''
+
+    def __init__(self):
+        self.mesh = None
+        self.heights = None
+        self.resolution = 0
+        self.stockVolume = 0
+        self.removedVolume = 0
+        self.gouges = 0
+        self.samples = 0
+        self.time = 0
+
+
+def toolStamp(tool, resolution):
+    '''toolStamp(tool, resolution) ... returns the height of the tool surface above its tip for all cells
+    the tool covers, as a square numpy array centered on the tool axis - cells outside the tool are inf.'''
+    radius = tool.Diameter / 2.0
+    m = int(math.ceil(radius / resolution))
+    offsets = numpy.arange(-m, m + 1) * resolution
+    r = numpy.hypot(offsets[:, numpy.newaxis], offsets[numpy.newaxis, :])
+    inside = r <= radius + resolution / 2.0
+    r = numpy.minimum(r, radius)
+    if tool.ToolType == 'BallEndMill':
+        stamp = radius - numpy.sqrt(radius * radius - r * r)
+    elif tool.ToolType in ['ChamferMill', 'Drill', 'CenterDrill', 'CounterSink', 'Engraver'] and 0 < tool.CuttingEdgeAngle < 180:
+        stamp = r / math.tan(math.radians(tool.CuttingEdgeAngle / 2.0))
+    else:
+        stamp = numpy.zeros_like(r)
+    stamp[~inside] = numpy.inf
+    return stamp
+
+def sampleLine(p0, p1, step):
+    '''sampleLine(p0, p1, step) ... points from p0 to p1, p0 excluded, no further apart than step.'''
+    n = max(int(math.ceil(numpy.linalg.norm(p1 - p0) / step)), 1)
+    t = numpy.arange(1, n + 1, dtype=float)[:, numpy.newaxis] / n
+    return p0 + (p1 - p0) * t
+
+def commandMoves(commands, step, position=None):
+    '''commandMoves(commands, step, position=None) ... generator of (index, command, samples, position) for all moves
+    in commands. The samples are the tool tip positions of the move as numpy array of shape (n, 3), with no more than
+    step between two of them, position is the one after the move. The start of a move is not part of its samples.
+    Without a position the first move just sets it and has no samples.'''
+    import FreeCAD
+    import PathScripts.PathGeom as PathGeom
+
+    for index, cmd in enumerate(commands):
+        name = cmd.Name
+        if name in CmdMove or name in CmdArc:
+            params = cmd.Parameters
+            if position is None:
+                position = FreeCAD.Vector(params.get('X', 0), params.get('Y', 0), params.get('Z', 0))
+                yield (index, cmd, numpy.zeros((0, 3)), position)
+                continue
+            end = FreeCAD.Vector(params.get('X', position.x), params.get('Y', position.y), params.get('Z', position.z))
+            if name in CmdArc:
+                edge = PathGeom.edgeForCmd(cmd, position)
+                if edge is not None:
+                    pts = edge.discretize(Distance=step)
+                    yield (index, cmd, numpy.array([(p.x, p.y, p.z) for p in pts[1:]]).reshape(-1, 3), end)
+            else:
+                yield (index, cmd, sampleLine(numpy.array(position), numpy.array(end), step), end)
+            position = end
+        elif name in CmdDrill:
+            params = cmd.Parameters
+            if position is None:
+                position = FreeCAD.Vector(params.get('X', 0), params.get('Y', 0), params.get('R', 0))
+            x = params.get('X', position.x)
+            y = params.get('Y', position.y)
+            r = params.get('R', position.z)
+            points = [FreeCAD.Vector(x, y, r), FreeCAD.Vector(x, y, params.get('Z', r)), FreeCAD.Vector(x, y, r)]
+            samples = []
+            for p in points:
+                samples.append(sampleLine(numpy.array(position), numpy.array(p), step))
+                position = p
+            yield (index, cmd, numpy.vstack(samples), position)
+
+def commandSamples(commands, step, position=None):
+    '''commandSamples(commands, step, position=None) ... returns the tool tip positions of all moves in commands
+    as numpy array of shape (n, 3), with no more than step between two of them, and the final position.
+    Without a position the first move just sets it, nothing is known about the way there.'''
+    samples = []
+    for index, cmd, pts, position in commandMoves(commands, step, position):
+        samples.append(pts)
+    if samples:
+        return (numpy.vstack(samples), position)
+    return (numpy.zeros((0, 3)), position)
+
+def rasterizeTop(shape, x0, y0, resolution, rows, columns):
+    '''rasterizeTop(shape, x0, y0, resolution, rows, columns) ... highest Z of shape above every cell center, -inf where there is none.'''
+    heights = numpy.full((rows, columns), -numpy.inf)
+    points, triangles = shape.tessellate(resolution)
+    if not triangles:
+        return heights
+    pts = numpy.array([(p.x, p.y, p.z) for p in points])
+    for tri in numpy.array(triangles):
+        a, b, c = pts[tri]
+        det = (b[1] - c[1]) * (a[0] - c[0]) + (c[0] - b[0]) * (a[1] - c[1])
+        if abs(det) < 1e-12:
+            continue
+        i0 = max(int(math.ceil((min(a[0], b[0], c[0]) - x0) / resolution - 0.5)), 0)
+        i1 = min(int(math.floor((max(a[0], b[0], c[0]) - x0) / resolution - 0.5)), columns - 1)
+        j0 = max(int(math.ceil((min(a[1], b[1], c[1]) - y0) / resolution - 0.5)), 0)
+        j1 = min(int(math.floor((max(a[1], b[1], c[1]) - y0) / resolution - 0.5)), rows - 1)
+        if i1 < i0 or j1 < j0:
+            continue
+        xs = x0 + (numpy.arange(i0, i1 + 1) + 0.5) * resolution
+        ys = y0 + (numpy.arange(j0, j1 + 1) + 0.5) * resolution
+        X, Y = numpy.meshgrid(xs, ys)
+        l1 = ((b[1] - c[1]) * (X - c[0]) + (c[0] - b[0]) * (Y - c[1])) / det
+        l2 = ((c[1] - a[1]) * (X - c[0]) + (a[0] - c[0]) * (Y - c[1])) / det
+        l3 = 1 - l1 - l2
+        inside = (l1 >= -1e-9) & (l2 >= -1e-9) & (l3 >= -1e-9)
+        z = numpy.where(inside, l1 * a[2] + l2 * b[2] + l3 * c[2], -numpy.inf)
+        window = heights[j0:j1 + 1, i0:i1 + 1]
+        numpy.maximum(window, z, out=window)
+    return heights
+
+def _cutTile(args):
+    '''cut all sweeps into one tile of the height map, runs in the worker processes'''
+    heights, c0, sweeps = args
+    rows, columns = heights.shape
+    for stamp, cells in sweeps:
+        m = stamp.shape[0] // 2
+        for i, j, z in cells:
+            i = int(i) - c0
+            j = int(j)
+            # clip the stamp against the tile
+            si0 = max(0, m - i)
+            si1 = min(2 * m + 1, columns - i + m)
+            sj0 = max(0, m - j)
+            sj1 = min(2 * m + 1, rows - j + m)
+            if si1 <= si0 or sj1 <= sj0:
+                continue
+            window = heights[j - m + sj0:j - m + sj1, i - m + si0:i - m + si1]
+            numpy.minimum(window, z + stamp[sj0:sj1, si0:si1], out=window)
+    return heights
+
+def cutHeights(heights, x0, y0, resolution, sweeps, processes=None):
+    '''cutHeights(heights, x0, y0, resolution, sweeps, processes=None) ... lowers heights to the tool surface of all sweeps.
+    sweeps is a list of (stamp, samples) with samples being the tool tip positions.
+    The columns of heights are split into one tile per process, returns the number of samples.'''
+    rows, columns = heights.shape
+    cellSweeps = []
+    count = 0
+    for stamp, samples in sweeps:
+        if not len(samples):
+            continue
+        i = numpy.floor((samples[:, 0] - x0) / resolution).astype(int)
+        j = numpy.floor((samples[:, 1] - y0) / resolution).astype(int)
+        m = stamp.shape[0] // 2
+        keep = (i >= -m) & (i < columns + m) & (j >= -m) & (j < rows + m)
+        cells = numpy.column_stack((i[keep], j[keep], samples[keep, 2]))
+        if not len(cells):
+            continue
+        # only the lowest position of the tool in a cell matters
+        order = numpy.lexsort((cells[:, 2], cells[:, 1], cells[:, 0]))
+        cells = cells[order]
+        first = numpy.ones(len(cells), dtype=bool)
+        first[1:] = (cells[1:, 0] != cells[:-1, 0]) | (cells[1:, 1] != cells[:-1, 1])
+        cells = cells[first]
+        count += len(cells)
+        cellSweeps.append((stamp, cells))
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    tiles = max(1, min(processes, columns))
+    bounds = numpy.linspace(0, columns, tiles + 1).astype(int)
+    jobs = []
+    for c0, c1 in zip(bounds[:-1], bounds[1:]):
+        tileSweeps = []
+        for stamp, cells in cellSweeps:
+            m = stamp.shape[0] // 2
+            sel = (cells[:, 0] >= c0 - m) & (cells[:, 0] < c1 + m)
+            if numpy.any(sel):
+                tileSweeps.append((stamp, cells[sel]))
+        jobs.append((heights[:, c0:c1].copy(), c0, tileSweeps))
+
+    import PathScripts.PathUtil as PathUtil
+    pool = PathUtil.processPool(tiles) if tiles > 1 else None
+    if pool is None:
+        results = [_cutTile(job) for job in jobs]
+    else:
+        try:
+            results = pool.map(_cutTile, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    for (c0, c1), tile in zip(zip(bounds[:-1], bounds[1:]), results):
+        heights[:, c0:c1] = tile
+    return count
+
+def heightMesh(heights, x0, y0, resolution, zmin):
+    '''heightMesh(heights, x0, y0, resolution, zmin) ... closed Mesh.Mesh of the height map down to zmin.'''
+    import Mesh
+
+    rows, columns = heights.shape
+    xs = x0 + (numpy.arange(columns) + 0.5) * resolution
+    ys = y0 + (numpy.arange(rows) + 0.5) * resolution
+    X, Y = numpy.meshgrid(xs, ys)
+    top = numpy.dstack((X, Y, heights))
+    bottom = numpy.dstack((X, Y, numpy.full_like(heights, zmin)))
+
+    def quads(a, b, c, d):
+        # two triangles for each quad a b c d, counter clockwise seen from outside
+        return numpy.concatenate((numpy.stack((a, b, c), axis=-2), numpy.stack((a, c, d), axis=-2))).reshape(-1, 3, 3)
+
+    facets = [
+        quads(top[:-1, :-1], top[:-1, 1:], top[1:, 1:], top[1:, :-1]),
+        quads(bottom[:-1, :-1], bottom[1:, :-1], bottom[1:, 1:], bottom[:-1, 1:]),
+        quads(bottom[0, :-1], bottom[0, 1:], top[0, 1:], top[0, :-1]),
+        quads(bottom[-1, 1:], bottom[-1, :-1], top[-1, :-1], top[-1, 1:]),
+        quads(bottom[1:, 0], bottom[:-1, 0], top[:-1, 0], top[1:, 0]),
+        quads(bottom[:-1, -1], bottom[1:, -1], top[1:, -1], top[:-1, -1]),
+    ]
+    return Mesh.Mesh(numpy.concatenate(facets).reshape(-1, 3).tolist())
+
+def simulateJob(job, accuracy=0.1, operations=None, processes=None, tolerance=None):
+    '''simulateJob(job, accuracy=0.1, operations=None, processes=None, tolerance=None) ... simulates all active operations
+    of job, or the given operations, without any GUI and returns a SimulationResult.
+    accuracy is the cell size in percent of the longer side of the stock, like the slider of the simulator task panel.
+    Cells cut deeper than tolerance (default the cell size) into the model are counted as gouges.'''
+    import PathScripts.PathDressup as PathDressup
+    import PathScripts.PathLog as PathLog
+
+    start = time.time()
+    stock = job.Stock.Shape
+    bb = stock.BoundBox
+    resolution = 0.01 * accuracy * max(bb.XLength, bb.YLength)
+    if tolerance is None:
+        tolerance = resolution
+    columns = max(int(math.ceil(bb.XLength / resolution)), 1)
+    rows = max(int(math.ceil(bb.YLength / resolution)), 1)
+
+    heights = rasterizeTop(stock, bb.XMin, bb.YMin, resolution, rows, columns)
+    heights = numpy.maximum(heights, bb.ZMin)
+    initial = heights.copy()
+
+    if operations is None:
+        operations = [op for op in job.Operations.Group if getattr(op, 'Active', True)]
+    sweeps = []
+    stamps = {}
+    position = None
+    for op in operations:
+        try:
+            tool = PathDressup.toolController(op).Tool
+        except Exception:
+            PathLog.warning("%s: no tool, not simulated" % op.Label)
+            continue
+        key = (tool.ToolType, tool.Diameter, tool.CuttingEdgeAngle)
+        if key not in stamps:
+            stamps[key] = toolStamp(tool, resolution)
+        samples, position = commandSamples(op.Path.Commands, resolution / 2.0, position)
+        sweeps.append((stamps[key], samples))
+
+    result = SimulationResult()
+    result.samples = cutHeights(heights, bb.XMin, bb.YMin, resolution, sweeps, processes)
+    numpy.maximum(heights, bb.ZMin, out=heights)
+
+    cellArea = resolution * resolution
+    result.stockVolume = float(numpy.sum(initial - bb.ZMin)) * cellArea
+    result.removedVolume = float(numpy.sum(initial - heights)) * cellArea
+
+    model = rasterizeTop(job.Model.Group[0].Shape, bb.XMin, bb.YMin, resolution, rows, columns)
+    for base in job.Model.Group[1:]:
+        numpy.maximum(model, rasterizeTop(base.Shape, bb.XMin, bb.YMin, resolution, rows, columns), out=model)
+    result.gouges = int(numpy.count_nonzero(heights < model - tolerance))
+
+    result.heights = heights
+    result.resolution = resolution
+    result.mesh = heightMesh(heights, bb.XMin, bb.YMin, resolution, bb.ZMin)
+    result.time = time.time() - start
+    PathLog.info("%s: removed %.2f of %.2f, %d gouges, %d tool positions in %.2fs" %
+            (job.Label, result.removedVolume, result.stockVolume, result.gouges, result.samples, result.time))
+    return result
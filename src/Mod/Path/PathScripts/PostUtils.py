@@ -170,3 +170,130 @@ def fcoms(string,commentsym):
 
 
 
+
+
+class GCodeWriter(object):
+    '''GCodeWriter streams the gcode of path commands line by line into a
+    file like object, or collects the lines if there is none.
+    The unit conversion factors and the format strings of all parameters are
+    computed once, modal commands and duplicate axis values are suppressed
+    while the commands are formatted. The default formatting is the one of
+    the linuxcnc post processor.'''
+
+    def __init__(self, output=None, params=None, precision=3, unitFormat='mm', unitSpeedFormat='mm/min',
+                 modal=False, outputDoubles=True, outputComments=True, lineNumbers=False, lineNumber=100,
+                 commandSpace=' ', rapidMoves=('G0', 'G00'), intParams=('T', 'H', 'D', 'S')):
+        if params is None:
+            params = ['X', 'Y', 'Z', 'A', 'B', 'C', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L', 'H', 'D', 'P']
+        self.output = output
+        self.lines = []
+        self.params = params
+        self.modal = modal
+        self.outputDoubles = outputDoubles
+        self.outputComments = outputComments
+        self.lineNumbers = lineNumbers
+        self.lineNumber = lineNumber
+        self.commandSpace = commandSpace
+        self.rapidMoves = rapidMoves
+        self.intParams = intParams
+        self.setUnits(unitFormat, unitSpeedFormat)
+        self.formats = dict((p, p + '%.' + str(precision) + 'f') for p in params)
+        self.reset()
+
+    def setUnits(self, unitFormat, unitSpeedFormat):
+        '''setUnits(unitFormat, unitSpeedFormat) ... set the output units of lengths and feed rates.'''
+        # Quantity.getValueAs divides by the value of the target unit, it is only computed once
+        self.lengthDivisor = FreeCAD.Units.Quantity(unitFormat).Value
+        self.speedDivisor = FreeCAD.Units.Quantity(unitSpeedFormat).Value
+
+    def reset(self):
+        '''reset() ... forget the last command and location, called for every path object.'''
+        self.lastCommand = None
+        self.location = {'X': -1, 'Y': -1, 'Z': -1, 'F': 0.0}
+
+    def linenumber(self):
+        if self.lineNumbers:
+            self.lineNumber += 10
+            return "N" + str(self.lineNumber) + " "
+        return ""
+
+    def write(self, line, number=True):
+        '''write(line, number=True) ... write one line, with a line number if enabled.'''
+        if number:
+            line = self.linenumber() + line
+        if self.output is None:
+            self.lines.append(line + "\n")
+        else:
+            self.output.write(line + "\n")
+
+    def writeText(self, text):
+        '''writeText(text) ... write every line of text, like a preamble or postamble.'''
+        for line in text.splitlines():
+            self.write(line)
+
+    def getvalue(self):
+        '''getvalue() ... returns the collected gcode as one string.'''
+        return "".join(self.lines)
+
+    def formatCommand(self, c):
+        '''formatCommand(c) ... returns the words of the gcode line of command c,
+        or None if the command is not part of the output.'''
+        command = c.Name
+        words = [command]
+        if self.modal and command == self.lastCommand:
+            words.pop(0)
+        if command[0] == '(' and not self.outputComments:
+            return None
+
+        # each access to c.Parameters creates a new dict
+        parameters = c.Parameters
+        location = self.location
+        for param in self.params:
+            if param not in parameters:
+                continue
+            value = parameters[param]
+            if param == 'F':
+                if location['F'] != value or self.outputDoubles:
+                    if command not in self.rapidMoves:
+                        speed = value / self.speedDivisor
+                        if speed > 0.0:
+                            words.append(self.formats[param] % speed)
+                    continue
+            elif param in self.intParams:
+                words.append(param + str(int(value)))
+                continue
+            if not self.outputDoubles and param in location and location[param] == value:
+                continue
+            words.append(self.formats[param] % (value / self.lengthDivisor))
+
+        self.lastCommand = command
+        location.update(parameters)
+
+        if command == "message":
+            if not self.outputComments:
+                return None
+            words.pop(0)
+        return words
+
+    def writeCommands(self, commands, toolChange=''):
+        '''writeCommands(commands, toolChange='') ... write the gcode of all commands,
+        toolChange is written before every M6.'''
+        for c in commands:
+            words = self.formatCommand(c)
+            if words is None:
+                continue
+            if c.Name == 'M6':
+                self.writeText(toolChange)
+            if words:
+                if self.lineNumbers:
+                    words.insert(0, self.linenumber())
+                self.write(self.commandSpace.join(words).strip(), False)
+
+    def writePath(self, pathobj, toolChange=''):
+        '''writePath(pathobj, toolChange='') ... write the gcode of pathobj and of all path objects in its Group.'''
+        if hasattr(pathobj, "Group"):
+            for p in pathobj.Group:
+                self.writePath(p, toolChange)
+        elif hasattr(pathobj, "Path"):
+            self.reset()
+            self.writeCommands(pathobj.Path.Commands, toolChange)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 sliptonic <shopinthewoods@gmail.com>               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# ***************************************************************************
+
+import Part
+import Path
+import PathScripts.PathCollisionCheck as PathCollisionCheck
+import numpy
+
+from PathTests.PathTestUtils import PathTestBase
+
+class TestPathCollisionCheck(PathTestBase):
+
+    def setUp(self):
+        self.box = PathCollisionCheck.tessellate([Part.makeBox(100, 100, 20)], 0.01)
+        self.clamp = PathCollisionCheck.tessellate([Part.makeBox(10, 10, 30, Part.Vector(120, 0, 0))], 0.01)
+
+    def check(self, gcode, radius=3.0, ball=False):
+        checker = PathCollisionCheck.Checker(self.box, self.clamp, 0.01)
+        return checker.checkCommands(None, Path.Path(gcode).Commands, radius, ball)[0]
+
+    def test00(self):
+        '''Check the tree returns the triangles close to a rectangle.'''
+        tree = PathCollisionCheck.TriangleTree(self.box)
+        self.assertEqual(len(tree.query(-10, -10, 110, 110, -1)), len(self.box))
+        self.assertIsNone(tree.query(-10, -10, 110, 110, 20))
+        self.assertIsNone(tree.query(101, 101, 110, 110, -1))
+        # the triangles of all leaves overlapping the rectangle, which includes the top face
+        top = [i for i in range(len(self.box)) if numpy.all(self.box[i][:, 2] == 20)]
+        self.assertTrue(set(top) <= set(tree.query(40, 40, 60, 60, 10)))
+
+    def test01(self):
+        '''Check rapid moves above and into the model.'''
+        self.assertEqual(self.check('G0 X-10 Y50 Z25\nG0 X110\n'), [])
+        collisions = self.check('G0 X-10 Y50 Z25\nG0 X110\nG0 Z19\nG0 X-10\n')
+        self.assertEqual([(c.index, c.kind) for c in collisions], [(3, PathCollisionCheck.Rapid)])
+
+    def test02(self):
+        '''Check feed moves touching the model are no gouges, feed moves into it are.'''
+        collisions = self.check('G0 X-10 Y50 Z20\nG1 X110\nG1 X-10 Z19.995\nG1 X110 Z19.9\nG0 Z25\nG0 X-10 Y-3\nG1 Z10\nG1 X110\nG1 Y-2.9\nG1 X-10\n')
+        self.assertEqual([(c.index, c.kind) for c in collisions], [(3, PathCollisionCheck.Gouge), (9, PathCollisionCheck.Gouge)])
+        self.assertRoughly(collisions[0].depth, 0.09)
+
+    def test03(self):
+        '''Check a ball end mill along the model's edge and a feed move into a fixture.'''
+        self.assertEqual(self.check('G0 X50 Y-3 Z17\nG1 X20\nG1 Y-10 Z0\nG3 X50 Y-40 I30 J0', ball=True), [])
+        collisions = self.check('G0 X50 Y-2.9 Z17\nG1 X20', ball=True)
+        self.assertEqual([(c.index, c.kind) for c in collisions], [(1, PathCollisionCheck.Gouge)])
+        self.assertRoughly(collisions[0].depth, 0.09)
+        collisions = self.check('G0 X110 Y5 Z10\nG1 X140')
+        self.assertEqual([(c.index, c.kind) for c in collisions], [(1, PathCollisionCheck.Fixture)])
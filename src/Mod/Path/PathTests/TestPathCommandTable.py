@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# ***************************************************************************
+
+import FreeCAD
+import Path
+import PathScripts.PathArray as PathArray
+import PathScripts.PathCommandTable as PathCommandTable
+import math
+import numpy
+
+from PathTests.PathTestUtils import PathTestBase
+
+class TestPathCommandTable(PathTestBase):
+
+    def setUp(self):
+        self.path = Path.Path([
+            Path.Command('(start X1 Y2)'),
+            Path.Command('G0', {'X': 1, 'Y': 2, 'Z': 5}),
+            Path.Command('G1', {'Z': -1, 'F': 100}),
+            Path.Command('G2', {'X': 3, 'Y': 2, 'I': 1, 'J': 0}),
+            Path.Command('M3', {'S': 1000}),
+            Path.Command('G1', {'Y': -2.5})])
+
+    def test00(self):
+        '''Check the columns of a path and the conversion back to a path.'''
+        table = PathCommandTable.fromPath(self.path)
+        self.assertEqual(len(table), 6)
+        self.assertEqual(list(table.commandNames()), ['(start X1 Y2)', 'G0', 'G1', 'G2', 'M3', 'G1'])
+        self.assertEqual(sorted(table.columns), ['F', 'I', 'J', 'S', 'X', 'Y', 'Z'])
+        self.assertTrue(numpy.all(numpy.isnan(table.column('X')[[0, 2, 4, 5]])))
+        self.assertEqual(list(table.column('Y')[[1, 3, 5]]), [2, 2, -2.5])
+        self.assertEqual(list(table.mask(['G1', 'G01'])), [False, False, True, False, False, True])
+        self.assertEqual(list(table.modal('Z', 10)), [10, 5, -1, -1, -1, -1])
+        self.assertEqual(table.toGCode(), self.path.toGCode())
+        self.assertEqual(table.toPath().toGCode(), self.path.toGCode())
+
+    def test01(self):
+        '''Check the binary data and the concatenation of tables.'''
+        table = PathCommandTable.fromPath(self.path)
+        self.assertEqual(PathCommandTable.fromBytes(table.toBytes()).toGCode(), self.path.toGCode())
+        other = PathCommandTable.fromCommands([Path.Command('G0', {'Z': 10}), Path.Command('M5')])
+        both = PathCommandTable.concatenate([table, other])
+        self.assertEqual(both.toGCode(), self.path.toGCode() + other.toGCode())
+        self.assertEqual(PathCommandTable.fromGCode('').toGCode(), '')
+
+    def test02(self):
+        '''Check the rotation of an array matches the rotation of each command.'''
+        array = PathArray.ObjectArray.__new__(PathArray.ObjectArray)
+        rotated = array.rotatePath(self.path, 90.0, FreeCAD.Vector(1, 0, 0)).Commands
+        self.assertEqual([c.Name for c in rotated], [c.Name for c in self.path.Commands])
+        self.assertRoughly(rotated[1].Parameters['X'], -1)
+        self.assertRoughly(rotated[1].Parameters['Y'], 0)
+        self.assertRoughly(rotated[1].Parameters['Z'], 5)
+        # the position of moves without X and Y is set explicitly
+        self.assertRoughly(rotated[2].Parameters['X'], -1)
+        self.assertRoughly(rotated[2].Parameters['Y'], 0)
+        self.assertRoughly(rotated[3].Parameters['X'], -1)
+        self.assertRoughly(rotated[3].Parameters['Y'], 2)
+        self.assertRoughly(rotated[3].Parameters['I'], 0)
+        self.assertRoughly(rotated[3].Parameters['J'], 1)
+        self.assertFalse('X' in rotated[4].Parameters)
+        self.assertRoughly(rotated[5].Parameters['X'], 3.5)
+        self.assertRoughly(rotated[5].Parameters['Y'], 2)
+        self.assertRoughly(math.hypot(rotated[5].Parameters['X'] - 1, rotated[5].Parameters['Y']), math.hypot(2, 2.5))
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 sliptonic <shopinthewoods@gmail.com>               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import FreeCAD
+import Part
+import Path
+import PathScripts.PathJob as PathJob
+import PathScripts.PathOpCache as PathOpCache
+import PathScripts.PathPreferences as PathPreferences
+import PathScripts.PathProfileContour as PathProfileContour
+import PathScripts.PathToolController as PathToolController
+import os
+import shutil
+import tempfile
+
+from PathTests.PathTestUtils import PathTestBase
+
+class FakeJob(object):
+    def __init__(self):
+        self.GeometryTolerance = 0.01
+
+class FakeOp(object):
+    '''Proxy state operationKey() relies on, as set up by PathOp.ObjectOp.execute().'''
+    def __init__(self, model, stock):
+        self.job = FakeJob()
+        self.model = model
+        self.stock = stock
+
+class TestPathOpCache(PathTestBase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='pathcache')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test00(self):
+        '''Check that commands survive a round trip through the cache.'''
+        cache = PathOpCache.ToolpathCache(self.directory, 1024 * 1024)
+        commands = [Path.Command('G0', {'Z': 10}), Path.Command('G1', {'X': 1.5, 'Y': -2.25, 'F': 100}), Path.Command('(done)')]
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', commands)
+        restored = cache.get('a')
+        self.assertEqual(len(restored), len(commands))
+        for c1, c2 in zip(commands, restored):
+            self.assertEqual(c1.Name, c2.Name)
+            self.assertEqual(sorted(c1.Parameters.items()), sorted(c2.Parameters.items()))
+
+    def test01(self):
+        '''Check that the least recently used paths are evicted.'''
+        cache = PathOpCache.ToolpathCache(self.directory, 1024 * 1024)
+        commands = [Path.Command('G1', {'X': i * 0.001, 'Y': i * 0.002}) for i in range(2000)]
+        cache.put('a', commands)
+        cache.put('b', commands)
+        os.utime(cache.path('a'), (0, 0))
+        cache.maxSize = os.path.getsize(cache.path('b'))
+        cache.evict()
+        self.assertFalse(os.path.exists(cache.path('a')))
+        self.assertTrue(os.path.exists(cache.path('b')))
+
+    def test02(self):
+        '''Check that shape digests depend on the geometry only.'''
+        box1 = Part.makeBox(10, 10, 10)
+        box2 = Part.makeBox(10, 10, 10)
+        box3 = Part.makeBox(10, 10, 11)
+        self.assertEqual(PathOpCache.shapeDigest(box1), PathOpCache.shapeDigest(box2))
+        self.assertNotEqual(PathOpCache.shapeDigest(box1), PathOpCache.shapeDigest(box3))
+
+    def createOp(self, doc):
+        model = doc.addObject('Part::Box', 'Model')
+        stock = doc.addObject('Part::Box', 'Stock')
+        stock.Height = 12
+        obj = doc.addObject('App::FeaturePython', 'Op')
+        obj.addProperty('App::PropertyDistance', 'StepDown')
+        obj.addProperty('App::PropertyString', 'AreaParams')
+        obj.addProperty('App::PropertyString', 'PathParams')
+        obj.addProperty('Part::PropertyPartShape', 'removalshape')
+        obj.addProperty('App::PropertyString', 'Comment')
+        obj.StepDown = 1
+        doc.recompute()
+        return obj, FakeOp([model], stock)
+
+    def test03(self):
+        '''Check that operation keys do not depend on the values assigned by the operation.'''
+        doc = FreeCAD.newDocument("TestPathOpCache")
+        obj, op = self.createOp(doc)
+        key = PathOpCache.operationKey(obj, op)
+        self.assertEqual(key, PathOpCache.operationKey(obj, op))
+
+        obj.AreaParams = "{'Offset': 1.0}"
+        obj.PathParams = "{'feedrate': 100.0}"
+        obj.removalshape = Part.makeBox(1, 2, 3)
+        obj.Comment = 'a comment'
+        obj.Label = 'Renamed'
+        self.assertEqual(key, PathOpCache.operationKey(obj, op))
+
+        # an identical operation of another document generates the same path
+        doc2 = FreeCAD.newDocument("TestPathOpCache2")
+        obj2, op2 = self.createOp(doc2)
+        self.assertEqual(key, PathOpCache.operationKey(obj2, op2))
+
+        FreeCAD.closeDocument(doc2.Name)
+        FreeCAD.closeDocument(doc.Name)
+
+    def test04(self):
+        '''Check that operation keys change with the inputs of the operation.'''
+        doc = FreeCAD.newDocument("TestPathOpCache")
+        obj, op = self.createOp(doc)
+        keys = [PathOpCache.operationKey(obj, op)]
+
+        obj.StepDown = 2
+        keys.append(PathOpCache.operationKey(obj, op))
+
+        op.model[0].Length = 11
+        doc.recompute()
+        keys.append(PathOpCache.operationKey(obj, op))
+
+        op.stock.Height = 13
+        doc.recompute()
+        keys.append(PathOpCache.operationKey(obj, op))
+
+        op.job.GeometryTolerance = 0.001
+        keys.append(PathOpCache.operationKey(obj, op))
+
+        self.assertEqual(len(keys), len(set(keys)))
+
+        FreeCAD.closeDocument(doc.Name)
+
+    def test05(self):
+        '''Check that the path of an Area operation is stored in the cache and restored from it.'''
+        size = PathPreferences.toolpathCacheSize()
+        directory = PathPreferences.preferences().GetString(PathPreferences.ToolpathCacheDir)
+        PathPreferences.setToolpathCacheDefaults(16, self.directory)
+        doc = FreeCAD.newDocument("TestPathOpCache")
+        try:
+            box = doc.addObject('Part::Box', 'Box')
+            doc.recompute()
+            job = PathJob.Create('Job', [box])
+            job.Proxy.addToolController(PathToolController.Create('TC0'))
+            op = PathProfileContour.Create('Contour')
+            doc.recompute()
+            commands = [c.toGCode() for c in op.Path.Commands]
+            self.assertTrue(len(commands) > 2)
+            self.assertEqual(len([n for n in os.listdir(self.directory) if n.endswith('.ngz')]), 1)
+
+            # the second execute does not compute the path again
+            executed = []
+            opExecute = op.Proxy.opExecute
+            op.Proxy.opExecute = lambda obj: executed.append(obj) or opExecute(obj)
+            op.touch()
+            doc.recompute()
+            self.assertEqual(executed, [])
+            self.assertEqual([c.toGCode() for c in op.Path.Commands], commands)
+        finally:
+            FreeCAD.closeDocument(doc.Name)
+            PathPreferences.setToolpathCacheDefaults(size, directory)
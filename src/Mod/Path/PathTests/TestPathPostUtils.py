@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import Path
+import PathScripts.PostUtils as PostUtils
+
+from PathTests.PathTestUtils import PathTestBase
+
+class TestPathPostUtils(PathTestBase):
+
+    def gcode(self, commands, toolChange='', **kwargs):
+        writer = PostUtils.GCodeWriter(**kwargs)
+        writer.writeCommands(commands, toolChange)
+        return writer.getvalue()
+
+    def test00(self):
+        '''Verify the default formatting of moves and feed rates.'''
+        commands = [
+                Path.Command('G0', {'X': 1, 'Y': 2, 'F': 10}),
+                Path.Command('G1', {'X': 1, 'Y': 2, 'Z': -0.5, 'F': 10}),
+                Path.Command('(a comment)')]
+        self.assertEqual(self.gcode(commands),
+                "G0 X1.000 Y2.000\n"
+                "G1 X1.000 Y2.000 Z-0.500 F600.000\n"
+                "(a comment)\n")
+        self.assertEqual(self.gcode(commands, precision=1, outputComments=False),
+                "G0 X1.0 Y2.0\n"
+                "G1 X1.0 Y2.0 Z-0.5 F600.0\n")
+        self.assertEqual(self.gcode(commands[1:2], unitFormat='in', unitSpeedFormat='in/min'),
+                "G1 X0.039 Y0.079 Z-0.020 F23.622\n")
+
+    def test01(self):
+        '''Verify modal commands are suppressed.'''
+        commands = [
+                Path.Command('G1', {'X': 1}),
+                Path.Command('G1', {'X': 2}),
+                Path.Command('G0', {'Z': 5}),
+                Path.Command('G1', {'X': 3})]
+        self.assertEqual(self.gcode(commands, modal=True),
+                "G1 X1.000\n"
+                "X2.000\n"
+                "G0 Z5.000\n"
+                "G1 X3.000\n")
+        self.assertEqual(self.gcode(commands),
+                "G1 X1.000\n"
+                "G1 X2.000\n"
+                "G0 Z5.000\n"
+                "G1 X3.000\n")
+
+    def test02(self):
+        '''Verify duplicate axis values and feed rates are suppressed.'''
+        commands = [
+                Path.Command('G1', {'X': 1, 'Y': 2, 'F': 10}),
+                Path.Command('G1', {'X': 1, 'Y': 3, 'F': 10}),
+                Path.Command('G1', {'X': 1, 'Y': 3, 'F': 20})]
+        self.assertEqual(self.gcode(commands, outputDoubles=False),
+                "G1 X1.000 Y2.000 F600.000\n"
+                "G1 Y3.000\n"
+                "G1 F1200.000\n")
+        self.assertEqual(self.gcode(commands),
+                "G1 X1.000 Y2.000 F600.000\n"
+                "G1 X1.000 Y3.000 F600.000\n"
+                "G1 X1.000 Y3.000 F1200.000\n")
+
+    def test03(self):
+        '''Verify line numbers of commands and text lines.'''
+        writer = PostUtils.GCodeWriter(lineNumbers=True, lineNumber=100)
+        writer.writeText("G17\nG90")
+        writer.writeCommands([Path.Command('G1', {'X': 1})])
+        writer.write("(no number)", False)
+        writer.write("M2")
+        self.assertEqual(writer.getvalue(),
+                "N110 G17\n"
+                "N120 G90\n"
+                "N130  G1 X1.000\n"
+                "(no number)\n"
+                "N140 M2\n")
+        # every writer starts with its own line number
+        writer = PostUtils.GCodeWriter(lineNumbers=True, lineNumber=100)
+        writer.write("M2")
+        self.assertEqual(writer.getvalue(), "N110 M2\n")
+
+    def test04(self):
+        '''Verify the tool change text is written before every M6.'''
+        commands = [
+                Path.Command('M6', {'T': 2}),
+                Path.Command('G0', {'Z': 5}),
+                Path.Command('M6', {'T': 3})]
+        self.assertEqual(self.gcode(commands, "M5\nM9"),
+                "M5\n"
+                "M9\n"
+                "M6 T2\n"
+                "G0 Z5.000\n"
+                "M5\n"
+                "M9\n"
+                "M6 T3\n")
+        self.assertEqual(self.gcode(commands[:1], "M5\n", lineNumbers=True, lineNumber=0),
+                "N10 M5\n"
+                "N20  M6 T2\n")
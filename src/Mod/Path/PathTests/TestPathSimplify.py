@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 sliptonic <shopinthewoods@gmail.com>               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# ***************************************************************************
+
+import Path
+import PathScripts.PathSimplify as PathSimplify
+import math
+import numpy
+
+from PathTests.PathTestUtils import PathTestBase
+
+class TestPathSimplify(PathTestBase):
+
+    def test00(self):
+        '''Check Douglas-Peucker keeps the corners and drops the points on straight lines.'''
+        points = numpy.array([(x, 0, 0) for x in range(11)] + [(10, y, 0) for y in range(1, 11)], dtype=float)
+        keep = PathSimplify.simplifyPoints(points, 0.01)
+        self.assertEqual(list(numpy.nonzero(keep)[0]), [0, 10, 20])
+        points[5, 1] = 0.005
+        self.assertEqual(list(numpy.nonzero(PathSimplify.simplifyPoints(points, 0.01))[0]), [0, 10, 20])
+        self.assertEqual(list(numpy.nonzero(PathSimplify.simplifyPoints(points, 0.001))[0]), [0, 4, 5, 6, 10, 20])
+
+    def test01(self):
+        '''Check a chain of short moves along a half circle becomes one arc.'''
+        commands = [Path.Command('G0', {'X': 10, 'Y': 0, 'Z': 5}), Path.Command('G1', {'Z': 0, 'F': 100})]
+        for i in range(1, 101):
+            a = math.pi * i / 100
+            commands.append(Path.Command('G1', {'X': 10 * math.cos(a), 'Y': 10 * math.sin(a), 'F': 200}))
+        commands.append(Path.Command('G0', {'Z': 5}))
+        result = PathSimplify.simplifyCommands(commands, 0.01)
+        self.assertEqual([c.Name for c in result], ['G0', 'G1', 'G3', 'G0'])
+        arc = result[2].Parameters
+        self.assertRoughly(arc['X'], -10)
+        self.assertRoughly(arc['Y'], 0)
+        self.assertRoughly(arc['I'], -10)
+        self.assertRoughly(arc['J'], 0)
+        self.assertRoughly(arc['F'], 200)
+
+    def test02(self):
+        '''Check only moves with the same feed rate are simplified, without arcs if they are disabled.'''
+        commands = [Path.Command('G0', {'X': 0, 'Y': 0, 'Z': 0})]
+        commands.extend(Path.Command('G1', {'X': x, 'F': 100}) for x in range(1, 5))
+        commands.extend(Path.Command('G1', {'X': x, 'F': 200}) for x in range(5, 9))
+        commands.append(Path.Command('G81', {'X': 10, 'Y': 10, 'Z': -2, 'R': 1}))
+        commands.extend(Path.Command('G1', {'X': x, 'F': 200}) for x in range(9, 12))
+        result = PathSimplify.simplifyCommands(commands, 0.01, False)
+        # the position after the drill cycle is unknown, the first move after it is kept
+        self.assertEqual([c.Name for c in result], ['G0', 'G1', 'G1', 'G81', 'G1', 'G1'])
+        self.assertRoughly(result[1].Parameters['X'], 4)
+        self.assertRoughly(result[2].Parameters['X'], 8)
+        self.assertRoughly(result[2].Parameters['F'], 200)
+        self.assertRoughly(result[5].Parameters['X'], 11)
@@ -26,11 +26,27 @@ import FreeCAD
 import Part
 import Path
 import PathScripts.PathUtil as PathUtil
+import PathScripts.PathUtils as PathUtils
 import Sketcher
 import TestSketcherApp
+import random
+import threading
+import time
 
 from PathTests.PathTestUtils import PathTestBase
 
+def nearestNeighbourOrder(locations, keys, attractors):
+    '''Reference for sort_jobs, picks the location with the smallest square distance plus attractor weight
+    by comparing all remaining locations, starting at the origin.'''
+    remaining = list(locations)
+    order = []
+    last = dict((k, 0) for k in keys)
+    while remaining:
+        cost = [sum((loc[k] - last[k]) ** 2 for k in keys) + sum(abs(loc[k]) for k in attractors) for loc in remaining]
+        last = remaining.pop(cost.index(min(cost)))
+        order.append(last)
+    return order
+
 class TestPathUtil(PathTestBase):
 
     def setUp(self):
@@ -117,3 +133,58 @@ class TestPathUtil(PathTestBase):
         # however, the object itself is no longer valid
         self.assertFalse(PathUtil.isValidBaseObject(box))
 
+
+    def randomLocations(self, count):
+        rnd = random.Random(4711)
+        return [{'x': rnd.uniform(-50, 150), 'y': rnd.uniform(-20, 80), 'id': i} for i in range(count)]
+
+    def test05(self):
+        '''Check that sort_jobs picks the same locations as a brute force nearest neighbour search.'''
+        locations = self.randomLocations(300)
+        self.assertEqual([loc['id'] for loc in PathUtils.sort_jobs(locations, ['x', 'y'])],
+                [loc['id'] for loc in nearestNeighbourOrder(locations, ['x', 'y'], ['x'])])
+        self.assertEqual([loc['id'] for loc in PathUtils.sort_jobs(locations, ['x', 'y'], ['y'])],
+                [loc['id'] for loc in nearestNeighbourOrder(locations, ['x', 'y'], ['y'])])
+
+        # a regular grid has lots of equal distances
+        grid = [{'x': x * 5.0, 'y': y * 5.0, 'id': x * 10 + y} for x in range(10) for y in range(10)]
+        self.assertEqual([loc['id'] for loc in PathUtils.sort_jobs(grid, ['x', 'y'])],
+                [loc['id'] for loc in nearestNeighbourOrder(grid, ['x', 'y'], ['x'])])
+
+        self.assertEqual(PathUtils.sort_jobs([], ['x', 'y']), [])
+
+    def test06(self):
+        '''Check that two_opt keeps the first location and never increases the rapid distance.'''
+        locations = PathUtils.sort_jobs(self.randomLocations(200), ['x', 'y'])
+        distance = PathUtils.rapid_distance(locations, ['x', 'y'])
+
+        tour = PathUtils.two_opt(locations, ['x', 'y'], time.time() + 10)
+        self.assertEqual(tour[0]['id'], locations[0]['id'])
+        self.assertEqual(sorted(loc['id'] for loc in tour), list(range(200)))
+        self.assertLessEqual(PathUtils.rapid_distance(tour, ['x', 'y']), distance + 1e-9)
+
+        # sections crossing each other are always reversed
+        cross = [{'x': 0, 'y': 0}, {'x': 10, 'y': 10}, {'x': 10, 'y': 0}, {'x': 0, 'y': 10}]
+        tour = PathUtils.two_opt(cross, ['x', 'y'], time.time() + 10)
+        self.assertEqual(tour, [cross[0], cross[2], cross[1], cross[3]])
+
+        # so does sort_jobs with a time budget
+        tour = PathUtils.sort_jobs(self.randomLocations(200), ['x', 'y'], timeBudget=10)
+        self.assertEqual(tour[0]['id'], locations[0]['id'])
+        self.assertLessEqual(PathUtils.rapid_distance(tour, ['x', 'y']), distance + 1e-9)
+
+    def test07(self):
+        '''Check that rapid_distance sums up the distances in the given order.'''
+        locations = [{'x': 0, 'y': 0}, {'x': 3, 'y': 4}, {'x': 3, 'y': 0}]
+        self.assertRoughly(PathUtils.rapid_distance(locations, ['x', 'y']), 9)
+        self.assertRoughly(PathUtils.rapid_distance(locations[::-1], ['x', 'y']), 9)
+        self.assertRoughly(PathUtils.rapid_distance([locations[1], locations[0], locations[2]], ['x', 'y']), 8)
+        self.assertRoughly(PathUtils.rapid_distance(locations[:1], ['x', 'y']), 0)
+
+    def test08(self):
+        '''Check that processPool does not fork from other threads than the main thread.'''
+        pools = []
+        thread = threading.Thread(target=lambda: pools.append(PathUtil.processPool(2)))
+        thread.start()
+        thread.join()
+        self.assertEqual(pools, [None])
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 sliptonic <shopinthewoods@gmail.com>               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import Part
+import Path
+import PathScripts.PathVoxelSim as PathVoxelSim
+import numpy
+
+from PathTests.PathTestUtils import PathTestBase
+
+class TestPathVoxelSim(PathTestBase):
+
+    def test00(self):
+        '''Check the surface of flat and ball end mills.'''
+        tool = Path.Tool('t', tooltype='EndMill', diameter=4.0)
+        stamp = PathVoxelSim.toolStamp(tool, 0.5)
+        self.assertEqual(stamp.shape, (9, 9))
+        self.assertEqual(stamp[4, 4], 0)
+        self.assertEqual(stamp[4, 0], 0)
+        self.assertEqual(stamp[0, 0], numpy.inf)
+        tool.ToolType = 'BallEndMill'
+        stamp = PathVoxelSim.toolStamp(tool, 0.5)
+        self.assertRoughly(stamp[4, 4], 0)
+        self.assertRoughly(stamp[4, 0], 2)
+
+    def test01(self):
+        '''Check that a slot removes the expected volume, with and without worker processes.'''
+        box = Part.makeBox(20, 10, 5)
+        heights = PathVoxelSim.rasterizeTop(box, 0, 0, 0.1, 100, 200)
+        self.assertRoughly(numpy.min(heights), 5)
+        self.assertRoughly(numpy.max(heights), 5)
+        tool = Path.Tool('t', tooltype='EndMill', diameter=2.0)
+        stamp = PathVoxelSim.toolStamp(tool, 0.1)
+        samples = PathVoxelSim.sampleLine(numpy.array([-2.0, 5.0, 4.0]), numpy.array([22.0, 5.0, 4.0]), 0.05)
+        serial = heights.copy()
+        PathVoxelSim.cutHeights(serial, 0, 0, 0.1, [(stamp, samples)], 1)
+        parallel = heights.copy()
+        PathVoxelSim.cutHeights(parallel, 0, 0, 0.1, [(stamp, samples)], 3)
+        self.assertTrue(numpy.array_equal(serial, parallel))
+        removed = numpy.sum(heights - serial) * 0.01
+        self.assertTrue(abs(removed - 20 * 2 * 1) < 2)
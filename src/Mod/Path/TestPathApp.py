@@ -27,8 +27,10 @@ import TestApp
 from PathTests.TestPathLog   import TestPathLog
 from PathTests.TestPathCore  import TestPathCore
 #from PathTests.TestPathPost  import PathPostTestCases
+from PathTests.TestPathPostUtils import TestPathPostUtils
 from PathTests.TestPathGeom  import TestPathGeom
 from PathTests.TestPathOpTools  import TestPathOpTools
+from PathTests.TestPathOpCache  import TestPathOpCache
 from PathTests.TestPathUtil  import TestPathUtil
 from PathTests.TestPathDepthParams        import depthTestCases
 from PathTests.TestPathDressupHoldingTags import TestHoldingTags
@@ -39,4 +41,8 @@ from PathTests.TestPathTooltable import TestPathTooltable
 from PathTests.TestPathToolController import TestPathToolController
 from PathTests.TestPathSetupSheet import TestPathSetupSheet
 from PathTests.TestPathDeburr  import TestPathDeburr
+from PathTests.TestPathVoxelSim import TestPathVoxelSim
+from PathTests.TestPathCollisionCheck import TestPathCollisionCheck
+from PathTests.TestPathCommandTable import TestPathCommandTable
+from PathTests.TestPathSimplify import TestPathSimplify
 